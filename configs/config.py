@@ -2,3 +2,102 @@
 class Config:
     base_url = 'https://example.com'
     search_text = "Example Search"
+
+    # Driver pool (one pool per pytest-xdist worker)
+    pool_size = 1  # Browsers pre-spawned per worker
+    max_driver_uses = 50  # Leases before a browser is quit and replaced
+    warm_start = True  # Launch the pre-spawned browsers concurrently
+
+    # Driver factory
+    browser = "firefox"  # 'firefox' or 'chrome'
+    headless = False
+    window_size = None  # (width, height), e.g. (1366, 768). None maximizes the window
+    page_load_strategy = "normal"  # 'normal', 'eager' or 'none'
+    lean_profile = True  # Disable extensions, prefetch, telemetry and the first-run UI
+
+    # DOM-settled waiting
+    dom_quiet_period = 0.2  # Seconds without DOM mutations or pending requests that count as settled
+    stale_retries = 3  # Retries of an interaction whose element went stale
+    stale_backoff = 0.5  # Bound of the first settle wait between retries, doubled on every retry
+
+    # Authenticated-session snapshots
+    authenticated_path = "mystore"  # Page only reachable when logged in
+    session_snapshot_dir = ".sessions"  # Holds session cookies, keep it out of version control
+    session_snapshot_ttl = 3600  # Seconds before a snapshot expires and the full login is replayed
+
+    # Request filtering (WebDriver BiDi network interception)
+    request_filter_enabled = True
+    blocked_url_patterns = [
+        "https://www.google-analytics.com/**",
+        "https://www.googletagmanager.com/**",
+        "https://connect.facebook.net/**",
+        "https://static.hotjar.com/**",
+        "https://stats.g.doubleclick.net/**",
+    ]
+    allowed_url_patterns = []
+    blocked_resource_types = []  # e.g. ["image", "font", "media"]
+    request_filter_action = "block"  # 'block' fails the requests, 'stub' answers them with an empty 200
+
+    # Step timing
+    step_timings_path = "reports/step_timings.json"
+    slowest_steps_count = 10  # Steps listed in the end-of-run summary
+
+    # Benchmarks (tests marked `performance`, run with `pytest -m performance`)
+    benchmark_baseline_path = ".benchmarks/baseline.json"  # Machine specific, kept out of version control
+    benchmark_results_path = "reports/benchmark_results.json"
+    benchmark_regression_threshold = 0.2  # Fail a benchmark that is more than 20% slower than its baseline
+    benchmark_rounds = 5
+
+    # Screenshots (written to a sidecar directory next to the HTML report)
+    screenshot_on_failure = True
+    screenshot_format = "webp"  # 'webp' or 'png' (always 'png' without Pillow)
+    screenshot_scale = 0.5  # Downscale factor applied before encoding
+    screenshot_storage_cap_mb = 200  # Screenshots of a run beyond this size are dropped
+    screenshot_dir = "reports/screenshots"  # Used when no HTML report is generated
+
+    # Command tracing (the last commands of a failed test are written next to the HTML report)
+    trace_on_failure = True
+    trace_buffer_size = 200  # Commands kept per test, older ones are dropped
+    trace_dom_excerpts = 10  # Commands whose elements' HTML is captured when the trace is written
+    trace_redact_input = True  # Hide the text typed into elements and their values read back (passwords...)
+    trace_dir = "reports/traces"  # Used when no HTML report is generated
+
+    # Visual checks (BasePage.assert_matches_baseline)
+    visual_baseline_dir = "visual_baselines"  # One subdirectory per browser, kept in version control
+    visual_diff_dir = "reports/visual_diffs"  # Actual and diff images of the mismatches
+    visual_tolerance = 0.001  # Share of the compared pixels allowed to differ
+    visual_pixel_threshold = 16  # Channel difference (0-255) up to which a pixel counts as unchanged
+    visual_phash_distance = 10  # Bits apart (of 64) beyond which perceptual hashes fail a check outright
+    visual_baseline_cache_size = 64  # Decoded baselines kept in memory per process
+    visual_update_baselines = False  # Overwrite the baselines with the current screenshots
+
+    # Circuit breaker around page loads and helper waits
+    circuit_breaker_enabled = True
+    circuit_breaker_threshold = 3  # Consecutive timeouts or connection errors before the target is probed
+    circuit_breaker_reset_timeout = 30  # Seconds before an open breaker probes the target again
+    circuit_breaker_probe_timeout = 5  # Seconds a probe waits for the target to answer
+    circuit_breaker_probe_url = None  # URL probed instead of base_url, e.g. a health check this machine can reach
+    circuit_breaker_probe_proxy = None  # Proxy of the probes, when the target is only reachable through one
+    circuit_breaker_action = "skip"  # 'skip' the affected tests or 'abort' the rest of the run
+
+    # Test scheduling (per-test durations are kept in the pytest cache, run with `-n auto --dist loadgroup`)
+    schedule_by_duration = True  # Run the longest tests first
+    duration_history_size = 5  # Runs a test's expected duration is the median of
+    # Tests sharing one of these fixtures are grouped, and each test of a group starts with the cookies, storage and
+    # page the previous one left in the browser: list only fixtures whose tests tolerate it
+    affinity_fixtures = ["authenticated_driver"]
+
+    # Test data pools (generated with barnum on first use, then memory-mapped by every worker)
+    data_pool_dir = ".test_data"
+    data_pool_sizes = {"users": 2000, "invalid_inputs": 500}  # Records per pool, shared out between workers
+    data_pool_lock_timeout = 300  # Seconds a process waits for another one to generate a pool
+    data_pool_lock_stale = 30  # Seconds without progress after which a generator's lock counts as abandoned
+
+    # Change-impact selection (`--impacted-only`, `--reuse-results`)
+    impact_global_paths = [  # A change to any of these affects every test
+        "conftest.py", "pytest.ini", "requirements.txt", "configs", "drivers", "plugins", "utils",
+    ]
+    impact_locator_paths = ["locators"]  # Where the locators recorded at runtime are looked up
+
+    # Locators (measure them with `python -m utils.locator_analyzer`)
+    optimize_locators = False  # Evaluate the XPath locators that have an equivalent CSS selector as CSS
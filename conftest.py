@@ -1,25 +1,109 @@
 from datetime import datetime
 
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+
+from configs.config import Config
+from drivers.driver_pool import DriverPool
+from drivers.request_filter import RequestFilter
+from pages.login.login import Login
+from utils.affinity import affinity_group
+from utils.data_pool import KINDS, DataPool
+from utils.locator_analyzer import optimize_locators
+
+pytest_plugins = ["plugins.benchmark", "plugins.circuit_breaker", "plugins.command_trace", "plugins.impact",
+                  "plugins.scheduling", "plugins.screenshots", "plugins.step_timing"]
+
+# Report of the call phase of each test, read by setup_driver's teardown
+call_report_key = pytest.StashKey[pytest.TestReport]()
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    # Pre-spawn the browsers of this worker
+    pool = DriverPool()
+    try:
+        pool.start()
+    except Exception:
+        pool.close()  # Quit the browsers that did start, the fixture has no teardown once setup failed
+        raise
+
+    yield pool
+
+    # Tear down every browser of the pool
+    pool.close()
+
+
+@pytest.fixture
+def setup_driver(request, driver_pool):
+    # Lease a browser from the pool for the duration of the test, preferring one holding the session of its group
+    driver = driver_pool.lease(affinity=affinity_group(request.node))
+
+    request_filter = None
+    broken = True  # Until the setup below succeeded, the browser is not handed to another test
+    try:
+        # Block the requests listed in Config and in the test's request_filter marker
+        request_filter = RequestFilter.for_test(request.node) if Config.request_filter_enabled else None
+        if request_filter:
+            request_filter.apply(driver)
+        broken = False
+
+        # Provide the driver object to the test functions
+        yield driver
+    finally:
+        # Record what was blocked, reset the browser and hand it back to the pool
+        if request_filter:
+            request_filter.remove()
+            request.node.user_properties.append(("blocked_requests", dict(request_filter.blocked)))
+        # A browser that failed a test may be in any state (alerts, hung scripts...), replace it
+        report = request.node.stash.get(call_report_key, None)
+        driver_pool.release(driver, broken=broken or (report is not None and report.failed))
 
 
 @pytest.fixture(scope="session")
-def setup_driver():
-    # Set up the driver
-    service_obj = Service()
-    driver = webdriver.Firefox(service=service_obj)
-    driver.maximize_window()
+def data_pools():
+    # Memory-map the pre-generated test data; each worker gets its own share of the records
+    pools = {kind: DataPool(kind).open() for kind in KINDS}
+
+    yield pools
+
+    for pool in pools.values():
+        pool.close()
+
+
+@pytest.fixture
+def user_record(data_pools):
+    # Hand out a generated user no other test of the run gets
+    return data_pools["users"].take()
+
 
-    # Provide the driver object to the test functions
-    yield driver
+@pytest.fixture
+def invalid_input_record(data_pools):
+    # Hand out a generated set of invalid inputs no other test of the run gets
+    return data_pools["invalid_inputs"].take()
 
-    # Tear down the driver
-    driver.quit()
+
+@pytest.fixture
+def authenticated_driver(setup_driver):
+    # Log in, restoring a saved session snapshot instead of replaying the login flow when possible
+    if not Login(setup_driver).ensure_logged_in():
+        pytest.fail("Unable to log in with the configured credentials")
+
+    # Provide the logged-in driver object to the test functions
+    return setup_driver
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    if call.when == "call":
+        item.stash[call_report_key] = outcome.get_result()
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_configure(config):
     now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     config.option.htmlpath = config.option.htmlpath.replace(".html", f"_{now}.html")
+
+    # Evaluate the XPath locators that have an equivalent CSS selector as CSS, error messages keep the XPath
+    if Config.optimize_locators:
+        optimize_locators()
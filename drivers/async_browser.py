@@ -0,0 +1,71 @@
+# drivers/async_browser.py
+import asyncio
+
+from drivers.driver_factory import DriverFactory
+from utils.bidi_connection import BiDiConnection
+
+
+class AsyncBrowser:
+    def __init__(self, factory=None):
+        """
+        Constructor for AsyncBrowser class.
+
+        A browser driven over its WebDriver BiDi websocket from an event loop. Open many isolated
+        browsing contexts with new_context() and drive them concurrently with the async page objects:
+
+            async with AsyncBrowser() as browser:
+                context = await browser.new_context()
+                page = AsyncBasePage(browser.connection, context)
+
+        :param factory: A callable returning a new WebDriver instance with BiDi enabled.
+                        Defaults to DriverFactory(bidi=True).create.
+        """
+        self.factory = factory if factory else DriverFactory(bidi=True).create
+        self.driver = None
+        self.connection = None
+
+    async def start(self):
+        """
+        Launches the browser (in a thread, the launch is blocking) and connects to its websocket.
+
+        :return: The AsyncBrowser instance.
+        """
+        self.driver = await asyncio.to_thread(self.factory)
+        url = self.driver.capabilities.get("webSocketUrl")
+        if not isinstance(url, str):
+            await asyncio.to_thread(self.driver.quit)
+            raise RuntimeError("The browser did not open a WebDriver BiDi websocket (webSocketUrl capability)")
+        self.connection = await BiDiConnection(url, self.driver).connect()
+        return self
+
+    async def new_context(self, isolated=True):
+        """
+        Opens a new tab.
+
+        :param isolated: Whether the tab gets its own cookies, storage and cache.
+        :return: The id of the browsing context, to pass to the async page objects.
+        """
+        return await self.connection.create_context(isolated)
+
+    async def close_context(self, context):
+        """
+        Closes a tab opened by new_context.
+
+        :param context: The id of the browsing context.
+        """
+        await self.connection.close_context(context)
+
+    async def close(self):
+        """
+        Disconnects and quits the browser.
+        """
+        if self.connection:
+            await self.connection.close()
+        if self.driver:
+            await asyncio.to_thread(self.driver.quit)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
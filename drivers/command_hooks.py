@@ -0,0 +1,65 @@
+# drivers/command_hooks.py
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Callables notified after every WebDriver command of every hooked driver
+_listeners = []
+
+
+def add_command_listener(listener):
+    """
+    Registers a listener notified after every WebDriver command.
+
+    :param listener: A callable taking (driver, command, params, response, duration, error), where
+                     duration is in seconds and error is the raised exception or None. Exceptions it
+                     raises are logged and otherwise ignored.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_command_listener(listener):
+    """
+    Unregisters a listener added with add_command_listener.
+
+    :param listener: The listener to remove.
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def install_command_hooks(driver):
+    """
+    Routes the commands of a driver (including those sent through its web elements) through the
+    registered listeners. Installing the hooks twice has no effect.
+
+    :param driver: The WebDriver instance to hook.
+    :return: The same WebDriver instance.
+    """
+    if getattr(driver, "_command_hooks_installed", False):
+        return driver
+    execute = driver.execute
+
+    def hooked_execute(driver_command, params=None):
+        start = time.perf_counter()
+        response = error = None
+        try:
+            response = execute(driver_command, params)
+            return response
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            for listener in list(_listeners):
+                # A failing listener must neither hide the command's outcome nor keep the others from running
+                try:
+                    listener(driver, driver_command, params, response, duration, error)
+                except Exception:
+                    logger.exception("Command listener %r failed on %s", listener, driver_command)
+
+    driver.execute = hooked_execute
+    driver._command_hooks_installed = True
+    return driver
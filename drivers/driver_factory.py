@@ -0,0 +1,149 @@
+# drivers/driver_factory.py
+import logging
+import time
+
+from selenium import webdriver
+
+from configs.config import Config
+from drivers.command_hooks import install_command_hooks
+from utils import dom_scripts
+
+logger = logging.getLogger(__name__)
+
+# Firefox preferences disabling everything a test run does not need
+LEAN_FIREFOX_PREFS = {
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "browser.aboutwelcome.enabled": False,
+    "browser.newtabpage.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.startup.page": 0,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "extensions.enabledScopes": 0,
+    "extensions.pocket.enabled": False,
+    "extensions.update.enabled": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "network.prefetch-next": False,
+    "startup.homepage_welcome_url": "about:blank",
+    "toolkit.telemetry.enabled": False,
+    "toolkit.telemetry.unified": False,
+}
+
+# Chrome switches with the same purpose
+LEAN_CHROME_ARGUMENTS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--dns-prefetch-disable",
+    "--no-default-browser-check",
+    "--no-first-run",
+]
+
+
+class DriverFactory:
+    def __init__(self, browser=None, headless=None, window_size=None, page_load_strategy=None,
+                 lean_profile=None, bidi=None):
+        """
+        Constructor for DriverFactory class. Every option defaults to its value in Config.
+
+        :param browser: The browser to launch, 'firefox' or 'chrome'.
+        :param headless: Whether the browser runs without a visible window.
+        :param window_size: A (width, height) tuple. If not provided, the window is maximized.
+        :param page_load_strategy: 'normal', 'eager' (wait for DOMContentLoaded only) or 'none'.
+        :param lean_profile: Whether extensions, prefetch, telemetry and the first-run UI are disabled.
+        :param bidi: Whether the WebDriver BiDi websocket is enabled. Defaults to
+                     Config.request_filter_enabled, which needs it for request interception.
+        """
+        self.browser = (browser if browser else Config.browser).lower()
+        self.headless = Config.headless if headless is None else headless
+        self.window_size = window_size if window_size else Config.window_size
+        self.page_load_strategy = page_load_strategy if page_load_strategy else Config.page_load_strategy
+        self.lean_profile = Config.lean_profile if lean_profile is None else lean_profile
+        self.bidi = Config.request_filter_enabled if bidi is None else bidi
+        self.launch_times = []
+
+    def create(self):
+        """
+        Launches a new browser and records how long the launch took.
+
+        :return: The new WebDriver instance. Its launch time (in seconds) is stored in `launch_time`.
+        """
+        start = time.perf_counter()
+        if self.browser == "firefox":
+            driver = webdriver.Firefox(options=self.firefox_options())
+        elif self.browser == "chrome":
+            driver = webdriver.Chrome(options=self.chrome_options())
+        else:
+            raise ValueError(f"Unsupported browser '{self.browser}'. Use 'firefox' or 'chrome'.")
+
+        install_command_hooks(driver)  # Lets the step timing and tracing count the driver's commands
+        if self.bidi:
+            self._preload_settle_monitor(driver)
+        if not self.window_size and not self.headless:
+            driver.maximize_window()
+
+        driver.launch_time = time.perf_counter() - start
+        self.launch_times.append(driver.launch_time)
+        logger.info("Launched %s in %.2f s", self.browser, driver.launch_time)
+        return driver
+
+    @staticmethod
+    def _preload_settle_monitor(driver):
+        """
+        Installs the request and mutation monitor of wait_for_dom_settled in every new document before
+        the page's own scripts run, so requests fired while the page loads are counted too.
+
+        :param driver: The WebDriver instance, with BiDi enabled.
+        """
+        try:
+            driver.script.add_preload_script(dom_scripts.SETTLE_MONITOR_PRELOAD)
+            driver.settle_monitor_preloaded = True
+        except Exception as error:  # The browser may not support preload scripts
+            logger.warning("Unable to preload the settle monitor, it is installed after page loads: %s", error)
+
+    def firefox_options(self):
+        """
+        Builds the Firefox options for the configured mode.
+
+        :return: A FirefoxOptions instance.
+        """
+        options = webdriver.FirefoxOptions()
+        options.page_load_strategy = self.page_load_strategy
+        options.enable_bidi = self.bidi
+        if self.headless:
+            options.add_argument("-headless")
+        if self.window_size:
+            width, height = self.window_size
+            options.add_argument(f"--width={width}")
+            options.add_argument(f"--height={height}")
+        if self.lean_profile:
+            for name, value in LEAN_FIREFOX_PREFS.items():
+                options.set_preference(name, value)
+        return options
+
+    def chrome_options(self):
+        """
+        Builds the Chrome options for the configured mode.
+
+        :return: A ChromeOptions instance.
+        """
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        options.enable_bidi = self.bidi
+        if self.headless:
+            options.add_argument("--headless=new")
+        if self.window_size:
+            width, height = self.window_size
+            options.add_argument(f"--window-size={width},{height}")
+        if self.lean_profile:
+            for argument in LEAN_CHROME_ARGUMENTS:
+                options.add_argument(argument)
+            options.add_experimental_option("prefs", {"net.network_prediction_options": 2})
+        return options
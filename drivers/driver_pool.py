@@ -0,0 +1,248 @@
+# drivers/driver_pool.py
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from configs.config import Config
+from drivers.driver_factory import DriverFactory
+
+
+def get_worker_id():
+    """
+    Returns the pytest-xdist worker id of the current process.
+
+    :return: The worker id (e.g. 'gw0'), or 'master' when the suite is not run with xdist.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+class _PoolEntry:
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.affinity = None  # The group whose state the browser holds, None once reset
+
+
+class DriverPool:
+    def __init__(self, size=None, max_uses=None, factory=None):
+        """
+        Constructor for DriverPool class.
+
+        Each pytest-xdist worker runs its own session, so each worker owns one pool of browsers.
+
+        :param size: The number of browsers kept by the pool. Defaults to Config.pool_size.
+        :param max_uses: The number of leases after which a browser is quit and replaced.
+                         Defaults to Config.max_driver_uses.
+        :param factory: A callable returning a new WebDriver instance. Defaults to DriverFactory().create.
+        """
+        self.size = size if size else Config.pool_size
+        self.max_uses = max_uses if max_uses else Config.max_driver_uses
+        self.factory = factory if factory else DriverFactory().create
+        self.worker_id = get_worker_id()
+        self.stats = {"spawned": 0, "recycled": 0, "leases": 0, "affinity_hits": 0}
+        # LIFO so the most recently used (and therefore warmest) browser is handed out first
+        self._idle = queue.LifoQueue()
+        self._leased = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Pre-spawns the browsers of the pool so the first tests do not pay for browser startup.
+
+        With Config.warm_start the browsers are launched concurrently, so the worker waits for
+        the slowest launch instead of the sum of all of them.
+
+        If a launch fails, the browsers that did start are kept idle, the slots of the others are
+        freed (lease() spawns them on demand) and the first error is raised.
+        """
+        slots = 0
+        while self._reserve_slot():
+            slots += 1
+        entries, error = [], None
+        if Config.warm_start and slots > 1:
+            with ThreadPoolExecutor(max_workers=slots) as executor:
+                futures = [executor.submit(self._spawn) for _ in range(slots)]
+            for future in futures:
+                try:
+                    entries.append(future.result())
+                except Exception as exc:  # _spawn freed its slot
+                    error = error or exc
+        else:
+            for started in range(slots):
+                try:
+                    entries.append(self._spawn())
+                except Exception as exc:  # _spawn freed its slot, free those not tried
+                    with self._lock:
+                        self._count -= slots - started - 1
+                    error = exc
+                    break
+        for entry in entries:
+            self._idle.put(entry)
+        if error:
+            raise error
+
+    def lease(self, timeout=None, affinity=None):
+        """
+        Hands out an idle browser, spawning one if the pool is not full yet.
+
+        :param timeout: The maximum time to wait for a browser to be released (in seconds) when all
+                        browsers are leased. If not provided, waits indefinitely.
+        :param affinity: The affinity group of the test (see plugins/scheduling.py). An idle browser
+                         that last served the same group is preferred and handed out with the cookies,
+                         storage and page its previous test left; any other browser is reset first.
+        :return: The leased WebDriver instance.
+        """
+        while True:
+            try:
+                entry = self._take_idle(affinity)
+            except queue.Empty:
+                if self._reserve_slot():
+                    entry = self._spawn()
+                else:
+                    entry = self._idle.get(timeout=timeout)
+
+            if self._is_alive(entry.driver) and self._prepare(entry, affinity):
+                break
+            self.stats["recycled"] += 1
+            self._discard(entry)  # The browser crashed while idle, try the next one
+
+        entry.uses += 1
+        if affinity is not None and entry.affinity == affinity:
+            self.stats["affinity_hits"] += 1
+        entry.affinity = affinity
+        self.stats["leases"] += 1
+        self._leased[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver, broken=False):
+        """
+        Returns a leased browser to the pool after resetting its state.
+
+        A browser leased for an affinity group keeps its cookies and storage until the next lease, which
+        resets it unless it is for the same group; only its extra windows are closed here.
+
+        The browser is quit instead when it is marked as broken, has reached the maximum number of
+        uses or cannot be reset (e.g. because it crashed during the test).
+
+        :param driver: The WebDriver instance previously returned by lease().
+        :param broken: Whether the browser should be discarded regardless of its state.
+        """
+        entry = self._leased.pop(id(driver))
+        if broken or entry.uses >= self.max_uses:
+            cleaned = False
+        elif entry.affinity is not None:
+            cleaned = self._close_extra_windows(driver)
+        else:
+            cleaned = self._reset(driver)
+        if not cleaned:
+            self.stats["recycled"] += 1
+            self._discard(entry)
+            return
+        self._idle.put(entry)
+
+    def close(self):
+        """
+        Quits every browser owned by the pool.
+        """
+        entries = list(self._leased.values())
+        self._leased.clear()
+        while True:
+            try:
+                entries.append(self._idle.get(block=False))
+            except queue.Empty:
+                break
+        for entry in entries:
+            self._discard(entry)
+
+    def _take_idle(self, affinity):
+        if affinity is not None:
+            with self._idle.mutex:
+                entries = self._idle.queue
+                # Most recently released first, like the LIFO order of get()
+                for index in range(len(entries) - 1, -1, -1):
+                    if entries[index].affinity == affinity:
+                        return entries.pop(index)
+        return self._idle.get(block=False)
+
+    def _prepare(self, entry, affinity):
+        # A browser still holding the state of another group is reset before it is handed out
+        if entry.affinity is None or entry.affinity == affinity:
+            return True
+        if not self._reset(entry.driver):
+            return False
+        entry.affinity = None
+        return True
+
+    def _reserve_slot(self):
+        with self._lock:
+            if self._count >= self.size:
+                return False
+            self._count += 1
+            return True
+
+    def _spawn(self):
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._lock:
+                self._count -= 1
+            raise
+        self.stats["spawned"] += 1
+        return _PoolEntry(driver)
+
+    def _discard(self, entry):
+        with self._lock:
+            self._count -= 1
+        try:
+            entry.driver.quit()
+        except WebDriverException:
+            pass  # The browser is already gone
+
+    @staticmethod
+    def _is_alive(driver):
+        try:
+            driver.current_window_handle
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _reset(driver):
+        """
+        Clears cookies, local/session storage and extra windows so the next test starts clean.
+
+        :return: True if the browser was reset, False if it no longer responds.
+        """
+        if not DriverPool._close_extra_windows(driver):
+            return False
+        try:
+            # Storage is scoped to the current origin, so clear it before leaving the page
+            driver.execute_script(
+                "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+            )
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _close_extra_windows(driver):
+        """
+        Closes every window but the first one and switches to it.
+
+        :return: True if the browser is left with one window, False if it no longer responds.
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            return True
+        except WebDriverException:
+            return False
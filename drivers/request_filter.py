@@ -0,0 +1,101 @@
+# drivers/request_filter.py
+import fnmatch
+from collections import Counter
+
+from selenium.common.exceptions import WebDriverException
+
+from configs.config import Config
+
+
+class RequestFilter:
+    def __init__(self, block=None, allow=None, resource_types=None, action=None):
+        """
+        Constructor for RequestFilter class. Every option defaults to its value in Config.
+
+        Requests are intercepted through the browser's WebDriver BiDi network module, so the driver
+        must be launched with BiDi enabled (see Config.request_filter_enabled).
+
+        :param block: URL globs of the requests to block, e.g. 'https://www.googletagmanager.com/**'.
+                      Globs with a literal scheme and host are filtered by the browser itself; only
+                      the matching requests reach Python.
+        :param allow: URL globs exempted from blocking.
+        :param resource_types: Resource types to block, e.g. ['image', 'font']. Every request is then
+                               intercepted, as the type is only known once the request is made.
+        :param action: 'block' to fail the requests, or 'stub' to answer them with an empty response
+                       (for pages that break when a script fails to load).
+        """
+        self.block = list(block if block is not None else Config.blocked_url_patterns)
+        self.allow = list(allow if allow is not None else Config.allowed_url_patterns)
+        self.resource_types = set(resource_types if resource_types is not None else Config.blocked_resource_types)
+        self.action = action if action else Config.request_filter_action
+        self.blocked = Counter()
+        self._driver = None
+        self._handler_ids = []
+
+    @classmethod
+    def for_test(cls, node):
+        """
+        Builds the filter of a test, applying the overrides of its `request_filter` marker:
+        `block` adds URL globs, `allow` adds exempted URL globs, `resource_types` replaces the
+        blocked resource types and `action` replaces the action.
+
+        :param node: The pytest item of the test.
+        :return: A RequestFilter instance.
+        """
+        marker = node.get_closest_marker("request_filter")
+        overrides = marker.kwargs if marker else {}
+        return cls(
+            block=Config.blocked_url_patterns + list(overrides.get("block", [])),
+            allow=Config.allowed_url_patterns + list(overrides.get("allow", [])),
+            resource_types=overrides.get("resource_types"),
+            action=overrides.get("action"),
+        )
+
+    @property
+    def blocked_total(self):
+        return sum(self.blocked.values())
+
+    def apply(self, driver):
+        """
+        Starts filtering the requests of a browser.
+
+        :param driver: A WebDriver instance launched with BiDi enabled.
+        """
+        self._driver = driver
+        if self.block:
+            self._handler_ids.append(driver.network.add_request_handler(self.block, self._handle_url))
+        if self.resource_types:
+            self._handler_ids.append(driver.network.add_request_handler(self._handle_resource_type))
+
+    def remove(self):
+        """
+        Stops filtering, e.g. before the browser is handed to the next test.
+        """
+        for handler_id in self._handler_ids:
+            try:
+                self._driver.network.remove_request_handler(handler_id)
+            except WebDriverException:
+                pass  # The browser is gone, the pool will replace it
+        self._handler_ids = []
+        self._driver = None
+
+    def _handle_url(self, request):
+        if self._is_allowed(request.url):
+            return
+        pattern = next((glob for glob in self.block if fnmatch.fnmatch(request.url, glob)), "url")
+        self._stop(request, pattern)
+
+    def _handle_resource_type(self, request):
+        if request.resource_type not in self.resource_types or self._is_allowed(request.url):
+            return
+        self._stop(request, f"type:{request.resource_type}")
+
+    def _is_allowed(self, url):
+        return any(fnmatch.fnmatch(url, glob) for glob in self.allow)
+
+    def _stop(self, request, reason):
+        self.blocked[reason] += 1
+        if self.action == "stub":
+            request.provide_response(status=200, body="")
+        else:
+            request.fail()
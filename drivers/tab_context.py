@@ -0,0 +1,116 @@
+# drivers/tab_context.py
+from selenium.webdriver.remote.command import Command
+
+from drivers.command_hooks import add_command_listener, install_command_hooks
+
+
+def _track_window(driver, command, params, response, duration, error):
+    # Every window switch and close of a hooked driver passes here, whoever sends it (a tab, a page
+    # object through tab.driver.switch_to, DriverPool._reset...), so active_tab follows the browser
+    if command == Command.SWITCH_TO_WINDOW:
+        driver.active_tab = params["handle"] if error is None else None
+    elif command == Command.CLOSE:
+        driver.active_tab = None  # No window is current after a close
+
+
+add_command_listener(_track_window)
+
+
+class TabBoundDriver:
+    def __init__(self, driver, handle):
+        """
+        Constructor for TabBoundDriver class.
+
+        A stand-in for a WebDriver that switches the driver to its tab before every use, so page
+        objects built on it (e.g. BasePage(tab.driver)) act on that tab whichever tab was active.
+        The switch is skipped when the driver is already on the tab, which the driver's command
+        hooks track for every switch sent through it.
+
+        :param driver: The WebDriver instance.
+        :param handle: The window handle of the tab.
+        """
+        self.wrapped_driver = install_command_hooks(driver)
+        self.handle = handle
+
+    def activate(self):
+        """
+        Switches the driver to the tab, unless it is already active.
+        """
+        driver = self.wrapped_driver
+        if getattr(driver, "active_tab", None) != self.handle:
+            driver.switch_to.window(self.handle)  # Sets active_tab
+
+    def __getattr__(self, name):
+        self.activate()
+        return getattr(self.wrapped_driver, name)
+
+
+class TabContext:
+    def __init__(self, driver, kind="tab", isolated=False):
+        """
+        Constructor for TabContext class.
+
+        A context manager opening a tab (or window) in an existing browser and closing it on exit,
+        so tests that do not need a browser process of their own can share one:
+
+            with TabContext(driver) as tab:
+                login = tab.page(Login)
+
+        :param driver: The WebDriver instance.
+        :param kind: 'tab' or 'window'.
+        :param isolated: Whether the tab gets its own user context (cookies, storage and cache), like
+                         a separate browser profile. Needs WebDriver BiDi (see DriverFactory).
+        """
+        self.wrapped_driver = driver
+        self.kind = kind
+        self.isolated = isolated
+        self.handle = None
+        self.driver = None
+        self._previous = None
+        self._user_context = None
+
+    def open(self):
+        """
+        Opens the tab and makes it the active one.
+
+        :return: The TabContext instance.
+        """
+        driver = install_command_hooks(self.wrapped_driver)
+        self._previous = driver.current_window_handle
+        if self.isolated:
+            self._user_context = driver.browser.create_user_context()
+            # A BiDi browsing context id is also the window handle of the tab
+            self.handle = driver.browsing_context.create(type=self.kind, user_context=self._user_context)
+        else:
+            driver.switch_to.new_window(self.kind)
+            self.handle = driver.current_window_handle
+        self.driver = TabBoundDriver(driver, self.handle)
+        self.driver.activate()
+        return self
+
+    def page(self, page_class, *args):
+        """
+        Builds a page object bound to the tab.
+
+        :param page_class: A page object class taking the driver as its first argument, e.g. Login.
+        :param args: The other arguments of the page object.
+        :return: The page object.
+        """
+        return page_class(self.driver, *args)
+
+    def close(self):
+        """
+        Closes the tab (and its user context) and switches back to the tab active before open().
+        """
+        driver = self.wrapped_driver
+        self.driver.activate()
+        driver.close()
+        driver.switch_to.window(self._previous)
+        if self._user_context:
+            driver.browser.remove_user_context(self._user_context)
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,32 @@
+# pages/async_base_page.py
+from configs.config import Config
+from utils.async_helper_functions import AsyncHelperFunctions
+
+
+class AsyncBasePage:
+    def __init__(self, connection, context):
+        self.helper = AsyncHelperFunctions(connection, context)
+
+    # Method to open the base URL
+    async def open(self):
+        await self.helper.open_url(Config.base_url)  # Navigate to the base URL
+
+    # Method to get the title of the current page
+    async def get_title(self):
+        return await self.helper.execute_script("return document.title;")  # Return the title of the current page
+
+    # Method to find an element using its locator
+    async def find_element(self, locator):
+        # Wait for the element to be visible and return it
+        return await self.helper.wait_for_element_visible(locator)
+
+    # Method to input text into a field identified by its locator
+    async def input_text(self, locator):
+        element = await self.find_element(locator)  # Find the element
+        await element.clear()  # Clear the field
+        await element.send_keys(Config.search_text)  # Input the text
+
+    # Method to fill several fields at once, and optionally submit the form
+    async def fill_form(self, values, submit_locator=None):
+        # Fill every field with a single script and report the fields that failed
+        await self.helper.fill_form(values, submit_locator)
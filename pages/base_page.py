@@ -2,16 +2,20 @@
 from configs.config import Config
 from locators.base_page_locators import BasePageLocators
 from utils.helper_functions import HelperFunctions
+from utils.step_timer import instrument
+from utils.visual_check import VisualCheck
 
 
+@instrument
 class BasePage:
     def __init__(self, driver):
         self.driver = driver
         self.helper = HelperFunctions(self.driver)
+        self.visual = VisualCheck(self.driver)
 
     # Method to open the base URL
     def open(self):
-        self.driver.get(Config.base_url)  # Navigate to the base URL
+        self.helper.open_url(Config.base_url)  # Navigate to the base URL
 
     # Method to get the title of the current page
     def get_title(self):
@@ -20,10 +24,20 @@ class BasePage:
     # Method to find an element using its locator
     def find_element(self, locator):
         # Wait for the element to be visible and return it
-        return self.helper.wait_for_element_visible(self.driver, locator)
+        return self.helper.wait_for_element_visible(locator)
 
     # Method to input text into a field identified by its locator
     def input_text(self, locator):
         element = self.find_element(locator)  # Find the element
         element.clear()  # Clear the field
         element.send_keys(Config.search_text)  # Input the text
+
+    # Method to fill several fields at once, and optionally submit the form
+    def fill_form(self, values, submit_locator=None):
+        # Fill every field with a single script and report the fields that failed
+        self.helper.fill_form(values, submit_locator)
+
+    # Method to compare a screenshot of the page (or of the element located by region) with its baseline
+    def assert_matches_baseline(self, name, region=None, tolerance=None, masks=None):
+        # Mask dynamic content (locators or rectangles) and fail with the paths of the diff images on a mismatch
+        self.visual.assert_matches(name, region, tolerance, masks)
@@ -0,0 +1,93 @@
+# pages/login/async_login.py
+from selenium.common.exceptions import TimeoutException
+
+from configs.config import Config
+from locators.login_locator import LoginLocators
+from pages.login.login import get_credentials
+from utils.async_helper_functions import AsyncHelperFunctions
+from utils.dom_scripts import URL_CONTAINS
+from utils.helper_functions import FormFillError
+
+
+class AsyncLogin:
+    def __init__(self, connection, context):
+        self.helper = AsyncHelperFunctions(connection, context)  # Create an instance of the async Helper class
+        self.credentials = get_credentials()  # Fetch credentials once during initialization
+
+    # Function to open the base URL
+    async def open(self):
+        await self.helper.open_url(Config.base_url)
+
+    # Function to get the title of the current page
+    async def get_title(self):
+        return await self.helper.execute_script("return document.title;")
+
+    # Function to find an element using its locator
+    async def find_element(self, locator):
+        return await self.helper.wait_for_element_visible(locator)
+
+    # Function to input email into the email field
+    async def input_email(self, locator):
+        await self.helper.wait_and_input_text(locator, self.credentials['email'])  # Input email
+
+    # Function to input invalid email into the email field
+    async def input_invalid_email(self, locator):
+        await self.helper.wait_and_input_text(locator, self.credentials['invalid_email'])  # Input invalid email
+
+    # Function to input password into the password field
+    async def input_password(self, locator):
+        await self.helper.wait_and_input_text(locator, self.credentials['password'])  # Input password
+
+    # Function to input invalid password into the password field
+    async def input_invalid_password(self, locator):
+        await self.helper.wait_and_clear_text(locator)
+        await self.helper.wait_and_input_text(locator, self.credentials['invalid_password'])  # Input invalid password
+
+    # Function to click the sign-in button
+    async def click_sign_in(self, locator):
+        await self.helper.wait_and_click(locator)  # Click sign in button
+
+    # Function to input OTP into the OTP field
+    async def input_otp(self, locator):
+        await self.helper.wait_and_clear_text(locator)
+        await self.helper.wait_and_input_text(locator, self.credentials['otp'])  # Input OTP
+
+    # Function to click the verify button
+    async def click_verify(self, locator):
+        await self.helper.wait_and_click(locator)  # Click verify button
+
+    # Function to get the error message text
+    async def get_error_message(self, locator):
+        return await self.helper.wait_and_get_text(locator)  # Return error message text
+
+    # Function to log in through the full flow (email, password and OTP)
+    async def login(self):
+        await self.open()
+        # Fill each step of the form with a single script, then submit it
+        try:
+            await self.helper.fill_form(
+                {LoginLocators.email: self.credentials['email'], LoginLocators.password: self.credentials['password']},
+                LoginLocators.sign_in,
+            )
+            await self.helper.fill_form({LoginLocators.otp: self.credentials['otp']}, LoginLocators.verify)
+        except FormFillError:
+            return False  # A step of the form never became ready, the login did not succeed
+        # Wait for either the authenticated page or the error alert, whichever comes first
+        try:
+            matched, _ = await self.helper.wait_for_first_of(
+                (URL_CONTAINS, Config.authenticated_path), LoginLocators.error_message
+            )
+        except TimeoutException:
+            return False  # Neither outcome appeared, the login did not succeed
+        return matched != LoginLocators.error_message  # Return whether the login succeeded
+
+    # Function to check whether the session lands on the authenticated page rather than on the login page
+    async def is_logged_in(self):
+        # A rejected session redirects to the login page, possibly only after a request, so wait for either page
+        try:
+            matched, _ = await self.helper.wait_for_first_of(
+                (URL_CONTAINS, Config.authenticated_path), LoginLocators.email
+            )
+        except TimeoutException:
+            return False  # Neither page appeared, the session is not usable
+        return matched != LoginLocators.email  # Return whether the authenticated page was reached
@@ -1,13 +1,20 @@
 # pages/login/login.py
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
+from selenium.common.exceptions import TimeoutException
 
 from configs.config import Config
-from utils.helper_functions import HelperFunctions
+from locators.login_locator import LoginLocators
+from utils.dom_scripts import URL_CONTAINS
+from utils.helper_functions import FormFillError, HelperFunctions
+from utils.session_snapshot import SessionSnapshot
+from utils.step_timer import instrument
 
 
-# Function to load environment variables and get credentials
+# Function to load environment variables and get credentials, once per process
+@lru_cache(maxsize=None)
 def get_credentials():
     load_dotenv()  # Load environment variables from .env file
     credentials = {
@@ -20,16 +27,16 @@ def get_credentials():
     return credentials
 
 
+@instrument
 class Login:
     def __init__(self, driver):
         self.driver = driver
         self.helper = HelperFunctions(self.driver)  # Create an instance of the Helper class
-        self.credentials = get_credentials()  # Fetch credentials once during initialization
-        load_dotenv()  # Load environment variables from .env file
+        self.credentials = get_credentials()  # Fetch the credentials cached for the process
 
     # Function to open the base URL
     def open(self):
-        self.driver.get(Config.base_url)
+        self.helper.open_url(Config.base_url)
 
     # Function to get the title of the current page
     def get_title(self):
@@ -37,7 +44,7 @@ class Login:
 
     # Function to find an element using its locator
     def find_element(self, locator):
-        return self.helper.wait_for_element_visible(self.driver, locator)
+        return self.helper.wait_for_element_visible(locator)
 
     # Function to input email into the email field
     def input_email(self, locator):
@@ -46,7 +53,7 @@ class Login:
 
     # Function to input invalid email into the email field
     def input_invalid_email(self, locator):
-        invalid_email = os.getenv('INVALID_EMAIL')
+        invalid_email = self.credentials['invalid_email']
         self.helper.wait_and_input_text(locator, invalid_email)  # Input invalid email
 
     # Function to input password into the password field
@@ -82,3 +89,52 @@ class Login:
     def get_error_message(self, locator):
         element = self.find_element(locator)
         return element.text  # Return error message text
+
+    # Function to log in through the full flow (email, password and OTP)
+    def login(self):
+        self.open()
+        # Fill each step of the form with a single script, then submit it
+        try:
+            self.helper.fill_form(
+                {LoginLocators.email: self.credentials['email'], LoginLocators.password: self.credentials['password']},
+                LoginLocators.sign_in,
+            )
+            self.helper.fill_form({LoginLocators.otp: self.credentials['otp']}, LoginLocators.verify)
+        except FormFillError:
+            return False  # A step of the form never became ready, the login did not succeed
+        # Wait for either the authenticated page or the error alert, whichever comes first
+        try:
+            matched, _ = self.helper.wait_for_first_of(
+                (URL_CONTAINS, Config.authenticated_path), LoginLocators.error_message
+            )
+        except TimeoutException:
+            return False  # Neither outcome appeared, the login did not succeed
+        return matched != LoginLocators.error_message  # Return whether the login succeeded
+
+    # Function to check whether the session lands on the authenticated page rather than on the login page
+    def is_logged_in(self):
+        # A rejected session redirects to the login page, possibly only after a request, so wait for either page
+        try:
+            matched, _ = self.helper.wait_for_first_of(
+                (URL_CONTAINS, Config.authenticated_path), LoginLocators.email
+            )
+        except TimeoutException:
+            return False  # Neither page appeared, the session is not usable
+        return matched != LoginLocators.email  # Return whether the authenticated page was reached
+
+    # Function to start authenticated, restoring a saved session when possible
+    def ensure_logged_in(self):
+        if Config.authenticated_path in self.driver.current_url:
+            return True  # The pool kept the session of the previous test of the group (see DriverPool.lease)
+
+        snapshot = SessionSnapshot(self.credentials['email'])
+        if snapshot.restore(self.driver):
+            self.helper.element_cache.clear_window()  # The restore navigated to a new document
+            if self.is_logged_in():
+                return True
+            snapshot.delete()  # The application rejected the snapshot, fall back to a real login
+
+        if not self.login():
+            return False
+        snapshot.save(self.driver)  # Save the session for the next tests
+        return True
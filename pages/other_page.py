@@ -1,8 +1,11 @@
 # pages/other_page.py
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from utils.circuit_breaker import GuardedWait
+from utils.step_timer import instrument
 
+
+@instrument
 class OtherPage:
     def __init__(self, browser):
         self.browser = browser
@@ -19,4 +22,4 @@ class OtherPage:
     # Method to find an element using its locator
     def find_element(self, locator):
         # Wait for the element to be present and return it
-        return WebDriverWait(self.browser, self.timeout).until(EC.presence_of_element_located(locator))
+        return GuardedWait(self.browser, self.timeout).until(EC.presence_of_element_located(locator))
@@ -0,0 +1,137 @@
+# plugins/benchmark.py
+# Provides the `benchmark` fixture used by the tests marked `performance`. Results are compared with
+# a saved baseline and a test fails when it got slower than the regression threshold allows.
+import json
+import os
+import statistics
+import time
+
+import pytest
+
+from configs.config import Config
+
+
+class Benchmark:
+    def __init__(self, baseline, update_baseline):
+        """
+        Constructor for Benchmark class.
+
+        :param baseline: A dict mapping benchmark names to their baseline duration (in seconds).
+        :param update_baseline: Whether the results replace the baseline instead of being checked.
+        """
+        self.baseline = baseline
+        self.update_baseline = update_baseline
+        self.results = {}
+
+    def measure(self, name, action, rounds=None):
+        """
+        Runs an action several times and records the median duration.
+
+        :param name: The name of the benchmark.
+        :param action: A callable performing the measured work.
+        :param rounds: The number of runs. Defaults to Config.benchmark_rounds.
+        :return: The median duration (in seconds).
+        """
+        rounds = rounds if rounds else Config.benchmark_rounds
+        durations = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            action()
+            durations.append(time.perf_counter() - start)
+        return self.record(name, statistics.median(durations))
+
+    def record(self, name, duration):
+        """
+        Records a duration and checks it against the baseline.
+
+        :param name: The name of the benchmark.
+        :param duration: The measured duration (in seconds).
+        :return: The duration.
+        """
+        self.results[name] = duration
+        baseline = self.baseline.get(name)
+        if baseline and not self.update_baseline:
+            limit = baseline * (1 + Config.benchmark_regression_threshold)
+            assert duration <= limit, (
+                f"Benchmark '{name}' regressed: {duration:.3f}s against a baseline of {baseline:.3f}s "
+                f"(limit {limit:.3f}s)"
+            )
+        return duration
+
+
+def _load_baseline():
+    try:
+        with open(Config.benchmark_baseline_path, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        default=False,
+        help="Save the benchmark results as the new baseline instead of checking them against it.",
+    )
+
+
+@pytest.fixture
+def benchmark(request):
+    bench = Benchmark(_load_baseline(), request.config.getoption("update_baseline"))
+    yield bench
+    # user_properties are sent to the pytest-xdist controller along with the report
+    request.node.user_properties.append(("benchmark", bench.results))
+
+
+# Filled on the process that reports the results (the controller when running with pytest-xdist)
+_session_results = {}
+_previous_baseline = {}
+_failed_benchmarks = set()
+
+
+def pytest_runtest_logreport(report):
+    results = [value for name, value in report.user_properties if name == "benchmark"]
+    if report.failed and (results or "performance" in report.keywords):
+        _failed_benchmarks.add(report.nodeid)
+    if report.when != "teardown":
+        return
+    for value in results:
+        _session_results.update(value)
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workerinput") or not _session_results:
+        return
+    _write_json(Config.benchmark_results_path, _session_results)
+    baseline = _load_baseline()
+    _previous_baseline.update(baseline)  # Kept for the terminal summary
+    if _failed_benchmarks:
+        return  # Results of a run with failures (regressions included) never become a baseline
+    if session.config.getoption("update_baseline"):
+        baseline.update(_session_results)
+    else:
+        # Benchmarks without a baseline yet start one
+        for name, duration in _session_results.items():
+            baseline.setdefault(name, duration)
+    _write_json(Config.benchmark_baseline_path, baseline)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workerinput") or not _session_results:
+        return
+    terminalreporter.write_sep("=", "benchmarks")
+    for name, duration in sorted(_session_results.items()):
+        reference = _previous_baseline.get(name)
+        change = f"{(duration - reference) / reference:+.0%} vs baseline" if reference else "new"
+        terminalreporter.write_line(f"{duration:9.3f}s  {name} ({change})")
+    if _failed_benchmarks:
+        terminalreporter.write_line(f"Baseline not updated, {len(_failed_benchmarks)} benchmark(s) failed")
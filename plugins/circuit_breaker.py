@@ -0,0 +1,42 @@
+# plugins/circuit_breaker.py
+# Turns an unreachable target into skipped tests (or an aborted run, see Config.circuit_breaker_action)
+# instead of a wave of slow timeout failures. The breaker itself lives in utils/circuit_breaker.py.
+import pytest
+
+from configs.config import Config
+from utils.circuit_breaker import TargetUnavailableError, target_breaker
+
+# Fixtures through which a test talks to the target
+TARGET_FIXTURES = {"setup_driver", "authenticated_driver"}
+
+
+def _target_down(item, reason):
+    if Config.circuit_breaker_action == "abort":
+        item.session.shouldstop = f"Target unavailable, aborting the run: {reason}"
+    return f"Target unavailable: {reason}"
+
+
+def pytest_runtest_setup(item):
+    if not TARGET_FIXTURES.intersection(item.fixturenames):
+        return
+    try:
+        target_breaker.before_call()  # Probes the target again once the reset timeout has passed
+    except TargetUnavailableError as error:
+        pytest.skip(_target_down(item, error))
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.excinfo is not None and call.excinfo.errisinstance(TargetUnavailableError):
+        # The breaker opened during this test: report it as skipped rather than failed
+        reason = _target_down(item, call.excinfo.value)
+        report.outcome = "skipped"
+        report.longrepr = (str(item.path), item.location[1] or 0, f"Skipped: {reason}")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if target_breaker.state == target_breaker.OPEN:
+        terminalreporter.write_sep("=", "circuit breaker")
+        terminalreporter.write_line(f"Open: {target_breaker.reason}")
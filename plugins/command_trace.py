@@ -0,0 +1,64 @@
+# plugins/command_trace.py
+# Keeps the last WebDriver commands of every test in a ring buffer (see utils/command_tracer.py) and
+# writes them to a trace file, linked from the pytest-html report, only when the test fails or errors.
+import os
+import re
+
+import pytest
+
+from configs.config import Config
+from utils import command_tracer
+
+_directory = None
+
+
+def _trace_dir(config):
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput and "trace_dir" in workerinput:
+        return workerinput["trace_dir"]  # Same sidecar directory as the controller's report
+    htmlpath = getattr(config.option, "htmlpath", None)
+    if htmlpath:
+        return f"{os.path.splitext(htmlpath)[0]}_traces"
+    return Config.trace_dir
+
+
+def pytest_configure(config):
+    global _directory
+    _directory = _trace_dir(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["trace_dir"] = _directory
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    if Config.trace_on_failure:
+        command_tracer.start_tracing(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    tracer = command_tracer.current_tracer()
+    if call.when == "teardown":
+        command_tracer.stop_tracing()
+    if not tracer or not report.failed or not tracer.entries:
+        return
+
+    file_name = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', item.nodeid)}_{call.when}.json"
+    try:
+        path = tracer.flush(os.path.join(_directory, file_name), call.excinfo.exconly() if call.excinfo else None)
+    except Exception as error:  # The trace must not replace the test's own failure
+        report.sections.append(("Command trace", f"Not written: {type(error).__name__}: {error}"))
+        return
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    if pytest_html:
+        htmlpath = getattr(item.config.option, "htmlpath", None)
+        relative_path = os.path.relpath(path, os.path.dirname(htmlpath)) if htmlpath else path
+        extras = getattr(report, "extras", [])
+        extras.append(pytest_html.extras.url(relative_path, name=f"Command trace ({len(tracer.entries)} commands)"))
+        report.extras = extras
+    report.sections.append(("Command trace", f"Last {len(tracer.entries)} commands written to {path}"))
@@ -0,0 +1,239 @@
+# plugins/impact.py
+# Records which page objects, helpers and locators every test touches at runtime (through the timed
+# steps, see utils/step_timer.py), along with the content hashes of their files and the values of the
+# locators when the test last passed. `--impacted-only` then runs only the tests whose dependencies
+# changed since their last green run; `--reuse-results` reports the other tests with their cached result
+# instead of running them.
+import hashlib
+import importlib
+import inspect
+import os
+import time
+
+import pytest
+
+from configs.config import Config
+from utils import step_timer
+from utils.affinity import base_nodeid
+
+MAP_KEY = "impact/map"
+
+reused_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--impacted-only",
+        action="store_true",
+        default=False,
+        help="Run only the tests whose page objects, locators or test file changed since their last green run.",
+    )
+    parser.addoption(
+        "--reuse-results",
+        action="store_true",
+        default=False,
+        help="Report the tests whose dependencies did not change with their cached result instead of running them.",
+    )
+
+
+class _Fingerprints:
+    def __init__(self, root):
+        """
+        Constructor for _Fingerprints class, caching the content hashes of the files of a run.
+
+        :param root: The root directory of the project. Paths are relative to it.
+        """
+        self.root = root
+        self._hashes = {}
+
+    def of(self, path):
+        """
+        :param path: A path relative to the root.
+        :return: The sha256 of the file's content, or None if it does not exist.
+        """
+        if path not in self._hashes:
+            try:
+                with open(os.path.join(self.root, path), "rb") as file:
+                    self._hashes[path] = hashlib.sha256(file.read()).hexdigest()
+            except OSError:
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def of_global_paths(self):
+        """
+        :return: A single hash of every file under Config.impact_global_paths.
+        """
+        digest = hashlib.sha256()
+        for path in _files_under(self.root, Config.impact_global_paths):
+            digest.update(f"{path}={self.of(path)};".encode("utf-8"))
+        return digest.hexdigest()
+
+
+def _files_under(root, paths):
+    files = []
+    for path in paths:
+        absolute = os.path.join(root, path)
+        if os.path.isfile(absolute):
+            files.append(path)
+            continue
+        for directory, subdirectories, names in os.walk(absolute):
+            subdirectories[:] = sorted(name for name in subdirectories if name != "__pycache__")
+            files.extend(
+                os.path.relpath(os.path.join(directory, name), root) for name in sorted(names) if name.endswith(".py")
+            )
+    return files
+
+
+def _locator_index(root):
+    # Maps every locator value defined in a *Locators class to its names, and every name to its value as written
+    by_value, by_name = {}, {}
+    for path in _files_under(root, Config.impact_locator_paths):
+        module = importlib.import_module(os.path.splitext(path)[0].replace(os.sep, "."))
+        for cls in vars(module).values():
+            if not inspect.isclass(cls) or cls.__module__ != module.__name__:
+                continue
+            for name, value in vars(cls).items():
+                if isinstance(value, tuple) and len(value) == 2 and all(isinstance(part, str) for part in value):
+                    qualified_name = f"{cls.__name__}.{name}"
+                    by_value.setdefault(tuple(value), []).append(qualified_name)
+                    by_name[qualified_name] = list(getattr(value, "original", value))  # Not its optimized form
+    return by_value, by_name
+
+
+def _is_affected(entry, fingerprints, global_fingerprint, locator_values):
+    """
+    Tells whether a test must run again.
+
+    :param entry: The test's record in the impact map, or None if it has none.
+    :param fingerprints: The _Fingerprints of the current files.
+    :param global_fingerprint: The fingerprint of the files under Config.impact_global_paths.
+    :param locator_values: The current value of every locator, by name (see _locator_index).
+    :return: True if the test has no usable record, or if a file or locator it used changed since.
+    """
+    if not isinstance(entry, dict) or not all(isinstance(entry.get(key), dict) for key in ("files", "locators")):
+        return True  # Never passed, or recorded in an older format
+    if entry.get("global") != global_fingerprint:
+        return True
+    if any(fingerprints.of(path) != digest for path, digest in entry["files"].items()):
+        return True
+    # Locators are compared one by one, so a change to a locator only affects the tests using it
+    return any(locator_values.get(name) != value for name, value in entry["locators"].items())
+
+
+def pytest_collection_modifyitems(config, items):
+    impacted_only = config.getoption("impacted_only")
+    reuse_results = config.getoption("reuse_results")
+    cache = getattr(config, "cache", None)
+    if not (impacted_only or reuse_results) or not cache:
+        return
+    impact_map = cache.get(MAP_KEY, {})
+    if not isinstance(impact_map, dict):
+        impact_map = {}  # Unreadable, run everything and record it again
+    root = str(config.rootpath)
+    fingerprints = _Fingerprints(root)
+    global_fingerprint = fingerprints.of_global_paths()
+    _, locator_values = _locator_index(root)
+
+    affected, unaffected = [], []
+    for item in items:
+        entry = impact_map.get(base_nodeid(item.nodeid))
+        if _is_affected(entry, fingerprints, global_fingerprint, locator_values):
+            affected.append(item)
+        else:
+            item.stash[reused_key] = entry
+            unaffected.append(item)
+
+    if impacted_only and not reuse_results and unaffected:
+        config.hook.pytest_deselected(items=unaffected)
+        items[:] = affected
+
+
+def pytest_runtest_protocol(item, nextitem):
+    entry = item.stash.get(reused_key, None)
+    if entry is None:
+        return None
+    # Report the cached result instead of running the test
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for when in ("setup", "call", "teardown"):
+        report = pytest.TestReport(
+            item.nodeid, item.location, {keyword: 1 for keyword in item.keywords}, "passed", None, when,
+            user_properties=[("reused_result", entry["passed_at"])],
+        )
+        item.ihook.pytest_runtest_logreport(report=report)
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    yield
+    # The recorder holds the steps of the setup and the call of the test at this point
+    recorder = step_timer.current_recorder()
+    if recorder is None:
+        return
+    root = str(item.config.rootpath)
+    source_files = {
+        os.path.relpath(path, root) for path in recorder.source_files if path and path.startswith(root + os.sep)
+    }
+    source_files.add(os.path.relpath(str(item.path), root))
+    # user_properties are sent to the pytest-xdist controller along with the report
+    item.user_properties.append(("impact_dependencies", {
+        "files": sorted(source_files),
+        "methods": sorted({step["name"] for step in recorder.steps}),
+        "locators": sorted(list(locator) for locator in recorder.locators),
+    }))
+
+
+# Filled on the process that reports the results (the controller when running with pytest-xdist)
+_session_dependencies = {}
+_session_failed = set()
+
+
+def pytest_runtest_logreport(report):
+    nodeid = base_nodeid(report.nodeid)
+    if report.failed:
+        _session_failed.add(nodeid)
+    if report.when == "call" and report.passed:
+        for name, value in report.user_properties:
+            if name == "impact_dependencies":
+                _session_dependencies[nodeid] = value
+
+
+def pytest_sessionfinish(session):
+    cache = getattr(session.config, "cache", None)
+    if hasattr(session.config, "workerinput") or not cache or not (_session_dependencies or _session_failed):
+        return
+    root = str(session.config.rootpath)
+    impact_map = cache.get(MAP_KEY, {})
+    if not isinstance(impact_map, dict):
+        impact_map = {}
+    fingerprints = _Fingerprints(root)
+    global_fingerprint = fingerprints.of_global_paths()
+    locator_names, locator_values = _locator_index(root)
+
+    for nodeid in _session_failed:
+        impact_map.pop(nodeid, None)  # Not green any more, run it until it passes again
+    for nodeid, dependencies in _session_dependencies.items():
+        if nodeid in _session_failed:
+            continue
+        names = {name for locator in dependencies["locators"] for name in locator_names.get(tuple(locator), [])}
+        impact_map[nodeid] = {
+            "files": {path: fingerprints.of(path) for path in dependencies["files"]},
+            "global": global_fingerprint,
+            "methods": dependencies["methods"],
+            "locators": {name: locator_values[name] for name in sorted(names)},
+            "passed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+    cache.set(MAP_KEY, impact_map)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not (config.getoption("impacted_only") or config.getoption("reuse_results")):
+        return
+    reused = sum(
+        1 for report in terminalreporter.stats.get("passed", [])
+        if report.when == "call" and any(name == "reused_result" for name, _ in report.user_properties)
+    )
+    deselected = len(terminalreporter.stats.get("deselected", []))
+    terminalreporter.write_sep("=", "change impact")
+    terminalreporter.write_line(f"{reused} reused result(s), {deselected} test(s) deselected as unaffected")
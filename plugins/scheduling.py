@@ -0,0 +1,98 @@
+# plugins/scheduling.py
+# Orders the tests longest-first using the durations of previous runs, kept in the pytest cache, and
+# groups the tests that need the same state (see Config.affinity_fixtures) so they share a worker and
+# a browser. With `--dist loadgroup`, pytest-xdist sends every group to a single worker; large groups
+# are split into buckets balanced longest-processing-time first so none of them becomes a straggler.
+import math
+import statistics
+
+import pytest
+
+from configs.config import Config
+from utils.affinity import GROUP_PREFIX, affinity_group, affinity_key, base_nodeid
+
+HISTORY_KEY = "scheduling/durations"
+
+
+def _load_history(config):
+    cache = getattr(config, "cache", None)
+    return cache.get(HISTORY_KEY, {}) if cache else {}
+
+
+def _worker_count(config):
+    workerinput = getattr(config, "workerinput", None)
+    return workerinput["workercount"] if workerinput else 1
+
+
+def _lpt_buckets(items, estimates, count):
+    # Longest processing time first: each test goes to the bucket with the least work so far
+    buckets = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for item in sorted(items, key=lambda item: -estimates[item.nodeid]):
+        index = loads.index(min(loads))
+        buckets[index].append(item)
+        loads[index] += estimates[item.nodeid]
+    return [(load, bucket) for load, bucket in zip(loads, buckets) if bucket]
+
+
+# tryfirst: runs before pytest-xdist appends the group names to the node ids
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    if not Config.schedule_by_duration or not items:
+        return
+    history = _load_history(config)
+    known = [statistics.median(history[item.nodeid]) for item in items if history.get(item.nodeid)]
+    # Tests without a history are assumed to take as long as a typical test
+    default = statistics.median(known) if known else 1.0
+    estimates = {
+        item.nodeid: statistics.median(history[item.nodeid]) if history.get(item.nodeid) else default
+        for item in items
+    }
+
+    groups = {}
+    for item in items:
+        group = affinity_group(item)
+        item.stash[affinity_key] = group
+        groups.setdefault(group, []).append(item)
+
+    # Units of work: the buckets of every affinity group, and every test without a group on its own
+    units = [(estimates[item.nodeid], [item]) for item in groups.pop(None, [])]
+    workers = _worker_count(config)
+    total = sum(estimates.values())
+    for group, members in groups.items():
+        load = sum(estimates[item.nodeid] for item in members)
+        # Split a group in proportion to its share of the work, at most one bucket per worker
+        count = max(1, min(workers, len(members), math.floor(workers * load / total + 0.5)))
+        for index, (bucket_load, bucket) in enumerate(_lpt_buckets(members, estimates, count)):
+            for item in bucket:
+                item.add_marker(pytest.mark.xdist_group(f"{GROUP_PREFIX}{group}-{index}"))
+            units.append((bucket_load, bucket))
+
+    units.sort(key=lambda unit: -unit[0])  # Stable, so equal units keep the file order
+    items[:] = [item for _, bucket in units for item in bucket]
+
+
+# Filled on the process that reports the results (the controller when running with pytest-xdist)
+_session_durations = {}
+_skipped = set()
+
+
+def pytest_runtest_logreport(report):
+    nodeid = base_nodeid(report.nodeid)
+    if any(name == "reused_result" for name, _ in report.user_properties):
+        return  # Not run, see plugins/impact.py
+    _session_durations[nodeid] = _session_durations.get(nodeid, 0.0) + report.duration
+    if report.skipped:
+        _skipped.add(nodeid)  # Its duration says nothing about the next run
+
+
+def pytest_sessionfinish(session):
+    cache = getattr(session.config, "cache", None)
+    if hasattr(session.config, "workerinput") or not cache or not _session_durations:
+        return
+    history = _load_history(session.config)
+    for nodeid, duration in _session_durations.items():
+        if nodeid in _skipped:
+            continue
+        history[nodeid] = (history.get(nodeid, []) + [round(duration, 3)])[-Config.duration_history_size:]
+    cache.set(HISTORY_KEY, history)
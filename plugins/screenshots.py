@@ -0,0 +1,113 @@
+# plugins/screenshots.py
+# Captures a screenshot when a test fails (and on demand through the `screenshot` fixture) with the
+# off-thread ScreenshotPipeline, and links the files from the pytest-html report instead of
+# embedding them (unless the report is self-contained).
+import base64
+import os
+
+import pytest
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from configs.config import Config
+from drivers.tab_context import TabBoundDriver
+from utils.screenshot_pipeline import ScreenshotPipeline
+
+_pipeline = None
+
+
+def _report_dir(config):
+    htmlpath = getattr(config.option, "htmlpath", None)
+    return os.path.dirname(htmlpath) if htmlpath else Config.screenshot_dir
+
+
+def _screenshot_dir(config):
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput and "screenshot_dir" in workerinput:
+        return workerinput["screenshot_dir"]  # Same sidecar directory as the controller's report
+    htmlpath = getattr(config.option, "htmlpath", None)
+    if htmlpath:
+        return f"{os.path.splitext(htmlpath)[0]}_screenshots"
+    return Config.screenshot_dir
+
+
+def _find_driver(item):
+    # The driver is either a fixture value itself or held by a page object (or TabContext) fixture: a
+    # WebDriver or a driver bound to a tab. The async page objects capture through the classic session
+    # of their browser, switched to their browsing context.
+    for value in getattr(item, "funcargs", {}).values():
+        driver = value if isinstance(value, (WebDriver, TabBoundDriver)) else getattr(value, "driver", None)
+        if isinstance(driver, (WebDriver, TabBoundDriver)):
+            return driver
+        helper = getattr(value, "helper", None)
+        session = getattr(getattr(helper, "connection", None), "driver", None)
+        if isinstance(session, WebDriver):
+            return TabBoundDriver(session, helper.context)  # A BiDi context id is also a window handle
+    return None
+
+
+def _capture(item, driver, name):
+    try:
+        path = _pipeline.capture(driver, f"{item.nodeid}_{name}")
+    except Exception:
+        return  # The browser is gone (urllib3 errors once quit), there is nothing to capture
+    if path:
+        item.stash.setdefault(_screenshots_key, []).append(path)
+
+
+_screenshots_key = pytest.StashKey()
+
+
+@pytest.fixture
+def screenshot(request):
+    # Provide a function capturing a screenshot of a driver, linked from the test's report row
+    def take(driver, name="screenshot"):
+        _capture(request.node, driver, name)
+
+    return take
+
+
+def pytest_configure(config):
+    global _pipeline
+    _pipeline = ScreenshotPipeline(_screenshot_dir(config))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["screenshot_dir"] = _pipeline.directory
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if call.when not in ("setup", "call"):
+        return
+    if report.failed and Config.screenshot_on_failure:
+        driver = _find_driver(item)
+        if driver:
+            _capture(item, driver, "failure")
+
+    paths = item.stash.get(_screenshots_key, [])
+    pytest_html = item.config.pluginmanager.getplugin("html")
+    if not paths or not pytest_html:
+        return
+    extras = getattr(report, "extras", [])
+    extension = os.path.splitext(paths[0])[1].lstrip(".")
+    self_contained = item.config.getoption("self_contained_html", False)
+    for path in paths:
+        if self_contained:
+            # A self-contained report is meant to be moved alone, links to the sidecar files would break
+            data = _pipeline.read(path)
+            if data is None:
+                continue
+            content = base64.b64encode(data).decode("ascii")
+        else:
+            content = os.path.relpath(path, _report_dir(item.config))
+        extras.append(pytest_html.extras.image(content, mime_type=f"image/{extension}", extension=extension))
+    report.extras = extras
+    item.stash[_screenshots_key] = []
+
+
+def pytest_sessionfinish(session):
+    # Let the background worker finish writing the queued screenshots
+    _pipeline.close()
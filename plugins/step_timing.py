@@ -0,0 +1,98 @@
+# plugins/step_timing.py
+# Records the timed steps of every test (see utils/step_timer.py) and reports them as a per-test
+# table in the pytest-html report, a JSON file and a slowest-steps summary at the end of the run.
+import html
+import json
+import os
+from collections import defaultdict
+
+import pytest
+
+from configs.config import Config
+from utils import step_timer
+
+
+def _steps_table(steps):
+    rows = "".join(
+        "<tr>"
+        f"<td>{html.escape(step['name'])}</td>"
+        f"<td>{html.escape(step['locator'] or '')}</td>"
+        f"<td>{step['duration']:.3f}</td>"
+        f"<td>{'' if step['budget_used'] is None else format(step['budget_used'], '.0%')}</td>"
+        f"<td>{step['polls']}</td>"
+        f"<td>{step['commands']}</td>"
+        f"<td>{html.escape(step['error'] or '')}</td>"
+        "</tr>"
+        for step in steps
+    )
+    return (
+        "<table class='step-timings'><tr><th>Step</th><th>Locator</th><th>Duration (s)</th>"
+        f"<th>Timeout budget used</th><th>Polls</th><th>Commands</th><th>Error</th></tr>{rows}</table>"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    step_timer.start_recording(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Attach the steps to the call report, or to the setup report when the test did not get that far
+    if call.when == "call" or (call.when == "setup" and not report.passed):
+        recorder = step_timer.stop_recording()
+        if not recorder or not recorder.steps:
+            return
+        # user_properties are sent to the pytest-xdist controller along with the report
+        report.user_properties.append(("step_timings", recorder.steps))
+        pytest_html = item.config.pluginmanager.getplugin("html")
+        if pytest_html:
+            extras = getattr(report, "extras", [])
+            extras.append(pytest_html.extras.html(_steps_table(recorder.steps)))
+            report.extras = extras
+
+
+def pytest_runtest_teardown(item):
+    step_timer.stop_recording()
+
+
+# Filled on the process that reports the results (the controller when running with pytest-xdist)
+_session_timings = {}
+
+
+def pytest_runtest_logreport(report):
+    for name, value in report.user_properties:
+        if name == "step_timings":
+            _session_timings[report.nodeid] = value
+
+
+def pytest_sessionfinish(session):
+    if hasattr(session.config, "workerinput") or not _session_timings:
+        return  # Workers leave the reporting to the controller
+    path = Config.step_timings_path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(_session_timings, file, indent=2)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, "workerinput") or not _session_timings:
+        return
+    totals = defaultdict(lambda: {"calls": 0, "total": 0.0, "slowest": 0.0})
+    for steps in _session_timings.values():
+        for step in steps:
+            total = totals[(step["name"], step["locator"])]
+            total["calls"] += 1
+            total["total"] += step["duration"]
+            total["slowest"] = max(total["slowest"], step["duration"])
+
+    slowest = sorted(totals.items(), key=lambda item: item[1]["total"], reverse=True)
+    terminalreporter.write_sep("=", f"slowest {Config.slowest_steps_count} steps")
+    for (name, locator), total in slowest[:Config.slowest_steps_count]:
+        terminalreporter.write_line(
+            f"{total['total']:8.2f}s total {total['slowest']:7.2f}s max {total['calls']:5d} calls  "
+            f"{name} {locator or ''}"
+        )
+    terminalreporter.write_line(f"Step timings written to {Config.step_timings_path}")
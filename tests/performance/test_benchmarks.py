@@ -0,0 +1,127 @@
+# tests/performance/test_benchmarks.py
+# Run with `pytest -m performance`. Add `--update-baseline` to accept the results as the new baseline.
+import asyncio
+import statistics
+
+import pytest
+
+from configs.config import Config
+from drivers.async_browser import AsyncBrowser
+from drivers.driver_factory import DriverFactory
+from locators.login_locator import LoginLocators
+from pages.login.async_login import AsyncLogin
+from pages.login.login import Login, get_credentials
+from utils.stand_in_app import StandInApp
+
+pytestmark = pytest.mark.performance
+
+
+# Define a pytest fixture serving the local stand-in app for the whole module
+@pytest.fixture(scope="module")
+def stand_in_app():
+    app = StandInApp().start()
+    yield app
+    app.stop()
+
+
+# Define a pytest fixture pointing Config.base_url and the credentials at the stand-in app
+@pytest.fixture
+def stand_in(stand_in_app, monkeypatch):
+    monkeypatch.setattr(Config, "base_url", stand_in_app.url)
+    monkeypatch.setenv("EMAIL", "manager@example.com")
+    monkeypatch.setenv("PASSWORD", "password")
+    monkeypatch.setenv("OTP", "123456")
+    stand_in_app.latency, stand_in_app.render_delay, stand_in_app.churn_interval = 0.0, 0, 0
+    get_credentials.cache_clear()  # The credentials are cached per process, pick up the stand-in ones
+    yield stand_in_app
+    get_credentials.cache_clear()
+
+
+# Define a pytest fixture that returns a Login page instance opened on the stand-in app
+@pytest.fixture
+def login_page(stand_in, setup_driver):
+    page = Login(setup_driver)
+    page.open()
+    return page
+
+
+# Benchmark for launching a browser with the configured driver factory
+def test_driver_startup(benchmark):
+    factory = DriverFactory()
+    for _ in range(Config.benchmark_rounds):
+        factory.create().quit()
+    benchmark.record("driver_startup", statistics.median(factory.launch_times))
+
+
+# Helper waits benchmarked on elements that are already there, to measure their overhead
+WAITS = {
+    "wait_for_element_visible": lambda helper: helper.wait_for_element_visible(LoginLocators.email),
+    "presence_of_element_located": lambda helper: helper.presence_of_element_located(LoginLocators.email),
+    "element_to_be_clickable": lambda helper: helper.element_to_be_clickable(LoginLocators.sign_in),
+    "wait_for_all": lambda helper: helper.wait_for_all(
+        [LoginLocators.email, LoginLocators.password, LoginLocators.sign_in]
+    ),
+    "wait_for_dom_settled": lambda helper: helper.wait_for_dom_settled(),
+}
+
+
+# Benchmarks for the overhead of the helper waits
+@pytest.mark.parametrize("name", list(WAITS))
+def test_wait_overhead(benchmark, login_page, name):
+    wait = WAITS[name]
+    wait(login_page.helper)  # Warm up: the page is rendered and the element cache is filled
+    benchmark.measure(f"wait_overhead.{name}", lambda: wait(login_page.helper), rounds=20)
+
+
+# Benchmark for opening the login page with a slow server
+def test_page_load(benchmark, stand_in, setup_driver):
+    stand_in.latency = 0.1
+    page = Login(setup_driver)
+    benchmark.measure("page_load", page.open)
+
+
+# Benchmark for waiting on a form rendered late by script
+def test_delayed_render(benchmark, stand_in, setup_driver):
+    stand_in.render_delay = 500
+    page = Login(setup_driver)
+
+    def open_and_wait():
+        page.open()
+        page.helper.wait_for_element_visible(LoginLocators.email)
+
+    benchmark.measure("delayed_render", open_and_wait)
+
+
+# Benchmark for typing into controls that keep being re-rendered (stale element references)
+def test_stale_element_churn(benchmark, stand_in, setup_driver):
+    stand_in.churn_interval = 100
+    page = Login(setup_driver)
+    page.open()
+    benchmark.measure("stale_element_churn", lambda: page.helper.wait_and_input_text(LoginLocators.email, "a"))
+
+
+# Benchmark for the full login flow, from opening the page to the authenticated page
+def test_login_end_to_end(benchmark, stand_in, setup_driver):
+    page = Login(setup_driver)
+    benchmark.measure("login_end_to_end", lambda: assert_login(page))
+
+
+def assert_login(page):
+    assert page.login(), "Login on the stand-in app failed"
+
+
+# Benchmark for logging in from many isolated tabs of one browser, driven by a single event loop
+def test_async_login_sweep(benchmark, stand_in):
+    pytest.importorskip("websockets")
+
+    async def sweep(count):
+        async with AsyncBrowser() as browser:
+            contexts = [await browser.new_context() for _ in range(count)]
+            pages = [AsyncLogin(browser.connection, context) for context in contexts]
+            return await asyncio.gather(*(page.login() for page in pages))
+
+    benchmark.measure("async_login_sweep", lambda: assert_all(asyncio.run(sweep(10))), rounds=1)
+
+
+def assert_all(results):
+    assert all(results), "Login on the stand-in app failed in some tabs"
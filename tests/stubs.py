@@ -0,0 +1,137 @@
+import base64
+import struct
+import zlib
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.remote.command import Command
+
+
+# Builds the bytes of a PNG image filled with one color, like a browser screenshot
+def png(color=(255, 255, 255), size=(4, 4)):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    width, height = size
+    rows = b"".join(b"\x00" + bytes(color) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+# Stand-in for a web element whose visibility (or staleness) the tests control
+class StubElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+        self.enabled = True
+        self.stale = False
+
+    def is_displayed(self):
+        if self.stale:
+            raise StaleElementReferenceException("The element is gone")
+        return self.displayed
+
+    def is_enabled(self):
+        if self.stale:
+            raise StaleElementReferenceException("The element is gone")
+        return self.enabled
+
+
+# Stand-in for a WebDriver with tabs. Every command goes through execute(), like on the real one, so the
+# command hooks (element caches, tab tracking, tracer...) see them; each one is kept in `commands`.
+class StubDriver:
+    def __init__(self, url="about:blank"):
+        self.url = url
+        self.capabilities = {"browserName": "stub"}
+        self.handles = ["main"]
+        self.current = "main"
+        self.alive = True
+        self.displayed = True  # Of the elements found from now on
+        self.found = []
+        self.scripts = []  # (script, callable taking the script's arguments) pairs answering execute_script
+        self.screenshot = png()
+        self.errors = {}  # Command -> exception raised when the command is sent
+        self.responses = {}  # Command -> value answered, for the commands not simulated below
+        self.commands = []
+        self.quit_calls = 0
+        self.switch_to = self
+
+    def execute(self, command, params=None):
+        if not self.alive and command != Command.QUIT:
+            raise WebDriverException("The browser is gone")
+        self.commands.append((command, params))
+        if command in self.errors:
+            raise self.errors[command]
+        params = params or {}
+        value = self.responses.get(command)
+        if command == Command.GET:
+            self.url = params["url"]
+        elif command == Command.GET_CURRENT_URL:
+            value = self.url
+        elif command == Command.W3C_GET_CURRENT_WINDOW_HANDLE:
+            value = self.current
+        elif command == Command.W3C_GET_WINDOW_HANDLES:
+            value = list(self.handles)
+        elif command == Command.SWITCH_TO_WINDOW:
+            self.current = params["handle"]
+        elif command == Command.NEW_WINDOW:
+            self.handles.append(f"tab-{len(self.handles)}")
+            value = {"handle": self.handles[-1], "type": params["type"]}
+        elif command == Command.CLOSE:
+            self.handles.remove(self.current)
+        elif command == Command.QUIT:
+            self.quit_calls += 1
+        elif command == Command.SCREENSHOT:
+            value = base64.b64encode(self.screenshot).decode("ascii")
+        elif command == Command.FIND_ELEMENT:
+            self.found.append(StubElement(self.displayed))
+            value = self.found[-1]
+        elif command in (Command.W3C_EXECUTE_SCRIPT, Command.W3C_EXECUTE_SCRIPT_ASYNC):
+            handlers = [handler for script, handler in self.scripts if script == params["script"]]
+            value = handlers[0](*params["args"]) if handlers else value
+        return {"value": value}
+
+    def commands_sent(self, *names):
+        # The names of the commands sent so far, only those listed in names if any
+        return [command for command, _ in self.commands if not names or command in names]
+
+    @property
+    def current_url(self):
+        return self.execute(Command.GET_CURRENT_URL)["value"]
+
+    @property
+    def current_window_handle(self):
+        return self.execute(Command.W3C_GET_CURRENT_WINDOW_HANDLE)["value"]
+
+    @property
+    def window_handles(self):
+        return self.execute(Command.W3C_GET_WINDOW_HANDLES)["value"]
+
+    def get(self, url):
+        self.execute(Command.GET, {"url": url})
+
+    # Reached as driver.switch_to.window, switch_to being the driver itself
+    def window(self, handle):
+        self.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+
+    def new_window(self, kind):
+        self.window(self.execute(Command.NEW_WINDOW, {"type": kind})["value"]["handle"])
+
+    def close(self):
+        self.execute(Command.CLOSE)
+
+    def quit(self):
+        self.execute(Command.QUIT)
+
+    def find_element(self, by, value):
+        return self.execute(Command.FIND_ELEMENT, {"using": by, "value": value})["value"]
+
+    def execute_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)})["value"]
+
+    def execute_async_script(self, script, *args):
+        return self.execute(Command.W3C_EXECUTE_SCRIPT_ASYNC, {"script": script, "args": list(args)})["value"]
+
+    def delete_all_cookies(self):
+        self.execute(Command.DELETE_ALL_COOKIES)
+
+    def get_screenshot_as_png(self):
+        return base64.b64decode(self.execute(Command.SCREENSHOT)["value"])
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from configs.config import Config
+from locators.login_locator import LoginLocators
+from pages.login.async_login import AsyncLogin
+from pages.login.login import get_credentials
+from utils import dom_scripts
+from utils.async_helper_functions import AsyncHelperFunctions, RemoteElement
+from utils.bidi_connection import BiDiError
+
+
+# Stand-in for a BiDiConnection: answers script.callFunction with the handler of the dom_script it runs
+class FakeConnection:
+    def __init__(self, handlers):
+        self.handlers = handlers  # (script, callable taking the deserialized arguments) pairs
+        self.sent = []
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+        if method != "script.callFunction":
+            return {}
+        for script, handler in self.handlers:
+            if script in params["functionDeclaration"]:
+                return handler(*[_argument(arg) for arg in params["arguments"]])
+        return _result(None)
+
+
+# Converts a serialized argument back to a Python value, enough for the arguments of the dom_scripts
+def _argument(value):
+    if value["type"] == "array":
+        return [_argument(item) for item in value["value"]]
+    return value.get("value")
+
+
+# Builds a script.callFunction result returning a Python value, with "node-..." strings as elements
+def _result(value):
+    return {"type": "success", "result": _remote(value)}
+
+
+def _remote(value):
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, bool):
+        return {"type": "boolean", "value": value}
+    if isinstance(value, str) and value.startswith("node-"):
+        return {"type": "node", "sharedId": value}
+    if isinstance(value, str):
+        return {"type": "string", "value": value}
+    if isinstance(value, list):
+        return {"type": "array", "value": [_remote(item) for item in value]}
+    return {"type": "object", "value": [[key, _remote(item)] for key, item in value.items()]}
+
+
+# Returns a handler answering with each of the outcomes in turn (then the last one), raising exceptions
+def _sequence(*outcomes):
+    remaining = list(outcomes)
+
+    def handler(*args):
+        outcome = remaining.pop(0) if len(remaining) > 1 else remaining[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return handler
+
+
+# Keep the process-wide circuit breaker out of the failures provoked here
+@pytest.fixture(autouse=True)
+def no_circuit_breaker(monkeypatch):
+    monkeypatch.setattr(Config, "circuit_breaker_enabled", False)
+
+
+def _helper(*handlers):
+    helper = AsyncHelperFunctions(FakeConnection(list(handlers)), "context-1")
+    helper.poll_frequency = 0.01
+    return helper
+
+
+# Test case for navigating the browsing context with the wait of the page load strategy
+def test_open_url_navigates_the_context(monkeypatch):
+    monkeypatch.setattr(Config, "page_load_strategy", "eager")
+    helper = _helper()
+    asyncio.run(helper.open_url("https://example.com/"))
+    assert helper.connection.sent == [("browsingContext.navigate", {
+        "context": "context-1", "url": "https://example.com/", "wait": "interactive",
+    })]
+
+
+# Test case for polling again when the element went stale or a navigation unloaded the document
+@pytest.mark.parametrize("error", [
+    BiDiError("no such node", "The node is gone"),
+    BiDiError("unknown error", "Execution context was destroyed."),
+])
+def test_wait_polls_again_after_transient_errors(error):
+    helper = _helper((dom_scripts.MATCH_CONDITIONS, _sequence(error, _result([None]), _result(["node-1"]))))
+    element = asyncio.run(helper.wait_for_element_visible(("id", "email"), timeout=5))
+    assert isinstance(element, RemoteElement) and element.shared_id == "node-1"
+
+
+# Test case for raising an error of the script itself instead of polling until the timeout
+def test_wait_raises_script_errors():
+    exception = {"type": "exception", "exceptionDetails": {"text": "SyntaxError: unexpected token"}}
+    helper = _helper((dom_scripts.MATCH_CONDITIONS, _sequence(exception, _result(["node-1"]))))
+    with pytest.raises(JavascriptException, match="SyntaxError"):
+        asyncio.run(helper.wait_for_element_visible(("css selector", "#email["), timeout=5))
+
+
+# Test case for timing out when the element never appears
+def test_wait_times_out():
+    helper = _helper((dom_scripts.MATCH_CONDITIONS, _sequence(_result([None]))))
+    with pytest.raises(TimeoutException):
+        asyncio.run(helper.wait_for_element_visible(("id", "email"), timeout=0.05))
+
+
+# Define a pytest fixture providing the credentials of the login tests
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("EMAIL", "manager@example.com")
+    monkeypatch.setenv("PASSWORD", "password")
+    monkeypatch.setenv("OTP", "123456")
+    get_credentials.cache_clear()  # The credentials are cached per process
+    yield get_credentials()
+    get_credentials.cache_clear()
+
+
+# Test case for the full login flow, filling each step with one script and clicking the submit controls
+@pytest.mark.parametrize("outcome, logged_in", [([True, None], True), ([None, "node-error"], False)])
+def test_async_login(credentials, outcome, logged_in):
+    filled = _result({"ready": True, "errors": [None, None], "submit": "node-submit"})
+    connection = FakeConnection([
+        (dom_scripts.FILL_FORM, _sequence(filled)),
+        (dom_scripts.MATCH_CONDITIONS, _sequence(_result(outcome))),
+    ])
+    login = AsyncLogin(connection, "context-1")
+    assert asyncio.run(login.login()) is logged_in
+
+    methods = [method for method, _ in connection.sent]
+    assert methods[0] == "browsingContext.navigate"
+    assert methods.count("input.performActions") == 2  # Sign in, then verify
+    forms = [params["arguments"] for method, params in connection.sent
+             if method == "script.callFunction" and dom_scripts.FILL_FORM in params["functionDeclaration"]]
+    assert [_argument(arguments[0]) for arguments in forms] == [
+        [[*LoginLocators.email, credentials["email"]], [*LoginLocators.password, credentials["password"]]],
+        [[*LoginLocators.otp, credentials["otp"]]],
+    ]
+
+
+# Test case for reporting a login whose form never becomes ready as failed instead of raising
+def test_async_login_fails_when_form_is_not_ready(credentials):
+    not_ready = _result({"ready": False, "errors": ["disabled", None], "submit": None})
+    connection = FakeConnection([(dom_scripts.FILL_FORM, _sequence(not_ready))])
+    login = AsyncLogin(connection, "context-1")
+    login.helper.default_timeout = 0.05
+    assert asyncio.run(login.login()) is False
+
+
+# Test case for telling a restored session from one redirected to the login page, whichever comes first
+@pytest.mark.parametrize("outcomes, logged_in", [
+    ([[None, None], [True, None]], True),  # Lands on the authenticated page after a while
+    ([[None, None], [None, "node-email"]], False),  # Redirected to the login page after a request
+    ([[None, None]], False),  # Neither page appears
+])
+def test_async_is_logged_in(outcomes, logged_in):
+    connection = FakeConnection([(dom_scripts.MATCH_CONDITIONS, _sequence(*map(_result, outcomes)))])
+    login = AsyncLogin(connection, "context-1")
+    login.helper.default_timeout = 0.2
+    login.helper.poll_frequency = 0.01
+    assert asyncio.run(login.is_logged_in()) is logged_in
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils import bidi_connection
+from utils.bidi_connection import BiDiConnection, BiDiError
+
+
+# Stand-in for the WebSocketConnection Selenium keeps for a driver: answers send_cmd with the reply of its handler
+class FakeSeleniumConnection:
+    def __init__(self, handler):
+        self.handler = handler
+        self.callbacks = {}
+        self.sent = []
+        self.threads = set()
+
+    def send_cmd(self, method, params):
+        self.sent.append((method, params))
+        self.threads.add(threading.get_ident())
+        return self.handler(method, params)
+
+    # Like Selenium, calls the callbacks of an event from a thread of their own
+    def emit(self, event, params):
+        threads = [threading.Thread(target=callback, args=(params,)) for callback in self.callbacks.get(event, [])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+# Stand-in for a driver whose BiDi connection Selenium opens on first use
+class FakeDriver:
+    def __init__(self, connection):
+        self.connection = connection
+        self._websocket_connection = None
+
+    @property
+    def script(self):
+        self._websocket_connection = self.connection
+        return object()
+
+
+# Run the connections as without the websockets package
+@pytest.fixture(autouse=True)
+def no_websockets(monkeypatch):
+    monkeypatch.setattr(bidi_connection, "websockets", None)
+
+
+# Test case for sending the commands through the driver's connection, off the event loop thread
+def test_commands_go_through_the_driver_connection():
+    selenium_connection = FakeSeleniumConnection(
+        lambda method, params: {"id": 1, "type": "success", "result": {"context": "context-2"}}
+    )
+
+    async def run():
+        connection = await BiDiConnection("ws://browser/session/1", FakeDriver(selenium_connection)).connect()
+        result = await connection.send("browsingContext.create", {"type": "tab"})
+        await connection.close()
+        return result
+
+    assert asyncio.run(run()) == {"context": "context-2"}
+    assert selenium_connection.sent == [("browsingContext.create", {"type": "tab"})]
+    assert threading.get_ident() not in selenium_connection.threads
+
+
+# Test case for raising the errors of the browser as BiDiError, with their code
+def test_errors_are_raised_as_bidi_errors():
+    selenium_connection = FakeSeleniumConnection(
+        lambda method, params: {"id": 1, "type": "error", "error": "no such node", "message": "The node is gone"}
+    )
+
+    async def run():
+        connection = await BiDiConnection("ws://browser/session/1", FakeDriver(selenium_connection)).connect()
+        with pytest.raises(BiDiError, match="The node is gone") as error:
+            await connection.send("script.callFunction")
+        return error.value.error
+
+    assert asyncio.run(run()) == "no such node"
+
+
+# Test case for dispatching the events Selenium receives on the event loop, until the connection is closed
+def test_events_are_dispatched_on_the_event_loop():
+    selenium_connection = FakeSeleniumConnection(lambda method, params: {"type": "success", "result": {}})
+    received = []
+
+    async def run():
+        connection = await BiDiConnection("ws://browser/session/1", FakeDriver(selenium_connection)).connect()
+        loop_thread = threading.get_ident()
+        connection.add_listener("log.entryAdded", lambda params: received.append((params, threading.get_ident())))
+        connection.add_listener("log.entryAdded", lambda params: received.append((params, None)))
+        await asyncio.to_thread(selenium_connection.emit, "log.entryAdded", {"text": "hello"})
+        await asyncio.sleep(0)  # Let the loop run the dispatch
+        await connection.close()
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    assert received == [({"text": "hello"}, loop_thread), ({"text": "hello"}, None)]
+    assert selenium_connection.callbacks == {"log.entryAdded": []}  # Selenium's connection stays with the driver
+
+
+# Test case for the websockets package being needed without a driver to share the connection of
+def test_websockets_are_needed_without_a_driver():
+    with pytest.raises(ImportError, match="websockets"):
+        asyncio.run(BiDiConnection("ws://browser/session/1").connect())
@@ -0,0 +1,137 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from configs.config import Config
+from tests.stubs import StubDriver
+from utils import helper_functions
+from utils.circuit_breaker import CircuitBreaker, TargetUnavailableError, is_target_failure
+from utils.helper_functions import HelperFunctions
+
+
+# Returns a breaker whose probes answer from `health` (a list of booleans, the last one repeated)
+def _breaker(health, threshold=2, reset_timeout=30):
+    breaker = CircuitBreaker(url="http://target.invalid/", failure_threshold=threshold, reset_timeout=reset_timeout)
+    breaker.probes = 0
+
+    def probe():
+        healthy = health[min(breaker.probes, len(health) - 1)]
+        breaker.probes += 1
+        return healthy, None if healthy else "http://target.invalid/ is unreachable"
+
+    breaker.probe = probe
+    return breaker
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(Config, "circuit_breaker_enabled", True)
+
+
+# Test case for opening only once the failures reach the threshold and the probe fails
+def test_opens_after_threshold_when_target_is_down():
+    breaker = _breaker([False])
+    breaker.record_failure(TimeoutException())
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.probes == 0
+    breaker.record_failure(TimeoutException())
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(TargetUnavailableError, match="2 consecutive failures"):
+        breaker.before_call()
+
+
+# Test case for staying closed when the target answers: the failures are the tests' own
+def test_stays_closed_when_probe_succeeds():
+    breaker = _breaker([True])
+    breaker.record_failure(TimeoutException())
+    breaker.record_failure(TimeoutException())
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.consecutive_failures == 0
+    breaker.before_call()
+
+
+# Test case for a success resetting the count of consecutive failures
+def test_success_resets_failures():
+    breaker = _breaker([False])
+    breaker.record_failure(TimeoutException())
+    breaker.record_success()
+    breaker.record_failure(TimeoutException())
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.probes == 0
+
+
+# Test case for probing again after the reset timeout, and closing once the target recovered
+def test_closes_after_reset_timeout_when_target_recovered(monkeypatch):
+    breaker = _breaker([False, False, True], threshold=1, reset_timeout=30)
+    breaker.record_failure(TimeoutException())
+    with pytest.raises(TargetUnavailableError):
+        breaker.before_call()  # Within the reset timeout, no probe
+    assert breaker.probes == 1
+
+    breaker._opened_at -= 31
+    with pytest.raises(TargetUnavailableError):
+        breaker.before_call()  # Still down, opened again for another reset timeout
+    assert breaker.probes == 2
+
+    breaker._opened_at -= 31
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.probes == 3
+
+
+# Test case for counting only the errors telling the target is unreachable
+@pytest.mark.parametrize("error, counted", [
+    (TimeoutException("timeout: Timed out receiving message from renderer"), True),
+    (WebDriverException("unknown error: net::ERR_CONNECTION_REFUSED"), True),
+    (WebDriverException("Reached error page: about:neterror?e=connectionFailure"), True),
+    (WebDriverException("invalid argument: 'url' must be a string"), False),
+    (WebDriverException("invalid session id"), False),
+])
+def test_is_target_failure(error, counted):
+    assert is_target_failure(error) is counted
+
+
+# Test case for open_url counting the navigation errors of the target only, and failing fast once open
+def test_open_url_counts_only_target_failures(monkeypatch):
+    breaker = _breaker([False], threshold=1)
+    monkeypatch.setattr(helper_functions, "target_breaker", breaker)
+    driver = StubDriver()
+    helper = HelperFunctions(driver)
+
+    driver.errors[Command.GET] = WebDriverException("invalid argument: 'url' must be a string")
+    with pytest.raises(WebDriverException):
+        helper.open_url("not a url")
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    driver.errors[Command.GET] = WebDriverException("unknown error: net::ERR_CONNECTION_REFUSED")
+    with pytest.raises(WebDriverException):
+        helper.open_url("https://example.com/")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    sent = len(driver.commands)
+    with pytest.raises(TargetUnavailableError):
+        helper.open_url("https://example.com/")
+    assert len(driver.commands) == sent  # Not even sent to the browser
+
+
+# Test case for probing a real HTTP endpoint: server errors are unhealthy, client errors still mean it answers
+@pytest.mark.parametrize("status, healthy", [(200, True), (404, True), (503, False)])
+def test_probe_reads_the_status(monkeypatch, status, healthy):
+    for name in ("http_proxy", "HTTP_PROXY"):
+        monkeypatch.delenv(name, raising=False)  # Straight to the local server
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        breaker = CircuitBreaker(url=f"http://127.0.0.1:{server.server_port}/health", probe_timeout=2)
+        assert breaker.probe()[0] is healthy
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from configs.config import Config
+from drivers.command_hooks import install_command_hooks
+from tests.stubs import StubDriver
+from utils import command_tracer, dom_scripts
+from utils.command_tracer import CommandTracer
+
+SECRET = "s3cr3t-passw0rd"
+GET_ATTRIBUTE_ATOM = "/* getAttribute */return (function(){ ... }).apply(null, arguments);"
+
+
+# Define a pytest fixture tracing the commands of a hooked stub driver, as plugins/command_trace.py does
+@pytest.fixture
+def traced_driver(monkeypatch):
+    monkeypatch.setattr(Config, "trace_redact_input", True)
+    driver = install_command_hooks(StubDriver("https://example.com/login"))
+    command_tracer.start_tracing("tests/test_login.py::test_login")
+    yield driver
+    command_tracer.stop_tracing()
+
+
+# Returns the trace file written by flush() as a dict, and its raw text
+def _flush(tmp_path, tracer):
+    path = tracer.flush(str(tmp_path / "traces" / "trace.json"), reason="AssertionError")
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    return json.loads(text), text
+
+
+# Test case for keeping only the last Config.trace_buffer_size commands, while counting all of them
+def test_buffer_keeps_the_last_commands(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "trace_buffer_size", 3)
+    tracer = CommandTracer("test_id")
+    driver = StubDriver()
+    for index in range(5):
+        tracer.record(driver, Command.GET, {"url": f"https://example.com/{index}"}, {"value": None}, 0.01, None)
+    trace, _ = _flush(tmp_path, tracer)
+    assert trace["commands_sent"] == 5 and trace["commands_kept"] == 3
+    assert [command["params"]["url"] for command in trace["commands"]] == [
+        "https://example.com/2", "https://example.com/3", "https://example.com/4",
+    ]
+
+
+# Test case for never writing the text typed into fields, directly or through fill_form
+def test_typed_text_is_redacted(tmp_path, traced_driver):
+    traced_driver.execute(Command.SEND_KEYS_TO_ELEMENT, {"id": "password", "text": SECRET, "value": list(SECRET)})
+    traced_driver.execute_script(dom_scripts.FILL_FORM, [["id", "password", SECRET]], ["id", "sign-in"])
+    trace, text = _flush(tmp_path, command_tracer.current_tracer())
+    assert SECRET not in text
+    send_keys, fill_form = trace["commands"]
+    assert send_keys["params"]["text"] == f"<{len(SECRET)} characters>"
+    assert fill_form["params"]["script"] == "<dom_scripts.FILL_FORM>"
+    assert fill_form["params"]["args"] == [[["id", "password", f"<{len(SECRET)} characters>"]], ["id", "sign-in"]]
+
+
+# Test case for never writing the value of a field read back, through each of the ways Selenium reads it
+@pytest.mark.parametrize("command, params", [
+    (Command.GET_ELEMENT_PROPERTY, {"id": "password", "name": "value"}),
+    (Command.GET_ELEMENT_ATTRIBUTE, {"id": "password", "name": "value"}),
+    (Command.W3C_EXECUTE_SCRIPT, {"script": GET_ATTRIBUTE_ATOM, "args": [{"id": "password"}, "value"]}),
+])
+def test_value_read_back_is_redacted(tmp_path, traced_driver, command, params):
+    traced_driver.responses[command] = SECRET
+    traced_driver.execute(command, params)
+    trace, text = _flush(tmp_path, command_tracer.current_tracer())
+    assert SECRET not in text
+    assert trace["commands"][0]["response"] == f"<{len(SECRET)} characters>"
+
+
+# Test case for keeping the other values read back, which tell what the test saw
+def test_other_properties_are_kept(tmp_path, traced_driver):
+    traced_driver.responses[Command.GET_ELEMENT_PROPERTY] = "alert alert-danger"
+    traced_driver.execute(Command.GET_ELEMENT_PROPERTY, {"id": "error", "name": "className"})
+    trace, _ = _flush(tmp_path, command_tracer.current_tracer())
+    assert trace["commands"][0]["response"] == "alert alert-danger"
+
+
+# Test case for still writing the trace when the browser cannot tell its URL any more, e.g. after a crash
+def test_flush_writes_when_current_url_fails(tmp_path, traced_driver):
+    traced_driver.get("https://example.com/mystore")
+    traced_driver.errors[Command.GET_CURRENT_URL] = WebDriverException("invalid session id")
+    trace, _ = _flush(tmp_path, command_tracer.current_tracer())
+    assert trace["current_url"] == ["unavailable: WebDriverException"]
+    assert trace["reason"] == "AssertionError" and trace["commands"][0]["url"] == "https://example.com/mystore"
@@ -0,0 +1,72 @@
+import os
+import socket
+import time
+
+import pytest
+
+from configs.config import Config
+from utils.data_pool import DataPool, DataPoolExhaustedError
+
+
+# Define a pytest fixture running the data pools as if outside pytest-xdist
+@pytest.fixture(autouse=True)
+def single_worker(monkeypatch):
+    monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+    monkeypatch.delenv("PYTEST_XDIST_WORKER_COUNT", raising=False)
+
+
+# Test case for generating a pool once and handing out each record once
+def test_generate_and_take(tmp_path):
+    pool = DataPool("invalid_inputs", 5, str(tmp_path)).open()
+    try:
+        records = [pool.take() for _ in range(5)]
+        assert len(pool) == 0
+        assert records == [pool.get(index) for index in range(5)]
+        assert set(records[0]) == {"email", "password", "phone", "zip_code"}
+        with pytest.raises(DataPoolExhaustedError):
+            pool.take()
+    finally:
+        pool.close()
+
+    modified = os.stat(pool.path).st_mtime_ns
+    DataPool("invalid_inputs", 5, str(tmp_path)).open().close()
+    assert os.stat(pool.path).st_mtime_ns == modified  # Not generated again
+
+
+# Test case for sharing the records out between workers without overlap
+def test_workers_get_disjoint_shares(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER_COUNT", "2")
+    shares = []
+    for worker_id in ("gw0", "gw1"):
+        monkeypatch.setenv("PYTEST_XDIST_WORKER", worker_id)
+        pool = DataPool("invalid_inputs", 5, str(tmp_path)).open()
+        shares.append([pool.take()["email"] for _ in range(len(pool))])
+        pool.close()
+    assert [len(share) for share in shares] == [3, 2]
+    assert not set(shares[0]) & set(shares[1])
+
+
+# Test case for taking over the lock of a generator that died
+@pytest.mark.parametrize("owner, age", [
+    (f"{socket.gethostname()} 999999999", 0),  # Its process is gone
+    ("other-host 1", 3600),  # No progress for an hour
+])
+def test_stale_lock_is_taken_over(tmp_path, owner, age):
+    pool = DataPool("invalid_inputs", 5, str(tmp_path))
+    lock = pool.path + ".lock"
+    with open(lock, "w", encoding="utf-8") as file:
+        file.write(owner)
+    os.utime(lock, (time.time() - age, time.time() - age))
+    pool.open().close()
+    assert os.path.exists(pool.path) and not os.path.exists(lock)
+
+
+# Test case for giving up, instead of waiting forever, on a lock that is held but makes no progress
+def test_live_lock_times_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "data_pool_lock_timeout", 0.3)
+    pool = DataPool("invalid_inputs", 5, str(tmp_path))
+    with open(pool.path + ".lock", "w", encoding="utf-8") as file:
+        file.write(f"{socket.gethostname()} {os.getpid()}")  # This process, alive
+    with pytest.raises(TimeoutError):
+        pool.generate()
+    assert not os.path.exists(pool.path)
@@ -0,0 +1,108 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from configs.config import Config
+from drivers.driver_pool import DriverPool
+from tests.stubs import StubDriver
+
+RESET_COMMANDS = (Command.W3C_EXECUTE_SCRIPT, Command.DELETE_ALL_COOKIES, Command.GET)
+
+
+# Stand-in for DriverFactory().create, failing the launches listed in `failures` (1-based)
+class StubFactory:
+    def __init__(self, failures=()):
+        self.failures = set(failures)
+        self.launches = 0
+        self.drivers = []
+
+    def __call__(self):
+        self.launches += 1
+        if self.launches in self.failures:
+            raise WebDriverException("Unable to launch the browser")
+        driver = StubDriver()
+        self.drivers.append(driver)
+        return driver
+
+
+# Test case for handing the released browser out again, reset, instead of launching a new one
+def test_release_resets_and_reuses_the_browser():
+    factory = StubFactory()
+    pool = DriverPool(size=2, max_uses=5, factory=factory)
+    driver = pool.lease()
+    driver.handles.append("popup")
+    pool.release(driver)
+    assert driver.handles == ["main"]  # Extra windows closed
+    assert driver.commands_sent(*RESET_COMMANDS) == list(RESET_COMMANDS) and driver.url == "about:blank"
+    assert pool.lease() is driver
+    assert factory.launches == 1 and pool.stats["leases"] == 2
+
+
+# Test case for quitting a browser that is broken or used up instead of handing it out again
+@pytest.mark.parametrize("broken, max_uses", [(True, 5), (False, 1)])
+def test_release_recycles_broken_or_used_up_browsers(broken, max_uses):
+    factory = StubFactory()
+    pool = DriverPool(size=1, max_uses=max_uses, factory=factory)
+    driver = pool.lease()
+    pool.release(driver, broken=broken)
+    assert driver.quit_calls == 1 and pool.stats["recycled"] == 1
+    assert pool.lease() is not driver
+    assert factory.launches == 2
+
+
+# Test case for replacing a browser that crashed while idle, counted as recycled
+def test_lease_discards_dead_idle_browsers():
+    factory = StubFactory()
+    pool = DriverPool(size=1, factory=factory)
+    driver = pool.lease()
+    pool.release(driver)
+    driver.alive = False
+    assert pool.lease() is not driver
+    assert driver.quit_calls == 1 and pool.stats["recycled"] == 1
+
+
+# Test case for handing the browser of a group back to the same group with its session, reset for another one
+def test_lease_keeps_the_session_within_a_group():
+    pool = DriverPool(size=2, factory=StubFactory())
+    login_driver, other_driver = pool.lease(affinity="authenticated_driver"), pool.lease(affinity="base_page")
+    login_driver.handles.append("popup")
+    pool.release(login_driver)
+    pool.release(other_driver)  # Last in, so handed out first without an affinity
+    assert login_driver.handles == ["main"]  # Extra windows closed, nothing else
+    assert login_driver.commands_sent(*RESET_COMMANDS) == []
+
+    assert pool.lease(affinity="authenticated_driver") is login_driver
+    assert login_driver.commands_sent(*RESET_COMMANDS) == [] and pool.stats["affinity_hits"] == 1
+    assert pool.lease(affinity="login_page") is other_driver
+    assert other_driver.commands_sent(*RESET_COMMANDS) == list(RESET_COMMANDS)  # Reset for the new group
+    assert pool.stats["affinity_hits"] == 1
+
+
+# Test case for resetting the browser of a group before a test without a group gets it
+def test_lease_resets_the_session_of_another_group():
+    pool = DriverPool(size=1, factory=StubFactory())
+    driver = pool.lease(affinity="authenticated_driver")
+    pool.release(driver)
+    assert pool.lease() is driver
+    assert driver.commands_sent(*RESET_COMMANDS) == list(RESET_COMMANDS) and driver.url == "about:blank"
+    pool.release(driver)
+    assert pool.lease(affinity="authenticated_driver") is driver
+    assert driver.commands_sent(*RESET_COMMANDS) == list(RESET_COMMANDS) * 2  # Released without a group
+    assert pool.stats["affinity_hits"] == 0
+
+
+# Test case for keeping the browsers that started, and freeing the other slots, when a warm start fails
+@pytest.mark.parametrize("warm_start", [True, False])
+def test_start_failure_keeps_started_browsers_and_frees_slots(monkeypatch, warm_start):
+    monkeypatch.setattr(Config, "warm_start", warm_start)
+    factory = StubFactory(failures=[2])
+    pool = DriverPool(size=3, factory=factory)
+    with pytest.raises(WebDriverException):
+        pool.start()
+    started = len(factory.drivers)
+    assert pool.stats["spawned"] == started and pool._idle.qsize() == started
+
+    # Every slot can still be filled, by the started browsers first
+    leased = [pool.lease(timeout=1) for _ in range(3)]
+    assert leased[:started] == list(reversed(factory.drivers[:started]))
+    assert len({id(driver) for driver in leased}) == 3
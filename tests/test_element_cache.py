@@ -0,0 +1,64 @@
+from drivers.command_hooks import install_command_hooks
+from drivers.tab_context import TabContext
+from tests.stubs import StubDriver, StubElement
+from utils.element_cache import ElementCache
+from utils.helper_functions import HelperFunctions
+
+LOCATOR = ("id", "email")
+
+
+# Test case for counting a lookup as a hit only when the cached element passed the check
+def test_hits_count_only_usable_elements():
+    driver = StubDriver("https://example.com/")
+    helper = HelperFunctions(driver)
+    condition = helper._cached_condition(LOCATOR, helper._is_visible)
+    assert condition(driver) is driver.found[0]
+    assert condition(driver) is driver.found[0]
+    assert helper.element_cache.stats()["hits"] == 1
+
+    driver.found[0].stale = True
+    assert condition(driver) is driver.found[1]  # Resolved again in the same poll
+    driver.found[1].displayed = driver.displayed = False
+    assert condition(driver) is False
+    assert helper.element_cache.stats() == {"hits": 1, "misses": 3, "invalidations": 2, "size": 1}
+
+
+# Test case for clearing the cache when the driver navigates, whoever sends the command
+def test_navigation_clears_the_cache():
+    driver = install_command_hooks(StubDriver("https://example.com/"))
+    cache = ElementCache(driver)
+    cache.put(LOCATOR, StubElement())
+    driver.get("https://example.com/other")  # Not through the helpers, e.g. SessionSnapshot.restore
+    assert cache.get(LOCATOR) is None and cache.invalidations == 1
+
+
+# Test case for clearing the cache when a command reports a new URL, e.g. after a click navigated
+def test_url_change_clears_the_cache():
+    driver = install_command_hooks(StubDriver("https://example.com/"))
+    cache = ElementCache(driver)
+    driver.current_url
+    cache.put(LOCATOR, StubElement())
+    driver.current_url
+    assert cache.get(LOCATOR) is not None  # Same document
+    driver.url = "https://example.com/mystore"
+    driver.current_url
+    assert cache.get(LOCATOR) is None
+
+
+# Test case for keeping the elements of every tab across switches, dropping only those of the tab that navigated
+def test_tabs_keep_their_elements():
+    driver = StubDriver("https://example.com/")
+    with TabContext(driver) as first, TabContext(driver) as second:
+        first_cache, second_cache = ElementCache(first.driver), ElementCache(second.driver)
+        first_element, second_element = StubElement(), StubElement()
+        first.driver.current_window_handle  # Switches to the first tab
+        first_cache.put(LOCATOR, first_element)
+        second.driver.current_window_handle  # Switches to the second tab, for both caches
+        second_cache.put(LOCATOR, second_element)
+        assert second_cache.get(LOCATOR) is second_element and first_cache.get(LOCATOR) is None
+
+        first.driver.get("https://example.com/other")  # Only the first tab navigates
+        second.driver.current_window_handle
+        assert second_cache.get(LOCATOR) is second_element
+        assert first_cache.invalidations == 1 and second_cache.invalidations == 0
+    assert second_cache.stats()["size"] == 0  # Dropped when its tab was closed
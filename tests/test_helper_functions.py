@@ -0,0 +1,74 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from configs.config import Config
+from tests.stubs import StubDriver
+from utils.dom_scripts import MATCH_CONDITIONS, URL_CONTAINS
+from utils.helper_functions import HelperFunctions
+
+EMAIL = "id", "email"
+ALERT = "css selector", ".alert"
+LANDED = URL_CONTAINS, "mystore"
+
+
+# Keep the process-wide circuit breaker out of the timeouts provoked here
+@pytest.fixture(autouse=True)
+def no_circuit_breaker(monkeypatch):
+    monkeypatch.setattr(Config, "circuit_breaker_enabled", False)
+
+
+# Returns a helper on a stub driver answering MATCH_CONDITIONS with each of the outcomes in turn (then the last
+# one), and the list of the arguments the script was run with
+def _helper(*outcomes):
+    driver, calls, remaining = StubDriver(), [], list(outcomes)
+
+    def match(conditions, visible):
+        calls.append((conditions, visible))
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    driver.scripts.append((MATCH_CONDITIONS, match))
+    return HelperFunctions(driver), calls
+
+
+# Test case for waiting until every condition matches, in one script per poll, results in the order of the locators
+def test_wait_for_all_returns_the_matches_in_order():
+    helper, calls = _helper(["element-email", None, True], ["element-email", "element-alert", True])
+    assert helper.wait_for_all([EMAIL, ALERT, LANDED], timeout=5) == ["element-email", "element-alert", True]
+    assert calls == [([list(EMAIL), list(ALERT), list(LANDED)], True)] * 2
+
+
+# Test case for returning the first locator of the list that matched, not the first one to appear
+@pytest.mark.parametrize("matches, expected", [
+    ([None, "element-alert", True], (ALERT, "element-alert")),
+    (["element-email", "element-alert", None], (EMAIL, "element-email")),
+    ([None, None, True], (LANDED, True)),
+])
+def test_wait_for_any_returns_the_first_match_of_the_list(matches, expected):
+    helper, calls = _helper(matches)
+    assert helper.wait_for_any([EMAIL, ALERT, LANDED], timeout=5, visible=False) == expected
+    assert calls == [([list(EMAIL), list(ALERT), list(LANDED)], False)]
+
+
+# Test case for telling the success outcome from the error one, the success winning when both are there
+@pytest.mark.parametrize("matches, expected", [
+    ([True, None], (LANDED, True)),
+    ([None, "element-alert"], (ALERT, "element-alert")),
+    ([True, "element-alert"], (LANDED, True)),
+])
+def test_wait_for_first_of(matches, expected):
+    helper, _ = _helper(matches)
+    assert helper.wait_for_first_of(LANDED, ALERT, timeout=5) == expected
+
+
+# Test case for naming every locator in the message of a timeout
+@pytest.mark.parametrize("method, matches, message", [
+    ("wait_for_all", ["element-email", None], "Not all elements located by"),
+    ("wait_for_any", [None, None], "None of the elements located by"),
+])
+def test_wait_for_conditions_times_out(method, matches, message):
+    helper, _ = _helper(matches)
+    with pytest.raises(TimeoutException) as error:
+        getattr(helper, method)([EMAIL, LANDED], timeout=0.05)
+    assert error.value.msg == (
+        f"{message} [('id', 'email'), ('url contains', 'mystore')] matched after timeout of 0.05 seconds."
+    )
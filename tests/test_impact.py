@@ -0,0 +1,144 @@
+import pathlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from configs.config import Config
+from plugins import impact
+
+
+# Stand-in for the pytest cache
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+# Stand-in for the pytest config of a run with the impact options
+class FakeConfig:
+    def __init__(self, root, cache, **options):
+        self.rootpath = pathlib.Path(root)
+        self.cache = cache
+        self.options = options
+        self.deselected = []
+        self.hook = SimpleNamespace(pytest_deselected=lambda items: self.deselected.extend(items))
+
+    def getoption(self, name):
+        return self.options.get(name, False)
+
+
+# Define a pytest fixture laying out a project with two page objects and one locators file
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    package = f"locators_{tmp_path.name}"  # Imported by the plugin, so unique per test
+    for path, content in {
+        "conftest.py": "# conftest\n",
+        "pages/login.py": "# Login page\n",
+        "pages/other.py": "# Other page\n",
+        f"{package}/__init__.py": "",
+        f"{package}/login_locator.py": (
+            "class LoginLocators:\n    email = ('id', 'email')\n    error_message = ('css selector', '.alert')\n"
+        ),
+        "tests/test_login.py": "# Tests\n",
+    }.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(content)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(Config, "impact_global_paths", ["conftest.py"])
+    monkeypatch.setattr(Config, "impact_locator_paths", [package])
+    monkeypatch.setattr(impact, "_session_dependencies", {})
+    monkeypatch.setattr(impact, "_session_failed", set())
+    yield tmp_path, FakeCache(), package
+    sys.modules.pop(f"{package}.login_locator", None)
+    sys.modules.pop(package, None)
+
+
+# Records a green run of the tests, each with the page object file and locators it used, as a run would
+def _record(root, cache, tests):
+    for nodeid, (page, locators) in tests.items():
+        impact._session_dependencies[nodeid] = {
+            "files": sorted([page, "tests/test_login.py"]), "methods": [], "locators": locators,
+        }
+    impact.pytest_sessionfinish(SimpleNamespace(config=FakeConfig(root, cache)))
+    impact._session_dependencies.clear()
+
+
+# Returns the node ids selected by --impacted-only (or reused by --reuse-results) among the given ones
+def _select(root, cache, nodeids, **options):
+    items = [SimpleNamespace(nodeid=nodeid, stash={}) for nodeid in nodeids]
+    config = FakeConfig(root, cache, **(options or {"impacted_only": True}))
+    impact.pytest_collection_modifyitems(config, items)
+    return [item.nodeid for item in items], [item.nodeid for item in config.deselected]
+
+
+TESTS = {
+    "tests/test_login.py::test_email": ("pages/login.py", [["id", "email"]]),
+    "tests/test_login.py::test_error": ("pages/login.py", [["css selector", ".alert"]]),
+    "tests/test_login.py::test_other": ("pages/other.py", []),
+}
+
+
+# Test case for deselecting every test when nothing changed since their green run
+def test_nothing_changed_deselects_everything(project):
+    root, cache, _ = project
+    _record(root, cache, TESTS)
+    assert _select(root, cache, TESTS) == ([], list(TESTS))
+
+
+# Test case for selecting the users of a page object that changed, and only them
+def test_changed_page_object_selects_its_users(project):
+    root, cache, _ = project
+    _record(root, cache, TESTS)
+    (root / "pages/other.py").write_text("# Other page, changed\n")
+    assert _select(root, cache, TESTS)[0] == ["tests/test_login.py::test_other"]
+
+
+# Test case for selecting only the tests that used a changed locator, not every user of its file
+def test_changed_locator_selects_only_its_users(project):
+    root, cache, package = project
+    _record(root, cache, TESTS)
+    sys.modules[f"{package}.login_locator"].LoginLocators.email = ("id", "user-email")  # As edited and reloaded
+    assert _select(root, cache, TESTS)[0] == ["tests/test_login.py::test_email"]
+
+
+# Test case for always selecting the tests without a record: new, or failed since their last green run
+def test_tests_without_record_are_selected(project):
+    root, cache, _ = project
+    _record(root, cache, TESTS)
+    impact._session_failed.add("tests/test_login.py::test_error")
+    _record(root, cache, {})
+    selected, _ = _select(root, cache, [*TESTS, "tests/test_login.py::test_new"])
+    assert selected == ["tests/test_login.py::test_error", "tests/test_login.py::test_new"]
+
+
+# Test case for running everything when the usage map is missing, unreadable, outdated or older than a global change
+@pytest.mark.parametrize("damage", ["missing", "unreadable", "old format", "global change"])
+def test_stale_or_missing_map_runs_everything(project, damage):
+    root, cache, _ = project
+    _record(root, cache, TESTS)
+    if damage == "missing":
+        cache.values.clear()
+    elif damage == "unreadable":
+        cache.set(impact.MAP_KEY, ["not", "a", "map"])
+    elif damage == "old format":
+        for entry in cache.get(impact.MAP_KEY, {}).values():
+            entry["locators"] = list(entry["locators"])
+    else:
+        (root / "conftest.py").write_text("# conftest, changed\n")
+    assert _select(root, cache, TESTS) == (list(TESTS), [])
+
+
+# Test case for keeping the unaffected tests with their record, to report them as passed, with --reuse-results
+def test_reuse_results_keeps_unaffected_tests(project):
+    root, cache, _ = project
+    _record(root, cache, TESTS)
+    items = [SimpleNamespace(nodeid=nodeid, stash={}) for nodeid in TESTS]
+    impact.pytest_collection_modifyitems(FakeConfig(root, cache, reuse_results=True), items)
+    assert len(items) == 3 and all(impact.reused_key in item.stash for item in items)
+    assert items[0].stash[impact.reused_key]["locators"] == {"LoginLocators.email": ["id", "email"]}
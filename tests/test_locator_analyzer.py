@@ -0,0 +1,103 @@
+import pickle
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from tests.stubs import StubDriver
+from utils.dom_scripts import MEASURE_LOCATORS
+from utils.locator_analyzer import OptimizedLocator, analyze, apply, optimize_locators, xpath_to_css
+
+EMAIL = By.XPATH, "//input[@id='email']"
+ITEMS = By.XPATH, "//ul/li[text()='Home']"
+
+
+# Test case for the XPaths that have an equivalent CSS selector
+@pytest.mark.parametrize("xpath, css", [
+    ("//input[@id='email']", "input[id='email']"),
+    ("//div[@class='alert alert-danger']", "div[class='alert alert-danger']"),
+    ("//*[@data-test='submit']", "[data-test='submit']"),
+    ("//form//button[contains(@class, 'primary')]", "form button[class*='primary']"),
+    ("//input[starts-with(@name, 'user')][not(@disabled)]", "input[name^='user']:not([disabled])"),
+    ("//input[@type='text' and @required]", "input[type='text'][required]"),
+    ("//ul/li[2]", "ul > li:nth-of-type(2)"),
+    ("//ul/li[last()]", "ul > li:last-of-type"),
+    ("//ul/*[3]", "ul > :nth-child(3)"),
+    ('//div[@title="it\'s"]', 'div[title="it\'s"]'),
+])
+def test_xpath_to_css(xpath, css):
+    assert xpath_to_css(xpath) == (css, None)
+
+
+# Test case for the XPaths CSS cannot express, which keep a reason instead of a selector
+@pytest.mark.parametrize("xpath, reason", [
+    ("//a[text()='Home']", "text predicates"),
+    ("(//a)[1]", "starting with '//'"),
+    ("//li[@class='item'][2]", "position after another predicate"),
+    ("//div/..", "no equivalent"),
+    ("//a[contains(@href, '')]", "matches every element"),
+])
+def test_xpath_without_css_equivalent(xpath, reason):
+    css, why = xpath_to_css(xpath)
+    assert css is None and reason in why
+
+
+class SampleLocators:
+    email = EMAIL
+    items = ITEMS
+
+
+# Test case for measuring the locators in one script, with their CSS candidates, slowest first
+def test_analyze_measures_locators_and_candidates():
+    driver = StubDriver()
+    measured = []
+
+    def measure(entries, repeat):
+        measured.append((entries, repeat))
+        return {"domSize": 42, "results": [
+            {"count": 1, "ms": 0.1, "candidateMs": 0.02, "equivalent": True},
+            {"count": 3, "ms": 0.5, "candidateMs": None, "equivalent": None},
+        ]}
+
+    driver.scripts.append((MEASURE_LOCATORS, measure))
+    locators = [(SampleLocators, "email", EMAIL), (SampleLocators, "items", ITEMS)]
+    dom_size, results = analyze(driver, locators, repeat=5)
+    assert measured == [([[*EMAIL, By.CSS_SELECTOR, "input[id='email']"], [*ITEMS, None, None]], 5)]
+    assert dom_size == 42 and [result["name"] for result in results] == ["SampleLocators.items", "SampleLocators.email"]
+    assert results[0]["flags"] == ["full-document scan", "text predicate", "non-unique (3 matches)"]
+    assert results[1]["suggestion"] == (By.CSS_SELECTOR, "input[id='email']") and results[1]["equivalent"]
+
+
+# Test case for rewriting in the source only the locators the page proved equivalent
+def test_apply_rewrites_proven_equivalents_only(tmp_path):
+    path = tmp_path / "sample_locators.py"
+    path.write_text(f"class SampleLocators:\n    email = By.XPATH, {EMAIL[1]!r}\n    menu = By.XPATH, '//ul/li[2]'\n")
+    results = [
+        {"name": "SampleLocators.email", "path": str(path), "attribute": "email", "locator": EMAIL,
+         "suggestion": (By.CSS_SELECTOR, "input[id='email']"), "equivalent": True, "count": 1},
+        {"name": "SampleLocators.menu", "path": str(path), "attribute": "menu", "locator": (By.XPATH, "//ul/li[2]"),
+         "suggestion": (By.CSS_SELECTOR, "ul > li:nth-of-type(2)"), "equivalent": False, "count": 1},
+    ]
+    assert apply(results) == ["SampleLocators.email"]
+    assert path.read_text() == (
+        "class SampleLocators:\n    email = By.CSS_SELECTOR, \"input[id='email']\"\n    menu = By.XPATH, '//ul/li[2]'\n"
+    )
+
+
+# Test case for evaluating the convertible XPaths as CSS at runtime, keeping the original for messages
+def test_optimize_locators_in_memory(tmp_path, monkeypatch):
+    package = tmp_path / "sample_locators"
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        "from selenium.webdriver.common.by import By\n\n\n"
+        f"class SampleLocators:\n    email = By.XPATH, {EMAIL[1]!r}\n    items = By.XPATH, {ITEMS[1]!r}\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert optimize_locators("sample_locators") == ["SampleLocators.email"]
+    assert optimize_locators("sample_locators") == []  # Already optimized
+
+    from sample_locators import SampleLocators as Optimized
+    assert tuple(Optimized.email) == (By.CSS_SELECTOR, "input[id='email']") and Optimized.email.original == EMAIL
+    assert tuple(Optimized.items) == ITEMS  # No CSS equivalent
+    assert "//input[@id='email']" in repr(Optimized.email)
+    copy = pickle.loads(pickle.dumps(Optimized.email))  # e.g. sent to pytest-xdist workers
+    assert isinstance(copy, OptimizedLocator) and copy.original == EMAIL
@@ -1,10 +1,9 @@
-import time
-
 import pytest
 
 from configs.config import Config
 from locators.login_locator import LoginLocators
 from pages.login.login import Login
+from utils.dom_scripts import URL_CONTAINS
 
 
 # Define a pytest fixture that returns a Login page instance
@@ -22,7 +21,9 @@ def test_store_manager_login(login_page):
     login_page.click_sign_in(LoginLocators.sign_in)  # Click the sign in button
     login_page.input_otp(LoginLocators.otp)  # Input OTP
     login_page.click_verify(LoginLocators.verify)  # Click the verify button
-    time.sleep(5)  # Wait for 5 seconds
+    # Wait for either the store page or the error alert, whichever the verification leads to
+    matched, _ = login_page.helper.wait_for_first_of((URL_CONTAINS, "mystore"), LoginLocators.error_message)
+    assert matched == (URL_CONTAINS, "mystore")  # Assert that the store page was reached
     assert login_page.driver.current_url == Config.base_url + "mystore"  # Assert that the current URL is correct
 
 
@@ -34,5 +35,9 @@ def test_invalid_email(login_page):
     login_page.input_password(LoginLocators.email)  # Input password
     login_page.click_sign_in(LoginLocators.sign_in)  # Click the sign in button
     error_message = login_page.get_error_message(LoginLocators.error_message)  # Get the error message
-    time.sleep(5)  # Wait for 5 seconds
     assert error_message == "Error Message"  # Assert that the error message is correct
+
+
+# Test case for starting already logged in, from a saved session snapshot when one is available
+def test_authenticated_session(authenticated_driver):
+    assert Config.authenticated_path in authenticated_driver.current_url  # Assert that the authenticated page is open
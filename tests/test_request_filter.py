@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from configs.config import Config
+from drivers.request_filter import RequestFilter
+
+TRACKER = "https://tracker.example/**"
+CDN = "https://cdn.example/**"
+
+
+# Stand-in for an intercepted request, recording how it was stopped
+class FakeRequest:
+    def __init__(self, url, resource_type="script"):
+        self.url = url
+        self.resource_type = resource_type
+        self.outcome = None
+
+    def fail(self):
+        self.outcome = "failed"
+
+    def provide_response(self, status, body):
+        self.outcome = ("stubbed", status, body)
+
+
+# Stand-in for the pytest item of a test, with an optional request_filter marker
+def _node(**overrides):
+    marker = pytest.mark.request_filter(**overrides).mark if overrides else None
+    return SimpleNamespace(get_closest_marker=lambda name: marker if name == "request_filter" else None)
+
+
+# Define a pytest fixture setting the Config defaults the filters are built from
+@pytest.fixture(autouse=True)
+def filter_config(monkeypatch):
+    monkeypatch.setattr(Config, "blocked_url_patterns", [TRACKER])
+    monkeypatch.setattr(Config, "allowed_url_patterns", [])
+    monkeypatch.setattr(Config, "blocked_resource_types", ["font"])
+    monkeypatch.setattr(Config, "request_filter_action", "block")
+
+
+# Test case for building the filter of a test without a marker from the Config defaults
+def test_for_test_without_marker():
+    request_filter = RequestFilter.for_test(_node())
+    assert request_filter.block == [TRACKER] and request_filter.allow == []
+    assert request_filter.resource_types == {"font"} and request_filter.action == "block"
+
+
+# Test case for adding the marker's globs to the defaults, and replacing the resource types and action
+def test_for_test_merges_the_marker_overrides():
+    request_filter = RequestFilter.for_test(_node(
+        block=[CDN], allow=["https://tracker.example/consent.js"], resource_types=["image"], action="stub",
+    ))
+    assert request_filter.block == [TRACKER, CDN]
+    assert request_filter.allow == ["https://tracker.example/consent.js"]
+    assert request_filter.resource_types == {"image"} and request_filter.action == "stub"
+    assert Config.blocked_url_patterns == [TRACKER]  # The defaults are not modified
+
+
+# Test case for blocking the requests matched by URL unless they are allowed, counted by glob
+@pytest.mark.parametrize("url, outcome, reason", [
+    ("https://tracker.example/pixel.gif", "failed", TRACKER),
+    ("https://tracker.example/consent.js", None, None),
+    ("http://tracker.example/pixel.gif", "failed", "url"),  # Matched by the browser, not by the glob
+])
+def test_handle_url(url, outcome, reason):
+    request_filter = RequestFilter(allow=["https://tracker.example/consent.js"])
+    request = FakeRequest(url)
+    request_filter._handle_url(request)
+    assert request.outcome == outcome
+    assert request_filter.blocked == ({reason: 1} if reason else {})
+
+
+# Test case for blocking the requests of the blocked resource types, stubbed with the 'stub' action
+@pytest.mark.parametrize("resource_type, url, outcome", [
+    ("font", "https://app.example/font.woff2", ("stubbed", 200, "")),
+    ("script", "https://app.example/app.js", None),
+    ("font", "https://cdn.example/font.woff2", None),  # Allowed
+])
+def test_handle_resource_type(resource_type, url, outcome):
+    request_filter = RequestFilter(allow=[CDN], action="stub")
+    request = FakeRequest(url, resource_type)
+    request_filter._handle_resource_type(request)
+    assert request.outcome == outcome
+    assert request_filter.blocked_total == (1 if outcome else 0)
+    assert request_filter.blocked == ({f"type:{resource_type}": 1} if outcome else {})
@@ -0,0 +1,95 @@
+import pytest
+
+from configs.config import Config
+from plugins import scheduling
+from utils.affinity import affinity_key
+
+
+# Stand-in for a collected test, keeping the markers added to it
+class FakeItem:
+    def __init__(self, nodeid, fixturenames=()):
+        self.nodeid = nodeid
+        self.fixturenames = list(fixturenames)
+        self.stash = {}
+        self.markers = []
+
+    def add_marker(self, marker):
+        self.markers.append(marker)
+
+    @property
+    def xdist_group(self):
+        return next((marker.args[0] for marker in self.markers if marker.name == "xdist_group"), None)
+
+
+# Stand-in for the pytest cache, holding the durations of previous runs
+class FakeCache:
+    def __init__(self, history):
+        self.history = history
+
+    def get(self, key, default):
+        return self.history if key == scheduling.HISTORY_KEY else default
+
+
+# Stand-in for the pytest config of a worker, or of a run without pytest-xdist when workers is None
+class FakeConfig:
+    def __init__(self, history, workers=None):
+        self.cache = FakeCache(history)
+        if workers:
+            self.workerinput = {"workercount": workers}
+
+
+# Define a pytest fixture grouping the tests using authenticated_driver
+@pytest.fixture(autouse=True)
+def affinity_config(monkeypatch):
+    monkeypatch.setattr(Config, "schedule_by_duration", True)
+    monkeypatch.setattr(Config, "affinity_fixtures", ["authenticated_driver"])
+
+
+# Test case for balancing the buckets longest-processing-time first, leaving out empty ones
+@pytest.mark.parametrize("count, expected", [
+    (2, [(8.0, ["a", "d"]), (8.0, ["b", "c", "e"])]),
+    (6, [(5.0, ["a"]), (4.0, ["b"]), (3.0, ["c"]), (3.0, ["d"]), (1.0, ["e"])]),
+])
+def test_lpt_buckets(count, expected):
+    estimates = {"e": 1.0, "c": 3.0, "a": 5.0, "d": 3.0, "b": 4.0}
+    items = [FakeItem(nodeid) for nodeid in estimates]
+    buckets = scheduling._lpt_buckets(items, estimates, count)
+    assert [(load, [item.nodeid for item in bucket]) for load, bucket in buckets] == expected
+
+
+HISTORY = {"g1": [4.0], "g2": [3.0, 2.0, 4.0], "g3": [2.0], "g4": [1.0], "single": [1.0]}
+
+
+def _items():
+    grouped = [FakeItem(nodeid, ["setup_driver", "authenticated_driver"]) for nodeid in ("g1", "g2", "g3", "g4")]
+    return [FakeItem("single", ["setup_driver"]), FakeItem("new")] + grouped
+
+
+# Test case for splitting a group holding most of the work into one bucket per worker, longest units first
+def test_large_group_is_split_into_balanced_buckets():
+    items = _items()
+    scheduling.pytest_collection_modifyitems(FakeConfig(HISTORY, workers=2), items)
+    # The new test is estimated at the median of the known durations (2s); the group (10s of 13s) gets two buckets
+    assert [item.nodeid for item in items] == ["g1", "g4", "g2", "g3", "new", "single"]
+    assert [item.xdist_group for item in items] == [
+        "affinity-authenticated_driver-0", "affinity-authenticated_driver-0",
+        "affinity-authenticated_driver-1", "affinity-authenticated_driver-1", None, None,
+    ]
+    assert [item.stash[affinity_key] for item in items] == ["authenticated_driver"] * 4 + [None, None]
+
+
+# Test case for keeping a group in a single bucket without pytest-xdist
+def test_group_stays_whole_on_a_single_worker():
+    items = _items()
+    scheduling.pytest_collection_modifyitems(FakeConfig(HISTORY), items)
+    assert [item.nodeid for item in items] == ["g1", "g2", "g3", "g4", "new", "single"]
+    assert {item.xdist_group for item in items[:4]} == {"affinity-authenticated_driver-0"}
+
+
+# Test case for keeping the collection order when scheduling is turned off
+def test_scheduling_disabled_keeps_the_order(monkeypatch):
+    monkeypatch.setattr(Config, "schedule_by_duration", False)
+    items = _items()
+    scheduling.pytest_collection_modifyitems(FakeConfig(HISTORY, workers=2), items)
+    assert [item.nodeid for item in items] == ["single", "new", "g1", "g2", "g3", "g4"]
+    assert not any(item.markers for item in items)
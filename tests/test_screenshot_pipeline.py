@@ -0,0 +1,57 @@
+import pytest
+
+from tests.stubs import StubDriver, png
+from utils.screenshot_pipeline import ScreenshotPipeline
+
+RED, BLUE = png((255, 0, 0)), png((0, 0, 255))
+
+
+# Define a pytest fixture providing a pipeline writing PNG files to a temporary directory, with room for one screenshot
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = ScreenshotPipeline(
+        str(tmp_path / "screenshots"), image_format="png", scale=1, storage_cap_mb=(len(RED) * 1.5) / (1024 * 1024)
+    )
+    yield pipeline
+    pipeline.close()
+
+
+# Test case for storing a screenshot identical to the previous one only once
+def test_duplicate_frames_are_dropped(pipeline):
+    driver = StubDriver()
+    driver.screenshot = RED
+    first = pipeline.capture(driver, "tests/test_sample.py::test_sample")
+    assert pipeline.capture(driver, "tests/test_sample.py::test_sample") == first
+    assert pipeline.read(first).startswith(b"\x89PNG")
+    assert first.endswith(".png") and "tests_test_sample.py_test_sample_" in first
+    assert pipeline.stats["captured"] == 2 and pipeline.stats["duplicates"] == 1 and pipeline.stats["written"] == 1
+
+
+# Test case for dropping the screenshots beyond the storage cap, and settling the reservation to the file size
+def test_storage_cap_is_enforced(pipeline):
+    driver = StubDriver()
+    driver.screenshot = RED
+    path = pipeline.capture(driver, "first")
+    driver.screenshot = BLUE
+    assert pipeline.capture(driver, "second") is None
+    pipeline.close()
+    assert pipeline.stats["dropped"] == 1 and pipeline.stats["written"] == 1
+    assert pipeline._reserved_bytes == pipeline.stats["bytes"] == len(pipeline.read(path))
+
+
+# Test case for freeing the reservation of a screenshot that could not be written
+def test_failed_write_frees_the_reservation(pipeline, monkeypatch):
+    def fail(png):
+        raise OSError("Disk full")
+
+    driver = StubDriver()
+    driver.screenshot = RED
+    with monkeypatch.context() as patch:
+        patch.setattr(pipeline, "_encode", fail)
+        failed = pipeline.capture(driver, "first")
+        assert pipeline.read(failed) is None
+    assert pipeline._reserved_bytes == 0 and pipeline.stats["written"] == 0
+
+    driver.screenshot = BLUE  # Fits in the space the failed write gave back
+    assert pipeline.read(pipeline.capture(driver, "second")).startswith(b"\x89PNG")
+    assert pipeline.stats["dropped"] == 0 and pipeline.stats["written"] == 1
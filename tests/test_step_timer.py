@@ -0,0 +1,111 @@
+import contextlib
+import logging
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.command import Command
+
+from drivers.command_hooks import add_command_listener, install_command_hooks, remove_command_listener
+from plugins.step_timing import _steps_table
+from tests.stubs import StubDriver
+from utils import step_timer
+from utils.step_timer import StepRecorder, TimedWait, instrument
+
+EMAIL = "id", "email"
+
+
+# Page object of the tests: open() calls find(), so its step encloses the one of find()
+@instrument
+class SamplePage:
+    def __init__(self, driver):
+        self.driver = driver
+        self.default_timeout = 2
+
+    def open(self, locator):
+        self.driver.get("https://example.test")
+        return self.find(locator, timeout=1)
+
+    def find(self, locator, timeout=None):
+        return self.driver.find_element(*locator)
+
+    def wait_for(self, condition, timeout=None):
+        return TimedWait(self.driver, timeout or self.default_timeout, poll_frequency=0.01).until(condition)
+
+
+# Records the steps of a sample test in place of the running one, whose recorder is restored before its report
+@contextlib.contextmanager
+def _recording():
+    with pytest.MonkeyPatch.context() as patch:
+        recorder = StepRecorder("tests/test_sample.py::test_sample")
+        patch.setattr(step_timer, "_recorder", recorder)
+        yield recorder
+
+
+# Test case for recording nested steps separately, commands counting towards every open step
+def test_nested_steps():
+    page = SamplePage(install_command_hooks(StubDriver()))
+    with _recording() as recorder:
+        page.open(EMAIL)
+    inner, outer = recorder.steps  # Recorded as they close
+    assert (inner["name"], outer["name"]) == ("SamplePage.find", "SamplePage.open")
+    assert inner["commands"] == 1 and outer["commands"] == 2  # FIND_ELEMENT, and GET before it
+    assert inner["locator"] == outer["locator"] == str(EMAIL)
+    assert inner["timeout"] == 1 and outer["timeout"] is None  # open() takes no timeout
+    assert inner["budget_used"] == inner["duration"] / 1 and outer["duration"] >= inner["duration"]
+    assert recorder.current_step() is None
+    assert recorder.locators == {EMAIL} and recorder.source_files == {__file__}
+
+
+# Test case for counting the polls of a wait, and recording the error and budget of a step that timed out
+def test_polls_and_errors():
+    page = SamplePage(install_command_hooks(StubDriver()))
+    polls = []
+    with _recording() as recorder:
+        assert page.wait_for(lambda driver: polls.append(1) or len(polls) == 3)
+        with pytest.raises(TimeoutException):
+            page.wait_for(lambda driver: False, timeout=0.05)
+    met, timed_out = recorder.steps
+    assert met["polls"] == 3 and met["timeout"] == 2 and met["error"] is None
+    assert timed_out["polls"] >= 2 and timed_out["error"] == "TimeoutException" and timed_out["budget_used"] >= 1
+
+
+# Test case for keeping the command's outcome and the other listeners when a listener fails
+def test_failing_listener_is_logged_and_skipped(caplog):
+    calls = []
+
+    def failing(*args):
+        raise ValueError("Broken listener")
+
+    def recording(driver, command, params, response, duration, error):
+        calls.append((command, response, error))
+
+    add_command_listener(failing)
+    add_command_listener(recording)
+    try:
+        driver = install_command_hooks(StubDriver("https://example.test"))
+        with caplog.at_level(logging.ERROR, logger="drivers.command_hooks"):
+            assert driver.current_url == "https://example.test"
+    finally:
+        remove_command_listener(failing)
+        remove_command_listener(recording)
+    assert calls == [(Command.GET_CURRENT_URL, {"value": "https://example.test"}, None)]
+    assert "Command listener" in caplog.text and "Broken listener" in caplog.text
+
+
+# Test case for the report table: escaped names and locators, budget as a percentage when there is one
+def test_steps_table():
+    steps = [
+        {"name": "Page.<open>", "locator": str(EMAIL), "duration": 0.12345, "budget_used": 0.5, "polls": 2,
+         "commands": 3, "error": None},
+        {"name": "Page.find", "locator": None, "duration": 1.0, "budget_used": None, "polls": 0, "commands": 1,
+         "error": "TimeoutException"},
+    ]
+    table = _steps_table(steps)
+    assert table.startswith("<table class='step-timings'><tr><th>Step</th>")
+    assert (
+        "<tr><td>Page.&lt;open&gt;</td><td>(&#x27;id&#x27;, &#x27;email&#x27;)</td><td>0.123</td><td>50%</td>"
+        "<td>2</td><td>3</td><td></td></tr>"
+    ) in table
+    assert (
+        "<tr><td>Page.find</td><td></td><td>1.000</td><td></td><td>0</td><td>1</td><td>TimeoutException</td></tr>"
+    ) in table
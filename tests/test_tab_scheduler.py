@@ -0,0 +1,64 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.command import Command
+
+from drivers.tab_context import TabContext
+from tests.stubs import StubDriver
+from utils.tab_scheduler import TabScheduler, pause, until
+
+
+# Task of the tests: logs a step with the tab the browser is on, waits, then logs another one
+def _task(driver, log, name, seconds):
+    log.append((driver.wrapped_driver.current, f"{name} start"))
+    yield pause(seconds)
+    log.append((driver.wrapped_driver.current, f"{name} end"))
+    return name
+
+
+# Test case for interleaving the tasks: each one runs in its own tab while the others wait
+def test_tasks_interleave_in_their_tabs():
+    driver, log = StubDriver(), []
+    with TabContext(driver) as first, TabContext(driver) as second:
+        scheduler = TabScheduler(poll_frequency=0.01)
+        scheduler.spawn(first, _task, first.driver, log, "slow", 0.1)
+        scheduler.spawn(second, _task, second.driver, log, "fast", 0)
+        assert scheduler.run() == ["slow", "fast"]
+    assert log == [
+        (first.handle, "slow start"), (second.handle, "fast start"),
+        (second.handle, "fast end"), (first.handle, "slow end"),
+    ]
+    assert driver.handles == ["main"] and driver.current == "main"
+
+
+# Test case for switching back to a tab after a switch made behind its back
+def test_tab_follows_switches_made_elsewhere():
+    driver = StubDriver()
+    with TabContext(driver) as tab:
+        switches = len(driver.commands_sent(Command.SWITCH_TO_WINDOW))
+        tab.driver.current_window_handle
+        assert len(driver.commands_sent(Command.SWITCH_TO_WINDOW)) == switches  # Already on the tab
+        driver.switch_to.window("main")  # e.g. DriverPool._reset
+        assert tab.driver.current_window_handle == tab.handle
+
+
+# Test case for throwing a timeout into the task whose condition is never met
+def test_wait_timeout_is_thrown_into_the_task():
+    def task(driver):
+        try:
+            yield until(lambda driver: False, timeout=0.05, message="Never met")
+        except TimeoutException as error:
+            return error.msg
+
+    driver = StubDriver()
+    with TabContext(driver) as tab:
+        scheduler = TabScheduler(poll_frequency=0.01)
+        scheduler.spawn(tab, task, tab.driver)
+        assert scheduler.run() == ["Never met"]
+
+
+# Test case for refusing tasks that are not generators
+def test_spawn_rejects_plain_functions():
+    driver = StubDriver()
+    with TabContext(driver) as tab:
+        with pytest.raises(TypeError, match="not a generator function"):
+            TabScheduler().spawn(tab, lambda: None)
@@ -0,0 +1,114 @@
+import pytest
+
+from configs.config import Config
+from tests.stubs import StubDriver, png
+from utils import dom_scripts, visual_check
+from utils.visual_check import Baseline, VisualCheck, VisualMismatchError
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+
+# Returns a white image of the given size, as RGB pixels
+def _image(width=20, height=10):
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+def _baseline(pixels):
+    return Baseline(pixels, visual_check.perceptual_hash(pixels))
+
+
+# Define a pytest fixture with the default thresholds, whatever the local Config says
+@pytest.fixture(autouse=True)
+def thresholds(monkeypatch):
+    monkeypatch.setattr(Config, "visual_tolerance", 0.001)
+    monkeypatch.setattr(Config, "visual_pixel_threshold", 16)
+    monkeypatch.setattr(Config, "visual_phash_distance", 10)
+    monkeypatch.setattr(Config, "visual_update_baselines", False)
+
+
+# Test case for matching identical images at once
+def test_identical_images_match():
+    assert visual_check.compare(_image(), _baseline(_image())) == (True, 0.0, 0)
+
+
+# Test case for the tolerance bounds: a ratio equal to the tolerance passes, one pixel more fails
+@pytest.mark.parametrize("changed, matches", [(10, True), (11, False)])
+def test_tolerance_is_inclusive(changed, matches):
+    expected = _image()
+    actual = expected.copy()
+    actual.reshape(-1, 3)[:changed] = 0  # 200 pixels, 5% of them is 10
+    assert visual_check.compare(actual, _baseline(expected), tolerance=0.05)[:2] == (matches, changed / 200)
+
+
+# Test case for leaving differences within the pixel threshold (anti-aliasing) out of the count
+def test_small_channel_differences_are_not_counted():
+    expected = _image()
+    actual = expected - np.uint8(Config.visual_pixel_threshold)
+    assert visual_check.compare(actual, _baseline(expected), tolerance=0)[:2] == (True, 0.0)
+    assert not visual_check.compare(actual - np.uint8(1), _baseline(expected), tolerance=0)[0]
+
+
+# Test case for failing images of another size without comparing them
+def test_size_mismatch_fails():
+    assert visual_check.compare(_image(20, 10), _baseline(_image(10, 20))) == (False, None, None)
+
+
+# Test case for failing outright on distant perceptual hashes, unless the caller set the tolerance
+def test_hash_gate_applies_to_the_default_tolerance_only():
+    expected = _image(64, 64)
+    actual = expected.copy()
+    actual[:, :32] = 0  # Half of the image changed
+    assert visual_check.compare(actual, _baseline(expected))[:2] == (False, None)
+    assert visual_check.compare(actual, _baseline(expected), tolerance=0.6)[:2] == (True, 0.5)
+
+
+# Test case for counting pixels under overlapping masks once, and leaving them out of the ratio
+def test_overlapping_masks_are_merged():
+    expected = _image()
+    actual = expected.copy()
+    actual[0:5, 0:10] = 0  # The changed area, covered by two overlapping masks
+    actual[9, 19] = 0  # And one changed pixel outside of them
+    rectangles = [(0, 0, 6, 5), (4, 0, 10, 5)]
+    ignored = visual_check._ignored(actual.shape, rectangles)
+    assert np.count_nonzero(ignored) == 50
+    assert visual_check.compare(actual, _baseline(expected), rectangles, tolerance=0)[1] == 1 / 150
+
+
+# Test case for converting CSS pixel rectangles to screenshot pixels, relative to the region and clipped
+def test_pixel_rectangles_scale_offset_and_clip():
+    rectangles = [(10, 20, 5, 5), (0, 5, 10, 10), (100, 100, 5, 5)]  # Inside, partly above the region, outside
+    assert visual_check._pixel_rectangles(rectangles, (5, 10), 2, (40, 40, 3)) == [(10, 20, 20, 30), (0, 0, 10, 10)]
+    assert visual_check._pixel_rectangles([(0, 0, 3.2, 2)], (0, 0), 1.5, (40, 40, 3)) == [(0, 0, 5, 3)]
+
+
+# Test case for sizing the baseline cache from Config when a baseline is loaded, not when the module is imported
+def test_baseline_cache_follows_config(tmp_path, monkeypatch):
+    path = tmp_path / "home.png"
+    path.write_bytes(png())
+    monkeypatch.setattr(visual_check, "_baseline_cache", None)
+    monkeypatch.setattr(Config, "visual_baseline_cache_size", 2)
+    first = visual_check.load_baseline(str(path), 1)
+    assert visual_check.load_baseline(str(path), 1) is first  # Decoded once
+    monkeypatch.setattr(Config, "visual_baseline_cache_size", 5)
+    visual_check.load_baseline(str(path), 1)
+    assert visual_check._baseline_cache.cache_parameters()["maxsize"] == 5
+
+
+# Test case for a whole check on the stub driver: no baseline fails, an updated baseline then matches
+def test_assert_matches_creates_baselines_only_when_asked(tmp_path, monkeypatch):
+    driver = StubDriver()
+    driver.scripts.append((dom_scripts.ELEMENT_RECTS, lambda region, masks: {"ratio": 1, "region": None, "masks": []}))
+    check = VisualCheck(driver, str(tmp_path / "baselines"), str(tmp_path / "diffs"))
+    with pytest.raises(VisualMismatchError, match="No baseline") as error:
+        check.assert_matches("home")
+    assert error.value.paths and (tmp_path / "diffs").is_dir()
+
+    monkeypatch.setattr(Config, "visual_update_baselines", True)
+    check.assert_matches("home")
+    monkeypatch.setattr(Config, "visual_update_baselines", False)
+    check.assert_matches("home")
+
+    driver.screenshot = png((0, 0, 0))
+    with pytest.raises(VisualMismatchError, match="differs from its baseline"):
+        check.assert_matches("home")
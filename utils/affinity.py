@@ -0,0 +1,36 @@
+# utils/affinity.py
+# Affinity groups of the tests (see Config.affinity_fixtures), shared by plugins/scheduling.py, which
+# assigns them, and the fixtures and plugins reading them. Kept out of the plugin modules, which pytest
+# rewrites when it loads them as plugins and cannot once they were imported directly.
+import re
+
+import pytest
+
+from configs.config import Config
+
+GROUP_PREFIX = "affinity-"
+
+affinity_key = pytest.StashKey[str]()
+
+
+def affinity_group(item):
+    """
+    Returns the affinity group of a test, i.e. the first of Config.affinity_fixtures it uses.
+
+    :param item: The pytest item of the test.
+    :return: The name of the fixture, or None if the test uses none of them.
+    """
+    if affinity_key in item.stash:
+        return item.stash[affinity_key]
+    return next((name for name in Config.affinity_fixtures if name in item.fixturenames), None)
+
+
+def base_nodeid(nodeid):
+    """
+    Returns the node id of a test without the affinity group pytest-xdist appends to it with
+    `--dist loadgroup`.
+
+    :param nodeid: The node id, as reported.
+    :return: The node id of the test.
+    """
+    return re.sub(rf"@{GROUP_PREFIX}[^@]*$", "", nodeid)
@@ -0,0 +1,647 @@
+# utils/async_helper_functions.py
+import asyncio
+
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException, TimeoutException
+
+from configs.config import Config
+from utils import dom_scripts
+from utils.bidi_connection import BiDiError, deserialize, serialize
+from utils.circuit_breaker import is_target_failure, target_breaker
+from utils.helper_functions import FormFillError
+
+# BiDi errors meaning that a referenced node is gone
+STALE_ERRORS = {"no such node", "no such element", "stale element reference"}
+
+# BiDi errors (codes and browser messages) of a call whose document was unloaded mid-call by a navigation
+UNLOADED_ERRORS = (
+    "no such frame", "Execution context was destroyed", "Cannot find context with specified id",
+    "Inspected target navigated or closed", "MessageHandlerFrame' destroyed",
+)
+
+# How browsingContext.navigate waits, per page load strategy
+NAVIGATION_WAIT = {"normal": "complete", "eager": "interactive", "none": "none"}
+
+# Functions called on an element (`this`). A detached element counts as stale, like in WebDriver.
+_STALE_CHECK = "if (!this.isConnected) { throw new Error('stale element reference'); }\n"
+_ELEMENT_TEXT = "function () {\n" + _STALE_CHECK + "return this.innerText;\n}"
+_ELEMENT_FOCUS = "function () {\n" + _STALE_CHECK + "this.focus();\n}"
+_ELEMENT_SCROLL_INTO_VIEW = "function () {\n" + _STALE_CHECK + "this.scrollIntoView(true);\n}"
+_ELEMENT_CLICKABLE = "function () {\n" + _STALE_CHECK + "return !this.disabled;\n}"
+_ELEMENT_CLEAR = "function () {\n" + _STALE_CHECK + """var prototype = Object.getPrototypeOf(this);
+var descriptor = Object.getOwnPropertyDescriptor(prototype, 'value');
+descriptor && descriptor.set ? descriptor.set.call(this, '') : (this.value = '');
+this.dispatchEvent(new Event('input', {bubbles: true}));
+this.dispatchEvent(new Event('change', {bubbles: true}));
+}"""
+
+
+def _function(body):
+    # The dom_scripts are execute_script bodies reading `arguments`, which a plain function declaration keeps
+    return "function () {\n" + body + "\n}"
+
+
+def _async_function(body):
+    # Passes a resolve callback as the last argument, like execute_async_script does
+    return (
+        "function () {\nvar args = Array.prototype.slice.call(arguments);\n"
+        "return new Promise(function (resolve) {\nargs.push(resolve);\n"
+        "(" + _function(body) + ").apply(null, args);\n});\n}"
+    )
+
+
+class DocumentUnloadedError(JavascriptException):
+    """
+    Raised when the document a function ran in was unloaded before it returned, e.g. by a navigation.
+    The waits poll the new document instead of failing.
+    """
+
+
+class RemoteElement:
+    def __init__(self, helper, shared_id):
+        """
+        Constructor for RemoteElement class, the async counterpart of a WebElement.
+
+        :param helper: The AsyncHelperFunctions instance of the browsing context holding the element.
+        :param shared_id: The BiDi shared id of the node.
+        """
+        self.helper = helper
+        self.shared_id = shared_id
+
+    async def text(self):
+        """
+        :return: The rendered text of the element.
+        """
+        return await self.helper.call_function(_ELEMENT_TEXT, this=self)
+
+    async def is_displayed(self):
+        """
+        :return: Whether the element is visible.
+        """
+        return await self.helper.execute_script(dom_scripts.IS_VISIBLE, self)
+
+    async def is_enabled(self):
+        """
+        :return: Whether the element is enabled.
+        """
+        return await self.helper.call_function(_ELEMENT_CLICKABLE, this=self)
+
+    async def click(self):
+        """
+        Clicks the center of the element with a native (input.performActions) mouse click.
+        """
+        await self.helper.perform_actions([self._pointer([
+            {"type": "pointerDown", "button": 0},
+            {"type": "pointerUp", "button": 0},
+        ])])
+
+    async def move_to(self):
+        """
+        Moves the mouse pointer to the center of the element.
+        """
+        await self.helper.perform_actions([self._pointer([])])
+
+    async def send_keys(self, text):
+        """
+        Focuses the element and types the text with native key events.
+
+        :param text: The text to type.
+        """
+        await self.helper.call_function(_ELEMENT_FOCUS, this=self)
+        keys = []
+        for character in str(text):
+            keys.append({"type": "keyDown", "value": character})
+            keys.append({"type": "keyUp", "value": character})
+        await self.helper.perform_actions([{"type": "key", "id": "keyboard", "actions": keys}])
+
+    async def clear(self):
+        """
+        Clears the value of the element, dispatching the input and change events.
+        """
+        await self.helper.call_function(_ELEMENT_CLEAR, this=self)
+
+    def _pointer(self, actions):
+        origin = {"type": "element", "element": {"sharedId": self.shared_id}}
+        return {
+            "type": "pointer",
+            "id": "mouse",
+            "parameters": {"pointerType": "mouse"},
+            "actions": [{"type": "pointerMove", "x": 0, "y": 0, "origin": origin}] + actions,
+        }
+
+
+class AsyncHelperFunctions:
+    def __init__(self, connection, context):
+        """
+        Constructor for AsyncHelperFunctions class, the async counterpart of HelperFunctions.
+
+        Every method has the name and parameters of its HelperFunctions counterpart and must be
+        awaited. Commands go over the WebDriver BiDi websocket, so a single event loop can drive many
+        browsing contexts (tabs) and browsers concurrently.
+
+        :param connection: The BiDiConnection of the browser.
+        :param context: The id of the browsing context to drive.
+        """
+        self.connection = connection
+        self.context = context
+        self.default_timeout = 30
+        self.poll_frequency = 0.5  # Same as WebDriverWait
+        self.settle_slice = 5  # Longest single in-page wait of wait_for_dom_settled (in seconds)
+        self.settle_poll = 0.25  # Pause before observing a document again after a script error (in seconds)
+
+    async def open_url(self, url):
+        """
+        Navigates to a URL and waits for it to load according to Config.page_load_strategy.
+        Raises TargetUnavailableError right away while the circuit breaker is open.
+
+        :param url: The URL to navigate to.
+        """
+        await target_breaker.before_call_async()  # Fail fast while the target is down
+        try:
+            await self.connection.send("browsingContext.navigate", {
+                "context": self.context,
+                "url": url,
+                "wait": NAVIGATION_WAIT[Config.page_load_strategy],
+            })
+        except BiDiError as error:
+            if is_target_failure(error):  # Connection errors, not errors of the browser or the websocket
+                await target_breaker.record_failure_async(error)
+            raise
+        target_breaker.record_success()
+
+    async def wait_and_input_text(self, locator, text, timeout=None):
+        """
+        Waits for an element to become visible and inputs text into it.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param text: The text to be input into the element.
+        :param timeout: The maximum time to wait for the element to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        async def action():
+            await (await self.wait_for_element_visible(locator, timeout)).send_keys(text)
+
+        await self._retry_on_stale(action)
+
+    async def wait_for_element_visible(self, locator, timeout=None):
+        """
+        Waits for an element to become visible.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: The visible element.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        return await self._wait(
+            lambda: self._match(locator, visible=True),
+            timeout,
+            f"Element located by {locator} not visible after timeout of {timeout} seconds.",
+        )
+
+    async def wait_for_element_to_be_clickable(self, locator, timeout=None):
+        """
+        Waits for an element to become clickable (visible and enabled).
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be clickable (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: The clickable element.
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        async def clickable():
+            element = await self._match(locator, visible=True)
+            return element if element and await element.is_enabled() else None
+
+        return await self._wait(
+            clickable, timeout, f"Element located by {locator} not clickable after timeout of {timeout} seconds."
+        )
+
+    async def wait_and_click(self, locator, timeout=None):
+        """
+        Waits for an element to become clickable and clicks it.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be clickable (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        async def action():
+            await (await self.wait_for_element_to_be_clickable(locator, timeout)).click()
+
+        await self._retry_on_stale(action)
+
+    async def wait_and_clear_text(self, locator, timeout=None):
+        """
+        Waits for an element to become clickable and clears its text.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be clickable (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        async def action():
+            await (await self.wait_for_element_to_be_clickable(locator, timeout)).clear()
+
+        await self._retry_on_stale(action)
+
+    async def wait_until_element_contains_text(self, locator, text, timeout=None):
+        """
+        Waits until an element contains the specified text.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param text: The text to be contained within the element.
+        :param timeout: The maximum time to wait for the text to be present (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        async def contains_text():
+            element = await self._match(locator, visible=False)
+            return element is not None and text in await element.text()
+
+        await self._wait(
+            contains_text, timeout, f"Element located by {locator} does not contain '{text}' after {timeout} seconds."
+        )
+
+    async def wait_until_element_is_visible(self, locator, timeout=None):
+        """
+        Waits until an element is visible.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        await self.wait_for_element_visible(locator, timeout)
+
+    async def wait_until_elements_are_visible(self, locator, timeout=None):
+        """
+        Waits until all elements are visible.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the elements to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        await self.wait_and_get_elements(locator, timeout)
+
+    async def wait_and_get_elements(self, locator, timeout=None, err=None):
+        """
+        Waits for elements to become visible and returns them.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the elements to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param err: Custom error message to be displayed if elements are not found.
+        :return: List of visible elements.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        err = (
+            err
+            if err
+            else f"Unable to find elements located by '{locator}' after timeout of {timeout} seconds."
+        )
+        return await self._wait(lambda: self.execute_script(dom_scripts.ALL_VISIBLE, list(locator)), timeout, err)
+
+    async def wait_and_get_text(self, locator, timeout=None):
+        """
+        Waits for an element to be visible and returns its text.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be visible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: The text content of the visible element.
+        """
+        async def action():
+            return await (await self.wait_for_element_visible(locator, timeout)).text()
+
+        return await self._retry_on_stale(action)
+
+    async def wait_and_get_text_by_presence(self, locator, timeout=None):
+        """
+        Waits for an element to be present in the DOM and returns its text.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be present (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: The text content of the present element.
+        """
+        async def action():
+            return await (await self.presence_of_element_located(locator, timeout)).text()
+
+        return await self._retry_on_stale(action)
+
+    async def scroll_to_element(self, locator):
+        """
+        Scrolls the page until the specified element is in view.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        """
+        async def action():
+            element = await self.presence_of_element_located(locator)
+            await self.call_function(_ELEMENT_SCROLL_INTO_VIEW, this=element)
+
+        await self._retry_on_stale(action)
+
+    async def move_to_element_action(self, locator):
+        """
+        Moves the mouse pointer to the specified element.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        """
+        async def action():
+            await (await self.presence_of_element_located(locator)).move_to()
+
+        await self._retry_on_stale(action)
+
+    async def element_to_be_clickable(self, locator, timeout=None):
+        """
+        Waits for an element to be clickable.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be clickable (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        await self.wait_for_element_to_be_clickable(locator, timeout)
+
+    async def scroll_to_end_of_page(self):
+        """
+        Scrolls the page to the end (bottom) of the page.
+        """
+        await self.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+    async def scroll_to_top_of_page(self):
+        """
+        Scrolls the page to the top of the page.
+        """
+        await self.execute_script("window.scrollTo(0, 0);")
+
+    async def presence_of_element_located(self, locator, timeout=None):
+        """
+        Waits for an element to be present in the DOM.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the element to be present (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: The present element.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        return await self._wait(
+            lambda: self._match(locator, visible=False),
+            timeout,
+            f"Element located by {locator} not present after timeout of {timeout} seconds.",
+        )
+
+    async def wait_until_elements_are_invisible(self, locator, timeout=None):
+        """
+        Waits until elements are invisible.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param timeout: The maximum time to wait for the elements to be invisible (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        async def invisible():
+            return await self._match(locator, visible=True) is None
+
+        await self._wait(invisible, timeout, f"Element located by {locator} still visible after {timeout} seconds.")
+
+    async def wait_for_dom_settled(self, timeout=None, quiet_period=None):
+        """
+        Waits until the page is quiet: fully loaded, with no pending fetch/XHR requests and no DOM
+        mutations for the quiet period.
+
+        :param timeout: The maximum time to wait for the page to settle (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param quiet_period: The time without mutations or requests that counts as settled (in seconds).
+                             If not provided, Config.dom_quiet_period will be used.
+        :return: True if the page settled, False if the timeout elapsed first.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        quiet_period = quiet_period if quiet_period else Config.dom_quiet_period
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            max_wait = min(remaining, self.settle_slice)
+            try:
+                url = await self.call_function(
+                    _async_function(dom_scripts.WAIT_FOR_SETTLED), quiet_period * 1000, max_wait * 1000,
+                    await_promise=True,
+                )
+            except DocumentUnloadedError:
+                await asyncio.sleep(self.settle_poll)  # A navigation unloaded the document mid-wait
+                continue
+            if url:
+                return True
+
+    async def wait_for_all(self, locators, timeout=None, visible=True):
+        """
+        Waits until every locator matches an element, evaluating all of them in one script per poll.
+
+        :param locators: A list of locator tuples. A (dom_scripts.URL_CONTAINS, 'text') tuple matches
+                         when the current URL contains the text.
+        :param timeout: The maximum time to wait for the elements (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param visible: Whether the elements must be visible, or only present in the DOM.
+        :return: The matched elements, in the order of the locators (True for URL conditions).
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        async def all_matched():
+            matches = await self._match_conditions(locators, visible)
+            return matches if all(match is not None for match in matches) else None
+
+        return await self._wait(
+            all_matched, timeout,
+            f"Not all elements located by {list(locators)} matched after timeout of {timeout} seconds."
+        )
+
+    async def wait_for_any(self, locators, timeout=None, visible=True):
+        """
+        Waits until at least one of the locators matches an element, evaluating all of them in one
+        script per poll.
+
+        :param locators: A list of locator tuples. A (dom_scripts.URL_CONTAINS, 'text') tuple matches
+                         when the current URL contains the text.
+        :param timeout: The maximum time to wait for an element (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param visible: Whether the element must be visible, or only present in the DOM.
+        :return: A (locator, element) tuple for the first locator in the list that matched.
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        async def any_matched():
+            matches = await self._match_conditions(locators, visible)
+            for locator, match in zip(locators, matches):
+                if match is not None:
+                    return locator, match
+            return None
+
+        return await self._wait(
+            any_matched, timeout,
+            f"None of the elements located by {list(locators)} matched after timeout of {timeout} seconds."
+        )
+
+    async def wait_for_first_of(self, success_locator, error_locator, timeout=None):
+        """
+        Waits for either the success or the error outcome of an action.
+
+        :param success_locator: The locator (or URL condition) of the success outcome.
+        :param error_locator: The locator (or URL condition) of the error outcome.
+        :param timeout: The maximum time to wait for either outcome (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: A (locator, element) tuple for the outcome that matched first.
+        """
+        return await self.wait_for_any([success_locator, error_locator], timeout)
+
+    async def fill_form(self, values, submit_locator=None, timeout=None):
+        """
+        Fills several fields, and optionally submits the form, with one script per poll.
+        See HelperFunctions.fill_form.
+
+        :param values: A dict mapping locator tuples to values.
+        :param submit_locator: The locator of the control to click once the fields are filled.
+        :param timeout: The maximum time to wait for the fields to be ready (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :raises FormFillError: With the reason of every field that could not be filled.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        locators = list(values)
+        fields = [[*locator, values[locator]] for locator in locators]
+        submit = list(submit_locator) if submit_locator else None
+        outcome = {}
+
+        async def form_filled():
+            outcome.update(await self.execute_script(dom_scripts.FILL_FORM, fields, submit))
+            return outcome["ready"]
+
+        try:
+            await self._wait(form_filled, timeout, "Form not ready")
+        except TimeoutException:
+            errors = {locator: error for locator, error in zip(locators, outcome.get("errors", [])) if error}
+            if outcome.get("submit"):
+                errors[submit_locator] = outcome["submit"]
+            raise FormFillError(errors or {locator: "not ready" for locator in locators}) from None
+
+        errors = {locator: error for locator, error in zip(locators, outcome["errors"]) if error}
+        if errors:
+            raise FormFillError(errors)
+        if submit_locator:
+            try:
+                await outcome["submit"].click()
+            except StaleElementReferenceException:  # Re-rendered by the input events
+                await self.wait_and_click(submit_locator, timeout)
+
+    async def execute_script(self, script, *args):
+        """
+        Runs a script in the page, like WebDriver's execute_script: the script reads its arguments
+        from `arguments` and its return value is returned.
+
+        :param script: The body of the script.
+        :param args: The arguments of the script. Elements are passed by reference.
+        :return: The value returned by the script. Elements are returned as RemoteElement instances.
+        """
+        return await self.call_function(_function(script), *args)
+
+    async def call_function(self, declaration, *args, this=None, await_promise=False):
+        """
+        Calls a function in the page (script.callFunction).
+
+        :param declaration: The function declaration, e.g. 'function (a) { return a * 2; }'.
+        :param args: The arguments of the function.
+        :param this: The value of `this` in the function, e.g. a RemoteElement.
+        :param await_promise: Whether to wait for a returned promise and return its value.
+        :return: The value returned by the function.
+        :raises StaleElementReferenceException: If an element passed to the function is gone.
+        :raises DocumentUnloadedError: If a navigation unloaded the document during the call.
+        :raises JavascriptException: If the function threw.
+        """
+        params = {
+            "functionDeclaration": declaration,
+            "awaitPromise": await_promise,
+            "target": {"context": self.context},
+            "arguments": [serialize(arg) for arg in args],
+            "serializationOptions": {"maxDomDepth": 0},
+        }
+        if this is not None:
+            params["this"] = serialize(this)
+        try:
+            result = await self.connection.send("script.callFunction", params)
+        except BiDiError as error:
+            if error.error in STALE_ERRORS:
+                raise StaleElementReferenceException(error.msg) from None
+            if any(marker in error.msg for marker in UNLOADED_ERRORS):
+                raise DocumentUnloadedError(error.msg) from None
+            raise
+        if result["type"] == "exception":
+            text = result["exceptionDetails"]["text"]
+            if "stale element reference" in text:
+                raise StaleElementReferenceException(text)
+            raise JavascriptException(text)
+        return deserialize(result["result"], lambda shared_id: RemoteElement(self, shared_id))
+
+    async def perform_actions(self, actions):
+        """
+        Performs native input actions (input.performActions) in the browsing context.
+
+        :param actions: The BiDi input source actions.
+        :raises StaleElementReferenceException: If an element the actions refer to is gone.
+        """
+        try:
+            await self.connection.send("input.performActions", {"context": self.context, "actions": actions})
+        except BiDiError as error:
+            if error.error in STALE_ERRORS:
+                raise StaleElementReferenceException(error.msg) from None
+            raise
+
+    async def _wait(self, condition, timeout, message):
+        """
+        Polls an async condition until it returns a truthy value, like WebDriverWait.until, while
+        letting the event loop drive other contexts in between. Fails fast while the circuit
+        breaker is open and reports timeouts to it.
+
+        :param condition: An async callable returning the result, or a falsy value to keep waiting.
+        :param timeout: The maximum time to wait (in seconds).
+        :param message: The message of the TimeoutException.
+        :return: The result of the condition.
+        """
+        await target_breaker.before_call_async()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                result = await condition()
+                if result:
+                    target_breaker.record_success()
+                    return result
+            except (DocumentUnloadedError, StaleElementReferenceException):
+                pass  # The document changed mid-poll, poll again. Errors of the scripts themselves are raised.
+            if loop.time() >= deadline:
+                error = TimeoutException(message)
+                await target_breaker.record_failure_async(error)
+                raise error
+            await asyncio.sleep(self.poll_frequency)
+
+    async def _retry_on_stale(self, action):
+        """
+        Runs an async action, retrying it when its element went stale, with the backoff of
+        HelperFunctions._retry_on_stale.
+
+        :param action: An async callable performing the wait and interaction.
+        :return: The result of the action.
+        """
+        for attempt in range(Config.stale_retries + 1):
+            try:
+                return await action()
+            except StaleElementReferenceException:
+                if attempt == Config.stale_retries:
+                    raise
+                await self.wait_for_dom_settled(timeout=Config.stale_backoff * 2 ** attempt)
+
+    async def _match(self, locator, visible):
+        return (await self._match_conditions([locator], visible))[0]
+
+    async def _match_conditions(self, locators, visible):
+        conditions = [list(locator) for locator in locators]
+        return await self.execute_script(dom_scripts.MATCH_CONDITIONS, conditions, visible)
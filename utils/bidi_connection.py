@@ -0,0 +1,270 @@
+# utils/bidi_connection.py
+import asyncio
+import itertools
+import json
+import math
+from collections import defaultdict
+
+from selenium.common.exceptions import WebDriverException
+
+try:
+    import websockets
+except ImportError:  # The async page objects then share the connection Selenium keeps for the driver
+    websockets = None
+
+
+class BiDiError(WebDriverException):
+    """
+    Raised when a WebDriver BiDi command fails.
+
+    :ivar error: The BiDi error code, e.g. 'no such node' or 'unknown error'.
+    """
+
+    def __init__(self, error, message=None):
+        self.error = error
+        super().__init__(f"{error}: {message}" if message else error)
+
+
+def serialize(value):
+    """
+    Converts a Python value to a BiDi LocalValue, for the arguments of script.callFunction.
+
+    :param value: None, a bool, number, string, list, tuple or dict, or an object with a `shared_id`
+                  attribute (a remote element).
+    :return: The LocalValue dict.
+    """
+    if hasattr(value, "shared_id"):
+        return {"sharedId": value.shared_id}
+    if value is None:
+        return {"type": "null"}
+    if isinstance(value, bool):
+        return {"type": "boolean", "value": value}
+    if isinstance(value, (int, float)):
+        return {"type": "number", "value": value}
+    if isinstance(value, str):
+        return {"type": "string", "value": value}
+    if isinstance(value, (list, tuple)):
+        return {"type": "array", "value": [serialize(item) for item in value]}
+    if isinstance(value, dict):
+        return {"type": "object", "value": [[str(key), serialize(item)] for key, item in value.items()]}
+    raise TypeError(f"Unable to pass a {type(value).__name__} to the browser")
+
+
+def deserialize(value, node_factory):
+    """
+    Converts a BiDi RemoteValue to a Python value.
+
+    :param value: The RemoteValue dict.
+    :param node_factory: A callable taking a node's shared id and returning the object representing it.
+    :return: The Python value. Values without a Python equivalent (functions, windows...) are returned as is.
+    """
+    kind = value["type"]
+    if kind in ("undefined", "null"):
+        return None
+    if kind == "number":
+        number = value["value"]
+        if isinstance(number, str):  # NaN, -0, Infinity and -Infinity are sent as strings
+            return {"NaN": math.nan, "-0": -0.0, "Infinity": math.inf, "-Infinity": -math.inf}[number]
+        return number
+    if kind in ("string", "boolean", "bigint"):
+        return value["value"]
+    if kind in ("array", "set", "nodelist", "htmlcollection"):
+        return [deserialize(item, node_factory) for item in value.get("value", [])]
+    if kind in ("object", "map"):
+        return {
+            key if isinstance(key, str) else deserialize(key, node_factory): deserialize(item, node_factory)
+            for key, item in value.get("value", [])
+        }
+    if kind == "node":
+        return node_factory(value["sharedId"])
+    return value
+
+
+class BiDiConnection:
+    def __init__(self, url, driver=None):
+        """
+        Constructor for BiDiConnection class.
+
+        An asyncio client for the WebDriver BiDi websocket of a browser session. Commands can be sent
+        concurrently from many tasks; each one waits only for its own response.
+
+        With the `websockets` package, the client opens a websocket of its own to the session, read from
+        the event loop. This needs a browser accepting several BiDi connections per session, as Chrome,
+        Edge and Firefox do. Without the package, the commands go through the connection Selenium keeps
+        for the driver, each one waiting for its response in a worker thread, which Selenium polls every
+        `websocket_interval` (0.1 s by default).
+
+        :param url: The websocket URL of the session (the `webSocketUrl` capability).
+        :param driver: The WebDriver instance of the session, if any, e.g. for the failure screenshots.
+                       Required without the `websockets` package.
+        """
+        self.url = url
+        self.driver = driver
+        self._websocket = None
+        self._reader = None
+        self._shared = None  # Selenium's connection, when there is no websocket of our own
+        self._dispatchers = {}  # Event -> callback registered on Selenium's connection
+        self._loop = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = defaultdict(list)
+
+    async def connect(self):
+        """
+        Opens the websocket and starts dispatching the responses and events, or attaches to the
+        connection of the driver without the `websockets` package.
+
+        :return: The BiDiConnection instance.
+        """
+        if websockets is None:
+            if self.driver is None:
+                raise ImportError(
+                    "A BiDiConnection without a driver needs the 'websockets' package: pip install websockets"
+                )
+            self._loop = asyncio.get_running_loop()
+            self._shared = await asyncio.to_thread(_selenium_connection, self.driver)
+            return self
+        self._websocket = await websockets.connect(self.url, max_size=None)
+        self._reader = asyncio.create_task(self._read())
+        return self
+
+    async def send(self, method, params=None):
+        """
+        Sends a command and waits for its response.
+
+        :param method: The BiDi command, e.g. 'browsingContext.navigate'.
+        :param params: The parameters of the command.
+        :return: The result of the command.
+        :raises BiDiError: If the command failed or the connection closed before it completed.
+        """
+        if self._shared:
+            reply = await asyncio.to_thread(self._shared.send_cmd, method, params or {})
+            if reply.get("type") == "error":
+                raise BiDiError(reply["error"], reply.get("message"))
+            return reply.get("result", {})
+
+        command_id = next(self._ids)
+        response = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = response
+        try:
+            await self._websocket.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+            return await response
+        finally:
+            self._pending.pop(command_id, None)
+
+    async def subscribe(self, events, contexts=None):
+        """
+        Subscribes to BiDi events. Use add_listener to handle them.
+
+        :param events: A list of event names, e.g. ['log.entryAdded'].
+        :param contexts: A list of browsing context ids. If not provided, subscribes for all contexts.
+        """
+        params = {"events": list(events)}
+        if contexts:
+            params["contexts"] = list(contexts)
+        await self.send("session.subscribe", params)
+
+    def add_listener(self, event, callback):
+        """
+        Registers a callback called with the parameters of every occurrence of an event.
+
+        :param event: The event name.
+        :param callback: A callable taking the event parameters.
+        """
+        if self._shared and event not in self._dispatchers:
+            # Selenium calls its callbacks from threads of its own, dispatch the events on the event loop
+            def dispatch(params):
+                self._loop.call_soon_threadsafe(self._dispatch, event, params)
+
+            self._dispatchers[event] = dispatch
+            self._shared.callbacks.setdefault(event, []).append(dispatch)
+        self._listeners[event].append(callback)
+
+    def remove_listener(self, event, callback):
+        """
+        Unregisters a callback registered by add_listener.
+
+        :param event: The event name.
+        :param callback: The callback to remove.
+        """
+        self._listeners[event].remove(callback)
+
+    async def create_context(self, isolated=True):
+        """
+        Opens a new tab.
+
+        :param isolated: Whether the tab gets its own user context (cookies, storage and cache),
+                         like a separate browser profile.
+        :return: The id of the new browsing context.
+        """
+        params = {"type": "tab"}
+        if isolated:
+            params["userContext"] = (await self.send("browser.createUserContext"))["userContext"]
+        return (await self.send("browsingContext.create", params))["context"]
+
+    async def close_context(self, context):
+        """
+        Closes a tab opened by create_context, along with its user context if it had its own.
+
+        :param context: The id of the browsing context.
+        """
+        tree = await self.send("browsingContext.getTree", {"root": context, "maxDepth": 0})
+        user_context = tree["contexts"][0].get("userContext", "default")
+        await self.send("browsingContext.close", {"context": context})
+        if user_context != "default":
+            await self.send("browser.removeUserContext", {"userContext": user_context})
+
+    async def close(self):
+        """
+        Closes the websocket. Commands still waiting for a response fail with BiDiError. Selenium's
+        connection, when shared, stays open for the driver.
+        """
+        if self._shared:
+            for event, dispatch in self._dispatchers.items():
+                callbacks = self._shared.callbacks.get(event, [])
+                if dispatch in callbacks:
+                    callbacks.remove(dispatch)
+            self._dispatchers.clear()
+            self._shared = None
+        if self._websocket:
+            await self._websocket.close()
+        if self._reader:
+            await self._reader
+
+    async def _read(self):
+        try:
+            async for message in self._websocket:
+                data = json.loads(message)
+                if data.get("type") == "event":
+                    self._dispatch(data["method"], data["params"])
+                    continue
+                response = self._pending.get(data.get("id"))
+                if response is None or response.done():
+                    continue
+                if data.get("type") == "error":
+                    response.set_exception(BiDiError(data["error"], data.get("message")))
+                else:
+                    response.set_result(data.get("result", {}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for response in self._pending.values():
+                if not response.done():
+                    response.set_exception(BiDiError("connection closed", self.url))
+
+    def _dispatch(self, event, params):
+        for callback in list(self._listeners[event]):
+            callback(params)
+
+
+def _selenium_connection(driver):
+    # The BiDi connection of the driver, opened by Selenium on first use (e.g. by driver.network)
+    if getattr(driver, "_websocket_connection", None) is None:
+        driver.script  # Opens it
+    connection = driver._websocket_connection
+    if not hasattr(connection, "send_cmd"):
+        raise ImportError(
+            "This Selenium version cannot share its BiDi connection, the async page objects need the 'websockets' "
+            "package: pip install websockets"
+        )
+    return connection
@@ -0,0 +1,200 @@
+# utils/circuit_breaker.py
+import asyncio
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from configs.config import Config
+from utils.step_timer import TimedWait
+
+
+# Navigation errors of Chrome/Edge and Firefox (classic and BiDi) telling the browser could not reach the target
+NETWORK_ERRORS = (
+    "net::ERR_CONNECTION", "net::ERR_NAME_NOT_RESOLVED", "net::ERR_ADDRESS_UNREACHABLE", "net::ERR_TIMED_OUT",
+    "net::ERR_EMPTY_RESPONSE", "about:neterror", "NS_ERROR_CONNECTION_REFUSED", "NS_ERROR_UNKNOWN_HOST",
+    "NS_ERROR_NET_",
+)
+
+
+class TargetUnavailableError(Exception):
+    """
+    Raised instead of navigating or waiting while the circuit breaker considers the target down.
+    """
+
+
+def is_target_failure(error):
+    """
+    Tells whether a navigation error is a failure of the target, as opposed to an error of the test, the
+    driver or the Grid (an invalid URL, a crashed browser...), which the circuit breaker does not count.
+
+    :param error: The exception the navigation raised.
+    :return: True for a timeout or an error of the browser reaching the target.
+    """
+    if isinstance(error, TimeoutException):
+        return True
+    message = getattr(error, "msg", None) or str(error)
+    return isinstance(error, WebDriverException) and any(marker in message for marker in NETWORK_ERRORS)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, url=None, failure_threshold=None, reset_timeout=None, probe_timeout=None, proxy=None):
+        """
+        Constructor for CircuitBreaker class. Every option defaults to its value in Config.
+
+        The breaker counts consecutive timeouts and connection errors. Once they reach the threshold
+        it probes the target: if the target does not answer, the breaker opens and every guarded
+        call fails immediately with TargetUnavailableError. After the reset timeout the next
+        guarded call probes the target again and closes the breaker if it recovered.
+
+        The probe is a request from this process, so when the browsers reach the target through a Grid
+        or a proxy this process cannot use directly, point it at a health URL this process can reach
+        (Config.circuit_breaker_probe_url) or at the proxy (Config.circuit_breaker_probe_proxy).
+
+        :param url: The URL probed for health. Defaults to Config.circuit_breaker_probe_url, or
+                    Config.base_url, at the time of the probe.
+        :param failure_threshold: The number of consecutive failures before the target is probed.
+        :param reset_timeout: The time an open breaker waits before probing again (in seconds).
+        :param probe_timeout: The maximum time a probe waits for an answer (in seconds).
+        :param proxy: The proxy the probe goes through, e.g. 'http://proxy:3128'. Defaults to
+                      Config.circuit_breaker_probe_proxy, or the environment's proxy settings.
+        """
+        self.url = url
+        self.failure_threshold = failure_threshold if failure_threshold else Config.circuit_breaker_threshold
+        self.reset_timeout = reset_timeout if reset_timeout else Config.circuit_breaker_reset_timeout
+        self.probe_timeout = probe_timeout if probe_timeout else Config.circuit_breaker_probe_timeout
+        self.proxy = proxy
+        self.state = self.CLOSED
+        self.reason = None
+        self.consecutive_failures = 0
+        self._opened_at = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Checks that a call to the target may proceed, probing the target again if the breaker has
+        been open for longer than the reset timeout.
+
+        :raises TargetUnavailableError: If the breaker is open.
+        """
+        if not Config.circuit_breaker_enabled or self.state == self.CLOSED:
+            return
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                healthy, reason = self.probe()
+                if healthy:
+                    self._close()
+                else:
+                    self._open(reason)
+            if self.state == self.OPEN:
+                raise TargetUnavailableError(self.reason)
+
+    async def before_call_async(self):
+        """
+        before_call for coroutines: the probe runs in a thread, so the event loop keeps running.
+
+        :raises TargetUnavailableError: If the breaker is open.
+        """
+        if not Config.circuit_breaker_enabled or self.state == self.CLOSED:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.before_call)
+
+    def record_success(self):
+        """
+        Records a call that reached the target.
+        """
+        self.consecutive_failures = 0
+
+    def record_failure(self, error):
+        """
+        Records a timeout or connection error, opening the breaker if the failures reached the
+        threshold and the target does not answer a probe.
+
+        :param error: The exception the call raised.
+        """
+        if not Config.circuit_breaker_enabled:
+            return
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.OPEN or self.consecutive_failures < self.failure_threshold:
+                return
+            healthy, reason = self.probe()
+            if healthy:
+                self.consecutive_failures = 0  # The target is up, the failures are the tests' own
+            else:
+                self._open(f"{reason} after {self.consecutive_failures} consecutive failures ({type(error).__name__})")
+
+    async def record_failure_async(self, error):
+        """
+        record_failure for coroutines: the probe runs in a thread, so the event loop keeps running.
+
+        :param error: The exception the call raised.
+        """
+        if not Config.circuit_breaker_enabled:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.record_failure, error)
+
+    def probe(self):
+        """
+        Sends a request to the target.
+
+        :return: A (healthy, reason) tuple. The target is healthy when it answers with a status below 500.
+        """
+        url = self.url or Config.circuit_breaker_probe_url or Config.base_url
+        proxy = self.proxy or Config.circuit_breaker_probe_proxy
+        handlers = [urllib.request.ProxyHandler({"http": proxy, "https": proxy})] if proxy else []
+        try:
+            with urllib.request.build_opener(*handlers).open(url, timeout=self.probe_timeout):
+                return True, None
+        except urllib.error.HTTPError as error:
+            if error.code < 500:
+                return True, None
+            return False, f"{url} answered with HTTP {error.code}"
+        except (urllib.error.URLError, OSError) as error:
+            return False, f"{url} is unreachable ({getattr(error, 'reason', error)})"
+
+    def _open(self, reason):
+        self.state = self.OPEN
+        self.reason = reason
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        self.state = self.CLOSED
+        self.reason = None
+        self.consecutive_failures = 0
+
+
+# Breaker shared by every page object and helper of the process
+target_breaker = CircuitBreaker()
+
+
+class GuardedWait(TimedWait):
+    """
+    Wait used by the helpers: fails fast while the target is down and reports its timeouts to the
+    circuit breaker.
+    """
+
+    def until(self, method, message=""):
+        target_breaker.before_call()
+        try:
+            result = super().until(method, message)
+        except TimeoutException as error:
+            target_breaker.record_failure(error)
+            raise
+        target_breaker.record_success()
+        return result
+
+    def until_not(self, method, message=""):
+        target_breaker.before_call()
+        try:
+            result = super().until_not(method, message)
+        except TimeoutException as error:
+            target_breaker.record_failure(error)
+            raise
+        target_breaker.record_success()
+        return result
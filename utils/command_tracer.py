@@ -0,0 +1,250 @@
+# utils/command_tracer.py
+import json
+import os
+import time
+from collections import deque
+
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webelement import WebElement
+
+from configs.config import Config
+from drivers.command_hooks import add_command_listener
+from utils import step_timer
+from utils import dom_scripts
+
+# Tracer of the running test, set by plugins/command_trace.py. None when nothing is traced.
+_tracer = None
+
+# Key of a web element reference in W3C responses
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+# The scripts of utils/dom_scripts.py are shown by name in the traces
+_SCRIPT_NAMES = {
+    script: f"<dom_scripts.{name}>" for name, script in vars(dom_scripts).items()
+    if name.isupper() and isinstance(script, str)
+}
+
+# Returns a compact excerpt of each element in arguments[0]: the opening tag and the start of its text
+_EXCERPTS = """
+return arguments[0].map(function (element) {
+    var tag = element.cloneNode(false).outerHTML;
+    var close = tag.lastIndexOf('</');
+    var text = (element.textContent || '').replace(/\\s+/g, ' ').trim();
+    return (close > 0 ? tag.slice(0, close) : tag).slice(0, 300) + (text ? ' ' + text.slice(0, 100) : '');
+});
+"""
+
+
+class CommandTracer:
+    def __init__(self, test_id, capacity=None):
+        """
+        Constructor for CommandTracer class.
+
+        Keeps the last WebDriver commands of one test in a ring buffer: the command, its arguments and
+        response, its duration and error, the URL and the step (helper or page-object method and
+        locator) it was sent from. Nothing is formatted or written while the test runs; flush() does
+        both, and is only called when the test fails.
+
+        :param test_id: The pytest node id of the test.
+        :param capacity: The number of commands kept. Defaults to Config.trace_buffer_size.
+        """
+        self.test_id = test_id
+        self.entries = deque(maxlen=capacity if capacity else Config.trace_buffer_size)
+        self.total = 0
+        self.url = None
+        self._start = time.perf_counter()
+        self._flushing = False
+
+    def record(self, driver, command, params, response, duration, error):
+        """
+        Adds a command to the buffer, evicting the oldest one when it is full. Only references are kept.
+
+        :param driver: The WebDriver instance that sent the command.
+        :param command: The name of the command, e.g. 'findElement'.
+        :param params: The parameters of the command.
+        :param response: The response of the driver, or None if the command failed.
+        :param duration: The duration of the command (in seconds).
+        :param error: The raised exception, or None.
+        """
+        if self._flushing:
+            return  # The commands flush() sends itself
+        if command == Command.GET and params:
+            self.url = params.get("url")
+        elif command == Command.GET_CURRENT_URL and response:
+            self.url = response.get("value")
+        recorder = step_timer.current_recorder()
+        step = recorder.current_step() if recorder else None
+        self.total += 1
+        self.entries.append((
+            time.perf_counter() - self._start - duration, driver, command, params, response, duration, error,
+            step["name"] if step else None, step["locator"] if step else None, self.url,
+        ))
+
+    def flush(self, path, reason=None):
+        """
+        Writes the buffered commands to a JSON file, with an HTML excerpt of the elements the last
+        commands acted on.
+
+        :param path: The path of the trace file.
+        :param reason: The failure the trace is written for, e.g. the exception's message.
+        :return: The path of the trace file.
+        """
+        self._flushing = True
+        try:
+            entries = [self._entry(*entry) for entry in self.entries]
+            current_urls = {}
+            for driver in {id(entry[1]): entry[1] for entry in self.entries}.values():
+                try:
+                    current_urls[id(driver)] = driver.current_url
+                except Exception as error:  # Also urllib3 errors from a driver that was quit
+                    current_urls[id(driver)] = f"unavailable: {type(error).__name__}"
+            self._add_excerpts(entries)
+        finally:
+            self._flushing = False
+        trace = {
+            "test": self.test_id,
+            "reason": reason,
+            "commands_sent": self.total,
+            "commands_kept": len(entries),
+            "current_url": list(current_urls.values()),  # One per driver the test used
+            "commands": entries,
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(trace, file, indent=1, default=str)
+        return path
+
+    def _entry(self, offset, driver, command, params, response, duration, error, step, locator, url):
+        value = response.get("value") if isinstance(response, dict) else None
+        return {
+            "at": round(offset, 3),
+            "command": command,
+            "params": _compact(_name_script(_redact(command, params))),
+            "response": _compact(_redact_response(command, params, value)),
+            "duration_ms": round(duration * 1000, 1),
+            "error": f"{type(error).__name__}: {getattr(error, 'msg', None) or error}" if error else None,
+            "step": step,
+            "locator": locator,
+            "url": url,
+            "_driver": driver,
+            "_elements": _element_ids(value) + _element_ids(params),
+        }
+
+    @staticmethod
+    def _add_excerpts(entries):
+        # One script per driver fetches the HTML of the elements of the last commands. Elements that are
+        # gone fail the whole script, in which case they are fetched one by one.
+        wanted = [index for index, entry in enumerate(entries) if entry["_elements"]][-Config.trace_dom_excerpts:]
+        for index, entry in enumerate(entries):
+            driver, element_ids = entry.pop("_driver"), entry.pop("_elements")
+            if index not in wanted:
+                continue
+            elements = [WebElement(driver, element_id) for element_id in element_ids[:5]]
+            try:
+                entry["dom"] = driver.execute_script(_EXCERPTS, elements)
+            except Exception:  # Also urllib3 errors from a driver that was quit
+                entry["dom"] = []
+                for element in elements:
+                    try:
+                        entry["dom"] += driver.execute_script(_EXCERPTS, [element])
+                    except Exception as error:
+                        entry["dom"].append(f"unavailable: {type(error).__name__}")
+
+
+def _element_ids(value):
+    if isinstance(value, WebElement):
+        return [value.id]
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return [value[ELEMENT_KEY]]
+        return [element_id for item in value.values() for element_id in _element_ids(item)]
+    if isinstance(value, (list, tuple)):
+        return [element_id for item in value for element_id in _element_ids(item)]
+    return []
+
+
+def _redact(command, params):
+    # Hides the text typed into elements, directly or through the fill_form script
+    if not params or not Config.trace_redact_input:
+        return params
+    if command == Command.SEND_KEYS_TO_ELEMENT:
+        return {**params, "text": f"<{len(params.get('text', ''))} characters>", "value": None}
+    if command == Command.W3C_EXECUTE_SCRIPT and params.get("script") == dom_scripts.FILL_FORM:
+        fields, submit = params["args"]
+        hidden = [[by, value, f"<{len(str(text))} characters>"] for by, value, text in fields]
+        return {**params, "args": [hidden, submit]}
+    return params
+
+
+def _redact_response(command, params, value):
+    # Hides the value of fields read back (get_property, get_dom_attribute or the get_attribute atom), which
+    # is the text typed into them, passwords included
+    if not params or not Config.trace_redact_input or not isinstance(value, str):
+        return value
+    if command in (Command.GET_ELEMENT_PROPERTY, Command.GET_ELEMENT_ATTRIBUTE):
+        name = params.get("name")
+    elif command == Command.W3C_EXECUTE_SCRIPT and str(params.get("script")).startswith("/* getAttribute */"):
+        name = params["args"][1] if len(params.get("args", [])) > 1 else None
+    else:
+        return value
+    return f"<{len(value)} characters>" if name == "value" else value
+
+
+def _name_script(params):
+    if not params or params.get("script") not in _SCRIPT_NAMES:
+        return params
+    return {**params, "script": _SCRIPT_NAMES[params["script"]]}
+
+
+def _compact(value, limit=200):
+    # Shortens long strings (scripts, page sources...) and collections, and drops the session id
+    if isinstance(value, str):
+        return value if len(value) <= limit else f"{value[:limit]}... <{len(value)} characters>"
+    if isinstance(value, WebElement):
+        return f"<element {value.id[:8]}>"
+    if isinstance(value, dict):
+        if ELEMENT_KEY in value:
+            return f"<element {value[ELEMENT_KEY][:8]}>"
+        return {key: _compact(item, limit) for key, item in value.items() if key != "sessionId"}
+    if isinstance(value, (list, tuple)):
+        items = [_compact(item, limit) for item in value[:10]]
+        return items + [f"<{len(value) - 10} more>"] if len(value) > 10 else items
+    return value
+
+
+def _trace_command(driver, command, params, response, duration, error):
+    if _tracer is not None:
+        _tracer.record(driver, command, params, response, duration, error)
+
+
+add_command_listener(_trace_command)
+
+
+def start_tracing(test_id):
+    """
+    Starts tracing the commands of a test.
+
+    :param test_id: The pytest node id of the test.
+    :return: The CommandTracer of the test.
+    """
+    global _tracer
+    _tracer = CommandTracer(test_id)
+    return _tracer
+
+
+def stop_tracing():
+    """
+    Stops tracing commands.
+
+    :return: The CommandTracer of the test that was traced, or None.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def current_tracer():
+    """
+    :return: The CommandTracer of the running test, or None.
+    """
+    return _tracer
@@ -0,0 +1,250 @@
+# utils/data_pool.py
+import hashlib
+import mmap
+import os
+import random
+import socket
+import struct
+import time
+
+import barnum
+
+from configs.config import Config
+from drivers.driver_pool import get_worker_id
+
+MAGIC = b"TDP1"
+HEADER = struct.Struct("<4sI")  # Magic, record count
+
+
+def _user(index):
+    first_name, last_name = barnum.create_name()
+    zip_code, city, state = barnum.create_city_state_zip()
+    local, domain = barnum.create_email(name=(first_name, last_name)).split("@")
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": f"{local.lower()}{index}@{domain}",  # The index keeps the emails unique
+        "password": barnum.create_pw(length=12),
+        "phone": barnum.create_phone(zip_code),
+        "street": barnum.create_street(),
+        "city": city,
+        "state": state,
+        "zip_code": zip_code,
+    }
+
+
+def _invalid_input(index):
+    local, domain = barnum.create_email().lower().split("@")
+    return {
+        "email": random.choice([
+            f"{local}{index}",  # No domain
+            f"{local}{index}@",  # Empty domain
+            f"{local}{index}@@{domain}",  # Double @
+            f"{local} {index}@{domain}",  # Space in the local part
+            f"{local}{index}@{domain.split('.')[0]}",  # No top-level domain
+        ]),
+        "password": barnum.create_pw(length=4, digits=1, upper=1, lower=1),  # Too short
+        "phone": str(random.randint(1, 99999)),  # Too few digits
+        "zip_code": "".join(random.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZ", k=5)),
+    }
+
+
+# Record kinds: (fields as (name, width in bytes), generator taking the record index)
+KINDS = {
+    "users": (
+        [("first_name", 24), ("last_name", 24), ("email", 80), ("password", 16), ("phone", 16),
+         ("street", 64), ("city", 32), ("state", 2), ("zip_code", 10)],
+        _user,
+    ),
+    "invalid_inputs": (
+        [("email", 80), ("password", 16), ("phone", 16), ("zip_code", 10)],
+        _invalid_input,
+    ),
+}
+
+
+class DataPoolExhaustedError(Exception):
+    """
+    Raised when a worker has taken every record of its share of a data pool.
+    """
+
+
+def _worker():
+    # Each pytest-xdist worker ('gw0', 'gw1'...) gets its own share of the records
+    worker_id = get_worker_id()
+    index = int(worker_id[2:]) if worker_id.startswith("gw") else 0
+    return index, int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+
+
+def _lock_owner():
+    return f"{socket.gethostname()} {os.getpid()}"
+
+
+def _lock_is_stale(lock):
+    try:
+        modified = os.stat(lock).st_mtime
+        with open(lock, encoding="utf-8") as file:
+            host, _, pid = file.read().partition(" ")
+    except FileNotFoundError:
+        return False  # Released in the meantime
+    if time.time() - modified > Config.data_pool_lock_stale:
+        return True
+    if host != socket.gethostname() or not pid.isdigit() or os.name == "nt":
+        return False  # Only a process of this machine can be checked (and os.kill(pid, 0) is not a check on Windows)
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False  # Alive, owned by another user
+    return False
+
+
+def _remove_lock(lock, owner=None):
+    # Removes the lock, only if it is still held by owner when one is given
+    try:
+        if owner is not None:
+            with open(lock, encoding="utf-8") as file:
+                if file.read() != owner:
+                    return  # Taken over by another process
+        os.remove(lock)
+    except FileNotFoundError:
+        pass
+
+
+class DataPool:
+    def __init__(self, kind, size=None, directory=None):
+        """
+        Constructor for DataPool class.
+
+        Test data generated with barnum ahead of time into a file of fixed-width records, which
+        every process memory-maps instead of generating its own. Record i goes to worker
+        i % worker count only, so parallel workers never get the same record.
+
+        :param kind: The kind of records, a key of KINDS ('users' or 'invalid_inputs').
+        :param size: The number of records generated. Defaults to Config.data_pool_sizes[kind].
+        :param directory: The directory of the pool files. Defaults to Config.data_pool_dir.
+        """
+        self.kind = kind
+        self.fields, self.generator = KINDS[kind]
+        self.size = size if size else Config.data_pool_sizes[kind]
+        self.directory = directory if directory else Config.data_pool_dir
+        self.record = struct.Struct("<" + "".join(f"{width}s" for _, width in self.fields))
+        # The layout is part of the file name, so changing the fields regenerates the pool
+        layout = hashlib.sha1(repr(self.fields).encode("utf-8")).hexdigest()[:8]
+        self.path = os.path.join(self.directory, f"{kind}-{self.size}-{layout}.bin")
+        self.worker_index, self.worker_count = _worker()
+        self._next = self.worker_index
+        self._file = None
+        self._map = None
+
+    def generate(self):
+        """
+        Generates the pool file unless it already exists. Safe to call from several processes at
+        once: one of them generates the file while the others wait for it. A lock left by a generator
+        that crashed (its process is gone, or it made no progress for Config.data_pool_lock_stale
+        seconds) is taken over.
+
+        :raises TimeoutError: If the pool is still not generated after Config.data_pool_lock_timeout seconds.
+        """
+        lock = self.path + ".lock"
+        deadline = time.monotonic() + Config.data_pool_lock_timeout
+        while not os.path.exists(self.path):
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if _lock_is_stale(lock):
+                    _remove_lock(lock)  # Take over from the crashed generator
+                elif time.monotonic() >= deadline:
+                    raise TimeoutError(f"{self.path} was not generated within {Config.data_pool_lock_timeout} s, "
+                                       f"remove {lock} if no test run is generating it")
+                else:
+                    time.sleep(0.1)  # Another process is generating the pool
+                continue
+            owner = _lock_owner()
+            try:
+                os.write(descriptor, owner.encode("utf-8"))
+                self._write(lock)
+            finally:
+                os.close(descriptor)
+                _remove_lock(lock, owner)
+            return
+
+    def _write(self, lock):
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(HEADER.pack(MAGIC, self.size))
+            for index in range(self.size):
+                file.write(self._pack(self.generator(index)))
+                if index % 500 == 499:
+                    os.utime(lock)  # Progress, so the lock is not taken for a stale one
+        os.replace(temporary, self.path)
+
+    def open(self):
+        """
+        Generates the pool if needed and memory-maps it.
+
+        :return: The DataPool instance.
+        """
+        self.generate()
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or count != self.size:
+            self.close()
+            raise ValueError(f"{self.path} is not a data pool of {self.size} '{self.kind}' records")
+        return self
+
+    def take(self):
+        """
+        Hands out the next record of this worker's share. A record is never handed out twice
+        within a run.
+
+        :return: The record, as a dict of field names to strings.
+        :raises DataPoolExhaustedError: If this worker's share of the records is used up.
+        """
+        if self._next >= self.size:
+            raise DataPoolExhaustedError(
+                f"Worker {self.worker_index} used all its '{self.kind}' records, raise Config.data_pool_sizes"
+            )
+        record = self.get(self._next)
+        self._next += self.worker_count
+        return record
+
+    def get(self, index):
+        """
+        Reads a record, whether or not it belongs to this worker's share.
+
+        :param index: The index of the record.
+        :return: The record, as a dict of field names to strings.
+        """
+        offset = HEADER.size + index * self.record.size
+        values = self.record.unpack_from(self._map, offset)
+        return {name: value.rstrip(b"\0").decode("utf-8") for (name, _), value in zip(self.fields, values)}
+
+    def __len__(self):
+        """
+        The number of records left in this worker's share.
+        """
+        return max(0, -(-(self.size - self._next) // self.worker_count))
+
+    def close(self):
+        """
+        Unmaps the pool file.
+        """
+        if self._map:
+            self._map.close()
+            self._map = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _pack(self, record):
+        values = []
+        for name, width in self.fields:
+            value = record[name].encode("utf-8")
+            if len(value) > width:
+                value = value[:width].decode("utf-8", "ignore").encode("utf-8")  # Never split a character
+            values.append(value)
+        return self.record.pack(*values)
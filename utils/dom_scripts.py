@@ -0,0 +1,296 @@
+# utils/dom_scripts.py
+# JavaScript injected into the page by HelperFunctions. Locators are passed to the scripts as
+# [strategy, value] pairs, e.g. ('id', 'email'), and resolved in the browser.
+
+# Pseudo locator strategy matching on the current URL, e.g. (URL_CONTAINS, "mystore")
+URL_CONTAINS = "url contains"
+
+# Shared by the scripts below: resolves a locator to a list of elements and checks visibility
+_FIND_ELEMENTS = """
+function findElements(by, value) {
+    switch (by) {
+        case 'id':
+            var element = document.getElementById(value);
+            return element ? [element] : [];
+        case 'name':
+            return Array.prototype.slice.call(document.getElementsByName(value));
+        case 'css selector':
+            return Array.prototype.slice.call(document.querySelectorAll(value));
+        case 'class name':
+            return Array.prototype.slice.call(document.getElementsByClassName(value));
+        case 'tag name':
+            return Array.prototype.slice.call(document.getElementsByTagName(value));
+        case 'xpath':
+            var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var elements = [];
+            for (var i = 0; i < result.snapshotLength; i++) {
+                elements.push(result.snapshotItem(i));
+            }
+            return elements;
+        case 'link text':
+        case 'partial link text':
+            return Array.prototype.filter.call(document.links, function (link) {
+                var text = link.innerText.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+
+function isVisible(element) {
+    var style = window.getComputedStyle(element);
+    return style.display !== 'none' && style.visibility !== 'hidden' && element.getClientRects().length > 0;
+}
+"""
+
+# Evaluates every condition in one call. arguments[0] is a list of [strategy, value] pairs and
+# arguments[1] tells whether elements must be visible. Returns, per condition, the first matching
+# element (true for URL conditions) or null.
+MATCH_CONDITIONS = _FIND_ELEMENTS + """
+var conditions = arguments[0];
+var visible = arguments[1];
+return conditions.map(function (condition) {
+    if (condition[0] === 'url contains') {
+        return window.location.href.indexOf(condition[1]) !== -1 ? true : null;
+    }
+    var elements = findElements(condition[0], condition[1]);
+    if (visible) {
+        elements = elements.filter(isVisible);
+    }
+    return elements.length ? elements[0] : null;
+});
+"""
+
+# Returns every element matching the [strategy, value] locator in arguments[0] if there is at least one
+# and all of them are visible, or null.
+ALL_VISIBLE = _FIND_ELEMENTS + """
+var elements = findElements(arguments[0][0], arguments[0][1]);
+return elements.length && elements.every(isVisible) ? elements : null;
+"""
+
+# Returns whether the element in arguments[0] is visible.
+IS_VISIBLE = _FIND_ELEMENTS + """
+return isVisible(arguments[0]);
+"""
+
+# Installs (once per document) a MutationObserver, a fetch/XHR counter and a navigation flag on
+# window.__automationSettle. The flag is raised as soon as the document starts leaving (beforeunload, pagehide,
+# or a navigate event of the Navigation API where supported), e.g. on location.assign or a form post, while
+# the old document is still complete and quiet. A same-document navigation lowers it again once it is done;
+# a cross-document one replaces the document, so the monitor is installed again on the next call.
+_SETTLE_MONITOR = """
+function installSettleMonitor() {
+    if (window.__automationSettle) {
+        return window.__automationSettle;
+    }
+    var monitor = {pending: 0, lastMutation: Date.now(), navigating: false};
+    new MutationObserver(function () {
+        monitor.lastMutation = Date.now();
+    }).observe(document, {attributes: true, characterData: true, childList: true, subtree: true});
+
+    function leaving() {
+        monitor.navigating = true;
+    }
+    function stayed() {
+        monitor.navigating = false;
+        monitor.lastMutation = Date.now();
+    }
+    window.addEventListener('beforeunload', leaving);
+    window.addEventListener('pagehide', leaving);
+    window.addEventListener('pageshow', stayed);  // Restored from the back/forward cache
+    if (window.navigation) {
+        window.navigation.addEventListener('navigate', function (event) {
+            if (!event.downloadRequest) {  // A download leaves the document in place
+                leaving();
+            }
+        });
+        window.navigation.addEventListener('navigatesuccess', stayed);  // Same-document navigations only
+        window.navigation.addEventListener('navigateerror', stayed);
+    }
+
+    function done() {
+        monitor.pending = Math.max(0, monitor.pending - 1);
+        monitor.lastMutation = Date.now();
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            monitor.pending++;
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        monitor.pending++;
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+    window.__automationSettle = monitor;
+    return monitor;
+}
+"""
+
+# Installs the monitor. Registered by DriverFactory as a BiDi preload script, so it runs before the page's
+# own scripts and counts their first requests too; HelperFunctions.open_url runs it after the page load
+# when the driver has no preload script.
+INSTALL_SETTLE_MONITOR = _SETTLE_MONITOR + """
+installSettleMonitor();
+"""
+
+# The same, as the function declaration a BiDi preload script takes
+SETTLE_MONITOR_PRELOAD = "function () {" + INSTALL_SETTLE_MONITOR + "}"
+
+# Asynchronous script resolving to the current URL as soon as the document is loaded, is not navigating
+# away, has no pending requests and has not mutated for arguments[0] ms, or to null after arguments[1] ms.
+WAIT_FOR_SETTLED = _SETTLE_MONITOR + """
+var quietPeriod = arguments[0];
+var maxWait = arguments[1];
+var callback = arguments[arguments.length - 1];
+var monitor = installSettleMonitor();
+var deadline = Date.now() + maxWait;
+(function check() {
+    var now = Date.now();
+    var quiet = monitor.pending === 0 && now - monitor.lastMutation >= quietPeriod;
+    if (document.readyState === 'complete' && !monitor.navigating && quiet) {
+        callback(window.location.href);
+    } else if (now >= deadline) {
+        callback(null);
+    } else {
+        setTimeout(check, 50);
+    }
+})();
+"""
+
+# Fills a form in one call. arguments[0] is a list of [strategy, value, text] fields and arguments[1]
+# the [strategy, value] locator of the submit control, or null. Nothing is filled until every target is
+# ready (present, visible and enabled). Values are set through the native setters, so frameworks
+# tracking the value (e.g. React) see the change, and input/change events are dispatched.
+# Returns {ready, errors, submit}: errors holds, per field, null or the reason it was not filled.
+FILL_FORM = _FIND_ELEMENTS + """
+var fields = arguments[0];
+var submitLocator = arguments[1];
+
+function readiness(by, value) {
+    var elements = findElements(by, value);
+    if (!elements.length) {
+        return {error: 'not found'};
+    }
+    var visible = elements.filter(isVisible);
+    if (!visible.length) {
+        return {error: 'not visible'};
+    }
+    if (visible[0].disabled || visible[0].readOnly) {
+        return {error: visible[0].disabled ? 'disabled' : 'read-only'};
+    }
+    return {element: visible[0]};
+}
+
+function setNative(element, property, value) {
+    var prototype = Object.getPrototypeOf(element);
+    var descriptor = Object.getOwnPropertyDescriptor(prototype, property);
+    descriptor && descriptor.set ? descriptor.set.call(element, value) : (element[property] = value);
+}
+
+function fill(element, text) {
+    var type = (element.type || '').toLowerCase();
+    if (type === 'file') {
+        return 'file inputs must be filled with send_keys';
+    }
+    if (type === 'checkbox' || type === 'radio') {
+        setNative(element, 'checked', text === true || text === 'true');
+    } else if (element.tagName === 'SELECT') {
+        var option = Array.prototype.find.call(element.options, function (option) {
+            return option.value === String(text) || option.text.trim() === String(text);
+        });
+        if (!option) {
+            return 'no option ' + JSON.stringify(String(text));
+        }
+        setNative(element, 'value', option.value);
+    } else if (element.isContentEditable) {
+        element.textContent = String(text);
+    } else {
+        setNative(element, 'value', String(text));
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    return null;
+}
+
+var targets = fields.map(function (field) { return readiness(field[0], field[1]); });
+var submit = submitLocator ? readiness(submitLocator[0], submitLocator[1]) : {element: null};
+var errors = targets.map(function (target) { return target.error || null; });
+if (submit.error || errors.some(function (error) { return error; })) {
+    return {ready: false, errors: errors, submit: submit.error || null};
+}
+errors = targets.map(function (target, index) { return fill(target.element, fields[index][2]); });
+return {ready: true, errors: errors, submit: submit.element};
+"""
+
+# Times the evaluation of locators in the page, for the locator analyzer. arguments[0] is a list of
+# [strategy, value, candidate strategy, candidate value] entries (the candidate may be null) and
+# arguments[1] the number of evaluations timed. Returns, per entry, the number of matches, the mean time
+# of one evaluation in milliseconds for the locator and its candidate, and whether the candidate matches
+# exactly the same elements. Timing in the page leaves the WebDriver round trips out of the numbers.
+MEASURE_LOCATORS = _FIND_ELEMENTS + """
+var entries = arguments[0];
+var repeat = arguments[1];
+
+function measure(by, value) {
+    var elements = findElements(by, value);  // Warm-up, and the matches
+    var start = performance.now();
+    for (var i = 0; i < repeat; i++) {
+        findElements(by, value);
+    }
+    return {elements: elements, ms: (performance.now() - start) / repeat};
+}
+
+return {
+    domSize: document.getElementsByTagName('*').length,
+    results: entries.map(function (entry) {
+        try {
+            var original = measure(entry[0], entry[1]);
+        } catch (error) {
+            return {error: String(error.message || error)};
+        }
+        var result = {count: original.elements.length, ms: original.ms, candidateMs: null, equivalent: null};
+        if (entry[2]) {
+            try {
+                var candidate = measure(entry[2], entry[3]);
+                result.candidateMs = candidate.ms;
+                result.equivalent = candidate.elements.length === original.elements.length &&
+                    candidate.elements.every(function (element, index) {
+                        return element === original.elements[index];
+                    });
+            } catch (error) {
+                result.equivalent = false;
+            }
+        }
+        return result;
+    })
+};
+"""
+
+# Returns the device pixel ratio and the viewport rectangles of the region and the masks of a visual check,
+# after scrolling the region into view. arguments[0] is the [strategy, value] locator of the region or null,
+# arguments[1] a list of mask locators. A mask locator matching several elements masks all of them.
+ELEMENT_RECTS = _FIND_ELEMENTS + """
+function rect(element) {
+    var box = element.getBoundingClientRect();
+    return [box.left, box.top, box.width, box.height];
+}
+
+var region = arguments[0] ? findElements(arguments[0][0], arguments[0][1]) : null;
+if (region && region.length) {
+    region[0].scrollIntoView(true);  // Where the element screenshot is taken from
+}
+return {
+    ratio: window.devicePixelRatio || 1,
+    region: region && region.length ? rect(region[0]) : null,
+    masks: arguments[1].map(function (locator) {
+        return findElements(locator[0], locator[1]).map(rect);
+    })
+};
+"""
@@ -0,0 +1,156 @@
+# utils/element_cache.py
+import weakref
+
+from selenium.webdriver.remote.command import Command
+
+from drivers.command_hooks import add_command_listener, install_command_hooks
+
+# Commands after which the elements found before in the current window belong to another document (or frame)
+NAVIGATIONS = {
+    Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH,
+    Command.SWITCH_TO_FRAME, Command.SWITCH_TO_PARENT_FRAME,
+}
+
+# The caches of each driver, dropped by _track_navigation whatever sends the navigation
+_caches = weakref.WeakKeyDictionary()
+
+
+class ElementCache:
+    def __init__(self, driver=None):
+        """
+        Constructor for ElementCache class.
+
+        Maps locators to the web elements they resolved to in the current document of each window, so
+        switching between tabs keeps the elements of every tab. The entries of a window are dropped when
+        its document changes (navigation or a new URL) or when it is closed, and an entry when its
+        element goes stale.
+
+        :param driver: The WebDriver instance the elements belong to. Its window switches and navigations
+                       (from the helpers, page objects, session snapshots or tests alike) and the URL
+                       changes its commands report are then followed. If not provided, the cache holds a
+                       single window, only cleared by clear() and sync_url().
+        """
+        self.handle = getattr(driver, "handle", None)  # The window handle of a TabBoundDriver's tab
+        if driver is not None:
+            driver = install_command_hooks(getattr(driver, "wrapped_driver", driver))  # Tabs share the browser
+            _caches.setdefault(driver, weakref.WeakSet()).add(self)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._elements = {}  # Window handle -> {locator: element}
+        self._urls = {}  # Window handle -> URL of its current document
+
+    @property
+    def url(self):
+        """
+        :return: The URL of the current document of the current window, if known.
+        """
+        return self._urls.get(self.handle)
+
+    def get(self, locator):
+        """
+        Returns the cached element of a locator in the current window. The lookup is counted by
+        record(), once the caller knows whether the element could be used.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :return: The cached web element, or None if the locator is not cached.
+        """
+        return self._elements.get(self.handle, {}).get(locator)
+
+    def record(self, hit):
+        """
+        Counts a lookup.
+
+        :param hit: Whether the cached element was used, rather than the locator resolved again.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def put(self, locator, element):
+        """
+        Caches the element a locator resolved to in the current window.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param element: The web element found for the locator.
+        """
+        self._elements.setdefault(self.handle, {})[locator] = element
+
+    def invalidate(self, locator):
+        """
+        Drops the cached element of a locator in the current window, e.g. because it went stale.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        """
+        if self._elements.get(self.handle, {}).pop(locator, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        """
+        Drops every cached element of every window.
+        """
+        for handle in list(self._elements):
+            self.clear_window(handle)
+
+    def clear_window(self, handle=None):
+        """
+        Drops the cached elements of one window, e.g. because it navigated to a new document.
+
+        :param handle: The window handle. If not provided, the current window is cleared.
+        """
+        handle = handle if handle is not None else self.handle
+        self.invalidations += len(self._elements.pop(handle, {}))
+        self._urls.pop(handle, None)
+
+    def switch_window(self, handle):
+        """
+        Makes another window the current one, keeping the cached elements of every window.
+
+        :param handle: The window handle the driver switched to, or None if no window is current.
+        """
+        self.handle = handle
+
+    def sync_url(self, url):
+        """
+        Records the URL of the current document, dropping the cached elements of the current window if
+        it changed.
+
+        :param url: The URL the browser is currently on.
+        """
+        if url != self.url:
+            self.clear_window()
+            self._urls[self.handle] = url
+
+    def stats(self):
+        """
+        Returns the cache statistics.
+
+        :return: A dict with the hit, miss and invalidation counts and the number of cached elements.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": sum(len(elements) for elements in self._elements.values()),
+        }
+
+
+def _track_navigation(driver, command, params, response, duration, error):
+    caches = _caches.get(driver)
+    if not caches:
+        return
+    for cache in list(caches):
+        if command == Command.SWITCH_TO_WINDOW:
+            cache.switch_window(params["handle"] if error is None else None)
+        elif command == Command.CLOSE:
+            cache.clear_window()
+            cache.switch_window(None)  # No window is current after a close
+            cache.clear_window()  # Nor are the elements cached before the first switch
+        elif command in NAVIGATIONS:
+            cache.clear_window()  # Also when the command failed, e.g. a page load that timed out
+        elif command == Command.GET_CURRENT_URL and error is None and response:
+            cache.sync_url(response.get("value"))
+
+
+add_command_listener(_track_navigation)
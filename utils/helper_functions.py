@@ -1,12 +1,33 @@
 # utils/helper_functions.py
 import time
 
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import (
+    JavascriptException, StaleElementReferenceException, TimeoutException, WebDriverException
+)
 from selenium.webdriver import ActionChains
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from configs.config import Config
+from utils import dom_scripts
+from utils.circuit_breaker import GuardedWait, is_target_failure, target_breaker
+from utils.element_cache import ElementCache
+from utils.step_timer import instrument
 
+
+class FormFillError(Exception):
+    """
+    Raised by fill_form when some fields could not be filled.
+
+    :ivar errors: A dict mapping the locator of every failed field to the reason it failed.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        details = "; ".join(f"{locator}: {reason}" for locator, reason in errors.items())
+        super().__init__(f"Unable to fill {len(errors)} field(s): {details}")
+
+
+@instrument
 class HelperFunctions:
     def __init__(self, driver):
         """
@@ -16,6 +37,32 @@ class HelperFunctions:
         """
         self.driver = driver
         self.default_timeout = 30
+        self.settle_slice = 5  # Longest single in-page wait of wait_for_dom_settled (in seconds)
+        self.settle_poll = 0.25  # Pause before observing a document again after a script error (in seconds)
+        self.element_cache = ElementCache(driver)
+
+    def open_url(self, url):
+        """
+        Navigates to a URL, dropping the cached elements of the previous document.
+        Raises TargetUnavailableError right away while the circuit breaker is open.
+
+        :param url: The URL to navigate to.
+        """
+        self.element_cache.clear_window()
+        target_breaker.before_call()  # Fail fast while the target is down
+        try:
+            self.driver.get(url)
+        except WebDriverException as error:
+            if is_target_failure(error):  # Page-load timeouts and connection errors, not driver errors
+                target_breaker.record_failure(error)
+            raise
+        target_breaker.record_success()
+        if not getattr(self.driver, "settle_monitor_preloaded", False):
+            # Without a preload script, count the page's requests from now on at least
+            try:
+                self.driver.execute_script(dom_scripts.INSTALL_SETTLE_MONITOR)
+            except JavascriptException:
+                pass  # The page navigated away, wait_for_dom_settled installs the monitor when it runs
 
     def wait_and_input_text(self, locator, text, timeout=None):
         """
@@ -28,9 +75,9 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(
-            EC.visibility_of_element_located(locator)
-        ).send_keys(text)
+        self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_visible)
+        ).send_keys(text), locator)
 
     def wait_for_element_visible(self, locator, timeout=None):
         """
@@ -42,7 +89,7 @@ class HelperFunctions:
         :return: The visible web element.
         """
         timeout = timeout if timeout else self.default_timeout
-        return WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located(locator))
+        return GuardedWait(self.driver, timeout).until(self._cached_condition(locator, self._is_visible))
 
     def wait_for_element_to_be_clickable(self, locator, timeout=None):
         """
@@ -53,7 +100,7 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(EC.element_to_be_clickable(locator))
+        GuardedWait(self.driver, timeout).until(self._cached_condition(locator, self._is_clickable))
 
     def wait_and_click(self, locator, timeout=None):
         """
@@ -64,15 +111,9 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            ).click()
-        except StaleElementReferenceException:
-            time.sleep(3)
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            ).click()
+        self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_clickable)
+        ).click(), locator)
 
     def wait_and_clear_text(self, locator, timeout=None):
         """
@@ -83,15 +124,9 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            ).clear()
-        except StaleElementReferenceException:
-            time.sleep(3)
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            ).clear()
+        self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_clickable)
+        ).clear(), locator)
 
     def wait_until_element_contains_text(self, locator, text, timeout=None):
         """
@@ -103,7 +138,7 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(
+        GuardedWait(self.driver, timeout).until(
             EC.text_to_be_present_in_element(locator, text)
         )
 
@@ -116,8 +151,8 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(
-            EC.visibility_of_element_located(locator)
+        GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_visible)
         )
 
     def wait_until_elements_are_visible(self, locator, timeout=None):
@@ -129,7 +164,7 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(
+        GuardedWait(self.driver, timeout).until(
             EC.visibility_of_all_elements_located(locator)
         )
 
@@ -150,7 +185,7 @@ class HelperFunctions:
             else f"Unable to find elements located by '{locator}' after timeout of {timeout} seconds."
         )
         try:
-            elements = WebDriverWait(self.driver, timeout).until(
+            elements = GuardedWait(self.driver, timeout).until(
                 EC.visibility_of_all_elements_located(locator)
             )
         except TimeoutException:
@@ -168,10 +203,9 @@ class HelperFunctions:
         :return: The text content of the visible web element.
         """
         timeout = timeout if timeout else self.default_timeout
-        elm = WebDriverWait(self.driver, timeout).until(
-            EC.visibility_of_element_located(locator)
-        )
-        element_text = elm.text
+        element_text = self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_visible)
+        ).text, locator)
 
         return element_text
 
@@ -185,7 +219,7 @@ class HelperFunctions:
         :return: The text content of the present web element.
         """
         timeout = timeout if timeout else self.default_timeout
-        elm = WebDriverWait(self.driver, timeout).until(
+        elm = GuardedWait(self.driver, timeout).until(
             EC.presence_of_element_located(locator)
         )
         element_text = elm.text
@@ -198,8 +232,9 @@ class HelperFunctions:
 
         :param locator: A tuple containing the method to locate elements and the locator value.
         """
-        element = self.driver.find_element(*locator)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        self._retry_on_stale(lambda: self.driver.execute_script(
+            "arguments[0].scrollIntoView(true);", self._find_element(locator)
+        ), locator)
 
     def move_to_element_action(self, locator):
         """
@@ -207,8 +242,9 @@ class HelperFunctions:
 
         :param locator: A tuple containing the method to locate elements and the locator value.
         """
-        element = self.driver.find_element(*locator)
-        ActionChains(self.driver).move_to_element(element).perform()
+        self._retry_on_stale(lambda: ActionChains(self.driver).move_to_element(
+            self._find_element(locator)
+        ).perform(), locator)
 
     def element_to_be_clickable(self, locator, timeout=None):
         """
@@ -219,15 +255,9 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            )
-        except StaleElementReferenceException:
-            time.sleep(3)
-            WebDriverWait(self.driver, timeout).until(
-                EC.element_to_be_clickable(locator)
-            )
+        self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            self._cached_condition(locator, self._is_clickable)
+        ), locator)
 
     def scroll_to_end_of_page(self):
         """
@@ -250,15 +280,9 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        try:
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
-        except StaleElementReferenceException:
-            time.sleep(3)
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located(locator)
-            )
+        self._retry_on_stale(lambda: GuardedWait(self.driver, timeout).until(
+            EC.presence_of_element_located(locator)
+        ))
 
     def wait_until_elements_are_invisible(self, locator, timeout=None):
         """
@@ -269,6 +293,223 @@ class HelperFunctions:
                         If not provided, the default timeout set for the class will be used.
         """
         timeout = timeout if timeout else self.default_timeout
-        WebDriverWait(self.driver, timeout).until(
+        GuardedWait(self.driver, timeout).until(
             EC.invisibility_of_element_located(locator)
         )
+
+    def wait_for_dom_settled(self, timeout=None, quiet_period=None):
+        """
+        Waits until the page is quiet: fully loaded, not navigating away, with no pending fetch/XHR
+        requests and no DOM mutations for the quiet period. The page is observed from the inside by an injected
+        MutationObserver and request counter, so the wait ends as soon as the page settles.
+
+        :param timeout: The maximum time to wait for the page to settle (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param quiet_period: The time without mutations or requests that counts as settled (in seconds).
+                             If not provided, Config.dom_quiet_period will be used.
+        :return: True if the page settled, False if the timeout elapsed first.
+        """
+        timeout = timeout if timeout else self.default_timeout
+        quiet_period = quiet_period if quiet_period else Config.dom_quiet_period
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # Wait in slices shorter than the driver's script timeout
+            max_wait = min(remaining, self.settle_slice)
+            try:
+                url = self.driver.execute_async_script(
+                    dom_scripts.WAIT_FOR_SETTLED, quiet_period * 1000, max_wait * 1000
+                )
+            except JavascriptException:
+                time.sleep(self.settle_poll)  # A navigation unloaded the document mid-wait, observe the new one
+                continue
+            except TimeoutException:
+                continue
+            if url:
+                self.element_cache.sync_url(url)
+                return True
+
+    def wait_for_all(self, locators, timeout=None, visible=True):
+        """
+        Waits until every locator matches an element. All locators are evaluated in a single
+        injected script per poll instead of one WebDriver round-trip per locator.
+
+        :param locators: A list of locator tuples. A (dom_scripts.URL_CONTAINS, 'text') tuple matches
+                         when the current URL contains the text.
+        :param timeout: The maximum time to wait for the elements (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param visible: Whether the elements must be visible, or only present in the DOM.
+        :return: The matched web elements, in the order of the locators (True for URL conditions).
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        def all_matched(driver):
+            matches = self._match_conditions(locators, visible)
+            return matches if all(match is not None for match in matches) else False
+
+        return GuardedWait(self.driver, timeout).until(
+            all_matched,
+            f"Not all elements located by {list(locators)} matched after timeout of {timeout} seconds."
+        )
+
+    def wait_for_any(self, locators, timeout=None, visible=True):
+        """
+        Waits until at least one of the locators matches an element. All locators are evaluated
+        in a single injected script per poll.
+
+        :param locators: A list of locator tuples. A (dom_scripts.URL_CONTAINS, 'text') tuple matches
+                         when the current URL contains the text.
+        :param timeout: The maximum time to wait for an element (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :param visible: Whether the element must be visible, or only present in the DOM.
+        :return: A (locator, element) tuple for the first locator in the list that matched
+                 (the element is True for URL conditions).
+        """
+        timeout = timeout if timeout else self.default_timeout
+
+        def any_matched(driver):
+            matches = self._match_conditions(locators, visible)
+            for locator, match in zip(locators, matches):
+                if match is not None:
+                    return locator, match
+            return False
+
+        return GuardedWait(self.driver, timeout).until(
+            any_matched,
+            f"None of the elements located by {list(locators)} matched after timeout of {timeout} seconds."
+        )
+
+    def wait_for_first_of(self, success_locator, error_locator, timeout=None):
+        """
+        Waits for either the success or the error outcome of an action, e.g. a landing URL or an
+        error alert, instead of waiting for one and timing out before checking the other.
+
+        :param success_locator: The locator (or URL condition) of the success outcome.
+        :param error_locator: The locator (or URL condition) of the error outcome.
+        :param timeout: The maximum time to wait for either outcome (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :return: A (locator, element) tuple for the outcome that matched first.
+        """
+        return self.wait_for_any([success_locator, error_locator], timeout)
+
+    def fill_form(self, values, submit_locator=None, timeout=None):
+        """
+        Fills several fields, and optionally submits the form, in a single injected script instead
+        of a wait, a clear and a send_keys per field. The script waits for every field (and the
+        submit control) to be visible and enabled, sets the values through the native setters and
+        dispatches the input and change events. The submit control is clicked natively.
+
+        :param values: A dict mapping locator tuples to values. Checkboxes and radio buttons take
+                       True/False, selects the value or the visible text of an option.
+        :param submit_locator: The locator of the control to click once the fields are filled.
+        :param timeout: The maximum time to wait for the fields to be ready (in seconds).
+                        If not provided, the default timeout set for the class will be used.
+        :raises FormFillError: With the reason of every field that was not ready before the timeout,
+                               or could not be filled (in that case the form is not submitted).
+        """
+        timeout = timeout if timeout else self.default_timeout
+        locators = list(values)
+        fields = [[*locator, values[locator]] for locator in locators]
+        submit = list(submit_locator) if submit_locator else None
+        outcome = {}
+
+        def form_filled(driver):
+            outcome.update(driver.execute_script(dom_scripts.FILL_FORM, fields, submit))
+            return outcome["ready"]
+
+        try:
+            GuardedWait(self.driver, timeout).until(form_filled)
+        except TimeoutException:
+            errors = {locator: error for locator, error in zip(locators, outcome.get("errors", [])) if error}
+            if outcome.get("submit"):
+                errors[submit_locator] = outcome["submit"]
+            raise FormFillError(errors or {locator: "not ready" for locator in locators}) from None
+
+        errors = {locator: error for locator, error in zip(locators, outcome["errors"]) if error}
+        if errors:
+            raise FormFillError(errors)
+        if submit_locator:
+            try:
+                outcome["submit"].click()
+            except StaleElementReferenceException:  # Re-rendered by the input events
+                self.wait_and_click(submit_locator, timeout)
+
+    def _retry_on_stale(self, action, locator=None):
+        """
+        Runs an action, retrying it when its element went stale. Between attempts, waits for the
+        DOM to settle (i.e. for the element to be re-rendered), with an exponentially growing bound.
+
+        :param action: A callable performing the wait and interaction.
+        :param locator: The locator of the element, dropped from the element cache when it goes stale.
+        :return: The result of the action.
+        """
+        for attempt in range(Config.stale_retries + 1):
+            try:
+                return action()
+            except StaleElementReferenceException:
+                if locator:
+                    self.element_cache.invalidate(locator)
+                if attempt == Config.stale_retries:
+                    raise
+                self.wait_for_dom_settled(timeout=Config.stale_backoff * 2 ** attempt)
+
+    def _find_element(self, locator):
+        """
+        Resolves a locator through the element cache, finding and caching the element on a miss.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :return: The web element.
+        """
+        element = self.element_cache.get(locator)
+        self.element_cache.record(element is not None)
+        if element is None:
+            element = self.driver.find_element(*locator)
+            self.element_cache.put(locator, element)
+        return element
+
+    def _cached_condition(self, locator, check):
+        """
+        Builds a WebDriverWait condition resolving the locator through the element cache.
+
+        A cached element is only returned if it still passes the check. Otherwise (including when
+        it went stale) it is dropped and the locator is resolved again in the same poll.
+
+        :param locator: A tuple containing the method to locate elements and the locator value.
+        :param check: A callable taking the element and returning whether it satisfies the condition.
+        :return: The condition, returning the element once it satisfies the check and False otherwise.
+        """
+        def condition(driver):
+            element = self.element_cache.get(locator)
+            if element is not None:
+                try:
+                    if check(element):
+                        self.element_cache.record(True)
+                        return element
+                except StaleElementReferenceException:
+                    pass
+                self.element_cache.invalidate(locator)
+
+            self.element_cache.record(False)
+            element = driver.find_element(*locator)
+            self.element_cache.put(locator, element)
+            try:
+                return element if check(element) else False
+            except StaleElementReferenceException:
+                self.element_cache.invalidate(locator)
+                return False
+
+        return condition
+
+    @staticmethod
+    def _is_visible(element):
+        return element.is_displayed()
+
+    @staticmethod
+    def _is_clickable(element):
+        return element.is_displayed() and element.is_enabled()
+
+    def _match_conditions(self, locators, visible):
+        conditions = [list(locator) for locator in locators]
+        return self.driver.execute_script(dom_scripts.MATCH_CONDITIONS, conditions, visible)
@@ -0,0 +1,357 @@
+# utils/locator_analyzer.py
+# Measures how long every locator of the *Locators classes takes to evaluate in a page, flags the
+# expensive ones and suggests equivalent CSS selectors for XPath locators. Run it against a live or a
+# captured page:
+#
+#     python -m utils.locator_analyzer --url https://example.com/login --capture captures/login.html
+#     python -m utils.locator_analyzer --html captures/login.html --apply
+import argparse
+import importlib
+import inspect
+import os
+import pkgutil
+import re
+
+from selenium.webdriver.common.by import By
+
+from utils.dom_scripts import MEASURE_LOCATORS
+
+_NAME = re.compile(r"^[A-Za-z_][\w-]*$")
+_STRING = r"""(?:'([^']*)'|"([^"]*)")"""
+_ATTRIBUTE_EQUALS = re.compile(rf"^@([\w:-]+)\s*=\s*{_STRING}$")
+_ATTRIBUTE = re.compile(r"^@([\w:-]+)$")
+_CONTAINS = re.compile(rf"^contains\(\s*@([\w:-]+)\s*,\s*{_STRING}\s*\)$")
+_STARTS_WITH = re.compile(rf"^starts-with\(\s*@([\w:-]+)\s*,\s*{_STRING}\s*\)$")
+_CLASS_TOKEN = re.compile(
+    r"""^contains\(\s*concat\(\s*(['"]) \1\s*,\s*normalize-space\(\s*@class\s*\)\s*,\s*(['"]) \2\s*\)\s*,"""
+    r"""\s*(['"]) ([^'" ]+) \3\s*\)$"""
+)
+# One location step: '/' or '//', then a name test and its predicates (quoted strings may hold '/' and ']')
+_STEP = re.compile(r"""(//|/)((?:[^/\[]|\[(?:[^\]'"]|'[^']*'|"[^"]*")*\])+)""")
+_NOT = re.compile(r"^not\((.*)\)$")
+_TEXT = re.compile(r"text\(\)|normalize-space\(\s*\.?\s*\)|string\(\s*\.?\s*\)|^\.\s*=")
+
+
+class OptimizedLocator(tuple):
+    def __new__(cls, optimized, original):
+        """
+        A locator evaluated as its optimized (CSS) form, showing the original locator in error messages
+        and step timings.
+
+        :param optimized: The (strategy, value) locator used to find the elements.
+        :param original: The locator as written in the *Locators class.
+        """
+        locator = super().__new__(cls, optimized)
+        locator.original = tuple(original)
+        return locator
+
+    def __getnewargs__(self):
+        return tuple(self), self.original
+
+    def __repr__(self):
+        return f"{self.original!r} (as {self[0]} {self[1]!r})"
+
+
+def _css_string(value):
+    if "'" not in value:
+        return f"'{value}'"
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _split_outside_quotes(expression, separator):
+    parts, depth, quote, start = [], 0, None, 0
+    index = 0
+    while index < len(expression):
+        character = expression[index]
+        if quote:
+            quote = None if character == quote else quote
+        elif character in "'\"":
+            quote = character
+        elif depth == 0 and expression.startswith(separator, index):
+            parts.append(expression[start:index].strip())
+            index += len(separator)
+            start = index
+            continue
+        elif character in "([":
+            depth += 1
+        elif character in ")]":
+            depth -= 1
+        index += 1
+    parts.append(expression[start:].strip())
+    return parts
+
+
+def _condition_to_css(term):
+    # Returns the CSS of one predicate term, or raises ValueError with the reason there is none
+    match = _ATTRIBUTE_EQUALS.match(term)
+    if match:
+        return f"[{match.group(1)}={_css_string(match.group(2) if match.group(2) is not None else match.group(3))}]"
+    match = _ATTRIBUTE.match(term)
+    if match:
+        return f"[{match.group(1)}]"
+    for pattern, operator in ((_CONTAINS, "*="), (_STARTS_WITH, "^=")):
+        match = pattern.match(term)
+        if match:
+            value = match.group(2) if match.group(2) is not None else match.group(3)
+            if not value:
+                raise ValueError(f"'{term}' matches every element, CSS has no equivalent")
+            return f"[{match.group(1)}{operator}{_css_string(value)}]"
+    match = _CLASS_TOKEN.match(term)
+    if match:
+        return f".{match.group(4)}" if _NAME.match(match.group(4)) else f"[class~={_css_string(match.group(4))}]"
+    match = _NOT.match(term)
+    if match:
+        return f":not({_condition_to_css(match.group(1).strip())})"
+    if _TEXT.search(term):
+        raise ValueError("text predicates have no CSS equivalent, give the element an id or a data-* attribute")
+    raise ValueError(f"predicate '{term}' has no CSS equivalent")
+
+
+def _predicates(step):
+    # Splits 'name[p1][p2]' into the name and the predicates, honouring quotes and nested brackets
+    bracket = step.find("[")
+    if bracket == -1:
+        return step, []
+    name, rest, predicates = step[:bracket], step[bracket:], []
+    while rest:
+        if not rest.startswith("["):
+            raise ValueError(f"unexpected '{rest}'")
+        inner = _split_outside_quotes(rest[1:], "]")
+        predicates.append(inner[0])
+        rest = "]".join(inner[1:]).strip()
+    return name, predicates
+
+
+def xpath_to_css(xpath):
+    """
+    Converts an XPath to a CSS selector matching exactly the same elements, for the XPath forms that have
+    one: paths of '/' and '//' steps with tag names, attribute predicates (=, contains, starts-with, not,
+    class tokens) and a leading position.
+
+    :param xpath: The XPath, e.g. "//div[@class='alert alert-danger']".
+    :return: A tuple (css, reason): the selector and None, or None and the reason there is no equivalent.
+    """
+    if not xpath.startswith("//"):
+        return None, "only XPaths starting with '//' are converted"
+    steps = _STEP.findall(xpath)
+    if "".join(separator + step for separator, step in steps) != xpath:
+        return None, "unsupported XPath syntax"
+    compounds = []
+    for index, (separator, step) in enumerate(steps):
+        name, predicates = _predicates(step.strip())
+        if name != "*" and not _NAME.match(name):
+            return None, f"step '{step}' uses an axis or function CSS has no equivalent for"
+        compound = "" if name == "*" else name.lower()
+        try:
+            for position, predicate in enumerate(predicates):
+                if re.match(r"^\d+$", predicate) or predicate == "last()":
+                    if position:
+                        return None, "a position after another predicate has no CSS equivalent"
+                    kind = "child" if name == "*" else "of-type"
+                    compound += f":last-{kind}" if predicate == "last()" else f":nth-{kind}({predicate})"
+                    continue
+                compound += "".join(_condition_to_css(term) for term in _split_outside_quotes(predicate, " and "))
+        except ValueError as error:
+            return None, str(error)
+        if index:
+            compounds.append(" " if separator == "//" else " > ")
+        compounds.append(compound or "*")
+    css = "".join(compounds)
+    return re.sub(r"^\*(?=[\[.:])", "", css), None
+
+
+def find_locators(package="locators"):
+    """
+    Collects the locators of every *Locators class in a package.
+
+    :param package: The name of the package.
+    :return: A list of (class, attribute name, locator) tuples.
+    """
+    found = []
+    module = importlib.import_module(package)
+    names = [package] + [f"{package}.{info.name}" for info in pkgutil.walk_packages(module.__path__)]
+    for name in names:
+        module = importlib.import_module(name)
+        for cls in vars(module).values():
+            if not inspect.isclass(cls) or cls.__module__ != name or not cls.__name__.endswith("Locators"):
+                continue
+            for attribute, value in vars(cls).items():
+                if isinstance(value, tuple) and len(value) == 2 and all(isinstance(part, str) for part in value):
+                    found.append((cls, attribute, value))
+    return found
+
+
+def suggest(locator):
+    """
+    :param locator: A (strategy, value) locator.
+    :return: A tuple (candidate, reason): an equivalent CSS locator and None, or None and the reason there
+             is none. Locators that are not XPaths are left as they are.
+    """
+    locator = getattr(locator, "original", locator)
+    if locator[0] != By.XPATH:
+        return None, None
+    css, reason = xpath_to_css(locator[1])
+    return ((By.CSS_SELECTOR, css), None) if css else (None, reason)
+
+
+def flags(locator, count=None):
+    """
+    :param locator: A (strategy, value) locator.
+    :param count: The number of elements it matched, if measured.
+    :return: The names of the problems of the locator.
+    """
+    found = []
+    if locator[0] == By.XPATH and "//" in locator[1]:
+        found.append("full-document scan")  # Browsers evaluate XPath without their id and class indexes
+    if locator[0] == By.XPATH and _TEXT.search(locator[1]):
+        found.append("text predicate")
+    if count is not None and count > 1:
+        found.append(f"non-unique ({count} matches)")
+    if count == 0:
+        found.append("no match")
+    return found
+
+
+def analyze(driver, locators=None, repeat=50):
+    """
+    Measures the locators in the page loaded in the driver.
+
+    :param driver: The WebDriver instance, on the page to measure against.
+    :param locators: The (class, attribute name, locator) tuples. Defaults to find_locators().
+    :param repeat: The number of evaluations timed per locator.
+    :return: A tuple (DOM size, results): the number of elements in the page and one dict per locator
+             (name, path, locator, count, ms, flags, suggestion, reason, candidate_ms, equivalent).
+    """
+    locators = find_locators() if locators is None else locators
+    entries, suggestions = [], []
+    for _, _, locator in locators:
+        original = getattr(locator, "original", locator)
+        candidate, reason = suggest(original)
+        suggestions.append((original, candidate, reason))
+        entries.append(list(original) + (list(candidate) if candidate else [None, None]))
+    measured = driver.execute_script(MEASURE_LOCATORS, entries, repeat)
+
+    results = []
+    for (cls, attribute, _), (original, candidate, reason), result in zip(locators, suggestions,
+                                                                          measured["results"]):
+        count = result.get("count")
+        results.append({
+            "name": f"{cls.__name__}.{attribute}",
+            "path": inspect.getsourcefile(cls),
+            "attribute": attribute,
+            "locator": original,
+            "count": count,
+            "ms": result.get("ms"),
+            "error": result.get("error"),
+            "flags": flags(original, count),
+            "suggestion": candidate,
+            "reason": reason,
+            "candidate_ms": result.get("candidateMs"),
+            "equivalent": result.get("equivalent"),
+        })
+    return measured["domSize"], sorted(results, key=lambda result: result["ms"] or 0, reverse=True)
+
+
+def apply(results):
+    """
+    Rewrites the locators whose suggestion matched exactly the same elements in the page to the suggestion,
+    in their source files.
+
+    :param results: The results of analyze().
+    :return: The names of the rewritten locators.
+    """
+    applied = []
+    for result in results:
+        if not result["suggestion"] or not result["equivalent"] or not result["count"]:
+            continue  # Only rewrite what the page proved equivalent
+        with open(result["path"], encoding="utf-8") as file:
+            source = file.read()
+        value = re.escape(result["locator"][1])
+        css = result["suggestion"][1]
+        literal = f'"{css}"' if '"' not in css else repr(css)
+        pattern = re.compile(rf"(\b{result['attribute']}\s*=\s*\(?\s*)By\.XPATH(\s*,\s*)(['\"]){value}\3")
+        rewritten, replaced = pattern.subn(lambda match: f"{match.group(1)}By.CSS_SELECTOR{match.group(2)}{literal}",
+                                           source, count=1)
+        if replaced:
+            with open(result["path"], "w", encoding="utf-8") as file:
+                file.write(rewritten)
+            applied.append(result["name"])
+    return applied
+
+
+def optimize_locators(package="locators"):
+    """
+    Replaces, in memory, the XPath locators of the *Locators classes that have an equivalent CSS selector by
+    an OptimizedLocator. Error messages keep showing the original locator.
+
+    :param package: The name of the package holding the locators.
+    :return: The names of the replaced locators.
+    """
+    replaced = []
+    for cls, attribute, locator in find_locators(package):
+        candidate, _ = suggest(locator)
+        if candidate and not isinstance(locator, OptimizedLocator):
+            setattr(cls, attribute, OptimizedLocator(candidate, locator))
+            replaced.append(f"{cls.__name__}.{attribute}")
+    return replaced
+
+
+def format_report(dom_size, results):
+    """
+    :param dom_size: The number of elements in the page.
+    :param results: The results of analyze().
+    :return: The results as a text table, the slowest locators first.
+    """
+    lines = [f"{dom_size} elements in the page", ""]
+    for result in results:
+        if result["error"]:
+            lines.append(f"{result['name']:<40} {result['locator']}  error: {result['error']}")
+            continue
+        lines.append(
+            f"{result['name']:<40} {result['ms']:8.3f} ms {result['count']:5d} match(es)  {result['locator'][0]}"
+            f" {result['locator'][1]!r}"
+        )
+        if result["flags"]:
+            lines.append(f"{'':<40} flags: {', '.join(result['flags'])}")
+        if result["suggestion"]:
+            verdict = "same elements" if result["equivalent"] else "DIFFERENT elements"
+            lines.append(
+                f"{'':<40} suggestion: {result['suggestion'][0]} {result['suggestion'][1]!r}"
+                f" ({result['candidate_ms']:.3f} ms, {verdict})"
+            )
+        elif result["reason"]:
+            lines.append(f"{'':<40} no CSS equivalent: {result['reason']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the locators of the *Locators classes in a page.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="Live page to measure against.")
+    source.add_argument("--html", help="Captured page (see --capture) to measure against.")
+    parser.add_argument("--capture", help="Save the page source of --url to this file.")
+    parser.add_argument("--package", default="locators", help="Package holding the *Locators classes.")
+    parser.add_argument("--repeat", type=int, default=50, help="Evaluations timed per locator.")
+    parser.add_argument("--apply", action="store_true",
+                        help="Rewrite the XPath locators whose CSS suggestion matched the same elements.")
+    arguments = parser.parse_args()
+
+    from drivers.driver_factory import DriverFactory
+    driver = DriverFactory(bidi=False).create()
+    try:
+        driver.get(arguments.url if arguments.url else "file://" + os.path.abspath(arguments.html))
+        if arguments.capture:
+            os.makedirs(os.path.dirname(os.path.abspath(arguments.capture)), exist_ok=True)
+            with open(arguments.capture, "w", encoding="utf-8") as file:
+                file.write(driver.page_source)
+        dom_size, results = analyze(driver, find_locators(arguments.package), arguments.repeat)
+    finally:
+        driver.quit()
+    print(format_report(dom_size, results))
+    if arguments.apply:
+        applied = apply(results)
+        print(f"\nRewrote {len(applied)} locator(s): {', '.join(applied) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
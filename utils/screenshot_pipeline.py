@@ -0,0 +1,134 @@
+# utils/screenshot_pipeline.py
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from configs.config import Config
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow, screenshots are stored as the PNG the browser returned
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenshotPipeline:
+    def __init__(self, directory, image_format=None, scale=None, storage_cap_mb=None):
+        """
+        Constructor for ScreenshotPipeline class.
+
+        Only the capture runs on the calling (test) thread. Encoding, compression and writing are
+        handed to a background worker, and the files go to a sidecar directory next to the report.
+
+        :param directory: The directory the screenshots are written to.
+        :param image_format: 'webp' or 'png'. Defaults to Config.screenshot_format.
+        :param scale: The factor the screenshots are downscaled by. Defaults to Config.screenshot_scale.
+        :param storage_cap_mb: The maximum size of the screenshots of a run (in MB), after which
+                               screenshots are dropped. Defaults to Config.screenshot_storage_cap_mb.
+        """
+        self.directory = directory
+        self.image_format = (image_format if image_format else Config.screenshot_format).lower()
+        self.scale = scale if scale else Config.screenshot_scale
+        self.storage_cap = (storage_cap_mb if storage_cap_mb else Config.screenshot_storage_cap_mb) * 1024 * 1024
+        if Image is None:
+            self.image_format = "png"
+        self.stats = {"captured": 0, "duplicates": 0, "dropped": 0, "written": 0, "bytes": 0}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screenshots")
+        self._lock = threading.Lock()
+        self._reserved_bytes = 0
+        self._pending = {}  # Path -> future of the queued writes
+        self._last_digest = None
+        self._last_path = None
+
+    def capture(self, driver, name):
+        """
+        Captures a screenshot and queues it for encoding and writing.
+
+        A screenshot identical to the previous one is not stored again; the path of the previous
+        one is returned instead.
+
+        :param driver: The WebDriver instance to capture.
+        :param name: The name of the screenshot, e.g. the test id. Unsafe characters are replaced.
+        :return: The path the screenshot is (or will shortly be) written to, or None if the storage
+                 cap of the run has been reached.
+        """
+        png = driver.get_screenshot_as_png()
+        self.stats["captured"] += 1
+        digest = hashlib.sha1(png).hexdigest()
+        if digest == self._last_digest:
+            self.stats["duplicates"] += 1
+            return self._last_path
+
+        with self._lock:
+            # Reserve the size of the raw PNG, the encoded file is rarely larger
+            if self._reserved_bytes + len(png) > self.storage_cap:
+                self.stats["dropped"] += 1
+                return None
+            self._reserved_bytes += len(png)
+
+        file_name = f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}_{digest[:8]}.{self.image_format}"
+        path = os.path.join(self.directory, file_name)
+        future = self._executor.submit(self._store, png, path)
+        self._pending[path] = future
+        future.add_done_callback(lambda _: self._pending.pop(path, None))
+        self._last_digest, self._last_path = digest, path
+        return path
+
+    def read(self, path):
+        """
+        Waits for a screenshot to be written and reads it back, e.g. to embed it in a report.
+
+        :param path: A path returned by capture().
+        :return: The content of the file, or None if it could not be written.
+        """
+        future = self._pending.get(path)
+        if future:
+            future.result()
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def close(self):
+        """
+        Waits for the queued screenshots to be written and stops the background worker.
+        """
+        self._executor.shutdown(wait=True)
+
+    def _store(self, png, path):
+        written = 0
+        try:
+            data = self._encode(png)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(data)
+            written = len(data)
+        except Exception:
+            logger.exception("Unable to store screenshot %s", path)
+        finally:
+            with self._lock:
+                # Settle the reservation to the encoded size, or free it when nothing was written
+                self._reserved_bytes -= len(png) - written
+                if written:
+                    self.stats["written"] += 1
+                    self.stats["bytes"] += written
+
+    def _encode(self, png):
+        if Image is None:
+            return png
+        image = Image.open(io.BytesIO(png))
+        if self.scale != 1:
+            size = (max(1, int(image.width * self.scale)), max(1, int(image.height * self.scale)))
+            image = image.resize(size, Image.BILINEAR)
+        output = io.BytesIO()
+        if self.image_format == "webp":
+            image.save(output, format="WEBP", quality=80, method=4)
+        else:
+            image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
@@ -0,0 +1,121 @@
+# utils/session_snapshot.py
+import hashlib
+import json
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from configs.config import Config
+
+DUMP_STORAGE = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+RESTORE_STORAGE = """
+function restore(storage, items) {
+    Object.keys(items).forEach(function (key) {
+        storage.setItem(key, items[key]);
+    });
+}
+restore(window.localStorage, arguments[0]);
+restore(window.sessionStorage, arguments[1]);
+"""
+
+
+class SessionSnapshot:
+    def __init__(self, key, directory=None, ttl=None):
+        """
+        Constructor for SessionSnapshot class.
+
+        A snapshot holds the cookies and local/session storage of a logged-in browser, so other
+        browsers can start authenticated without replaying the login flow.
+
+        :param key: Identifies the credential set, e.g. the email address. Only a hash of it is
+                    written to disk.
+        :param directory: The directory holding the snapshots. Defaults to Config.session_snapshot_dir.
+        :param ttl: The time after which a snapshot expires (in seconds).
+                    Defaults to Config.session_snapshot_ttl.
+        """
+        directory = directory if directory else Config.session_snapshot_dir
+        digest = hashlib.sha256(str(key).encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(directory, f"{digest}.json")
+        self.ttl = ttl if ttl else Config.session_snapshot_ttl
+
+    def save(self, driver):
+        """
+        Captures the cookies and storage of the current page and writes them to disk.
+
+        :param driver: A WebDriver instance on a page of the logged-in application.
+        """
+        storage = driver.execute_script(DUMP_STORAGE)
+        data = {
+            "created": time.time(),
+            "url": driver.current_url,
+            "cookies": driver.get_cookies(),
+            "local_storage": storage["local"],
+            "session_storage": storage["session"],
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to a temporary file first so parallel workers never read a partial snapshot
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        os.replace(temporary_path, self.path)
+
+    def load(self):
+        """
+        Reads the snapshot from disk.
+
+        :return: The snapshot data, or None if there is no snapshot, it is unreadable or it expired.
+        """
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("created", 0) > self.ttl:
+            return None
+        return data
+
+    def restore(self, driver):
+        """
+        Restores the snapshot into a browser and opens the page it was captured on.
+
+        :param driver: The WebDriver instance to restore the session into.
+        :return: True if a snapshot was restored, False if there is no valid snapshot.
+        """
+        data = self.load()
+        if not data:
+            return False
+
+        # Cookies and storage can only be set for the origin of the current page
+        driver.get(Config.base_url)
+        for cookie in data["cookies"]:
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException:
+                # Cookie of another domain (e.g. a third-party tracker) or one the browser refuses to set
+                # (SameSite=None without Secure, expired...). If the session needed it, the login check fails
+                # and the snapshot is replaced.
+                pass
+        driver.execute_script(RESTORE_STORAGE, data["local_storage"], data["session_storage"])
+        driver.get(data["url"])
+        return True
+
+    def delete(self):
+        """
+        Deletes the snapshot, e.g. because the application rejected it.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,173 @@
+# utils/stand_in_app.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Login page matching LoginLocators and BasePageLocators. The form is rendered by script after
+# renderDelay ms and, with churnInterval set, its controls are replaced by fresh copies periodically
+# so references to them go stale.
+LOGIN_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Test Title</title></head>
+<body>
+<input name="q" placeholder="Search">
+<div id="app"></div>
+<script>
+var settings = %(settings)s;
+
+function post(path, body) {
+    return fetch(path, {method: 'POST', body: JSON.stringify(body)}).then(function (response) {
+        return response.json();
+    });
+}
+
+function showError(message) {
+    var alert = document.createElement('div');
+    alert.className = 'alert alert-danger';
+    alert.textContent = message;
+    document.getElementById('app').appendChild(alert);
+}
+
+function renderLogin() {
+    document.getElementById('app').innerHTML =
+        '<input id="email" type="email"><input id="password" type="password"><button>Sign In</button>';
+    document.querySelector('#app button').addEventListener('click', function () {
+        post('/api/login', {
+            email: document.getElementById('email').value,
+            password: document.getElementById('password').value
+        }).then(function (result) {
+            result.ok ? renderOtp() : showError('Error Message');
+        });
+    });
+}
+
+function renderOtp() {
+    document.getElementById('app').innerHTML = '<input id="otp"><button>Verify</button>';
+    document.querySelector('#app button').addEventListener('click', function () {
+        post('/api/verify', {otp: document.getElementById('otp').value}).then(function (result) {
+            result.ok ? window.location.assign('/mystore') : showError('Error Message');
+        });
+    });
+}
+
+function churn() {
+    Array.prototype.forEach.call(document.querySelectorAll('#app input, #app button'), function (control) {
+        var copy = control.cloneNode(true);
+        copy.value = control.value;
+        control.parentNode.replaceChild(copy, control);
+    });
+}
+
+setTimeout(function () {
+    renderLogin();
+    if (settings.churnInterval) {
+        setInterval(churn, settings.churnInterval);
+    }
+}, settings.renderDelay);
+</script>
+</body>
+</html>
+"""
+
+STORE_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>My Store</title></head>
+<body><h1 id="store">My Store</h1></body>
+</html>
+"""
+
+
+class StandInApp:
+    def __init__(self, latency=0.0, render_delay=0, churn_interval=0, host="127.0.0.1", port=0):
+        """
+        Constructor for StandInApp class.
+
+        A local HTTP stand-in for the application under test, serving a login flow that matches
+        LoginLocators and BasePageLocators. The settings can be changed while the app is running.
+
+        :param latency: The delay added to every response (in seconds).
+        :param render_delay: The delay before the login form is rendered by script (in milliseconds).
+        :param churn_interval: The interval at which the form controls are replaced by fresh copies
+                               (in milliseconds), causing stale element references. 0 disables it.
+        :param host: The interface to listen on.
+        :param port: The port to listen on. 0 picks a free port.
+        """
+        self.latency = latency
+        self.render_delay = render_delay
+        self.churn_interval = churn_interval
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        The base URL of the app, with a trailing slash (like Config.base_url is used).
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """
+        Starts serving in a background thread.
+
+        :return: The StandInApp instance.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops serving and releases the port.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        app = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(app.latency)
+                path = self.path.split("?")[0]
+                if path == "/":
+                    settings = {"renderDelay": app.render_delay, "churnInterval": app.churn_interval}
+                    self._send(200, LOGIN_PAGE % {"settings": json.dumps(settings)})
+                elif path == "/mystore" and "session=ok" in self.headers.get("Cookie", ""):
+                    self._send(200, STORE_PAGE)
+                elif path == "/mystore":
+                    self._send(302, "", {"Location": "/"})
+                else:
+                    self._send(404, "Not Found", content_type="text/plain")
+
+            def do_POST(self):
+                time.sleep(app.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/login":
+                    # Any credentials are accepted, except emails containing 'invalid'
+                    ok = bool(body.get("email")) and "invalid" not in body["email"] and bool(body.get("password"))
+                    self._send(200, json.dumps({"ok": ok}), content_type="application/json")
+                elif self.path == "/api/verify":
+                    ok = bool(body.get("otp"))
+                    headers = {"Set-Cookie": "session=ok; Path=/"} if ok else {}
+                    self._send(200, json.dumps({"ok": ok}), headers, "application/json")
+                else:
+                    self._send(404, "Not Found", content_type="text/plain")
+
+            def _send(self, status, body, headers=None, content_type="text/html"):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass  # Keep the test output clean
+
+        return Handler
@@ -0,0 +1,214 @@
+# utils/step_timer.py
+import functools
+import inspect
+import time
+
+from selenium.webdriver.support.ui import WebDriverWait
+
+from drivers.command_hooks import add_command_listener
+
+# Recorder of the running test, set by plugins/step_timing.py. None when nothing is recorded.
+_recorder = None
+
+
+class StepRecorder:
+    def __init__(self, test_id):
+        """
+        Constructor for StepRecorder class.
+
+        Collects the timed steps of one test. Nested steps (a page-object method calling a helper)
+        are recorded separately, and commands and polls count towards every open step.
+
+        :param test_id: The pytest node id of the test.
+        """
+        self.test_id = test_id
+        self.steps = []
+        self.source_files = set()  # Files of the methods called, for the impact analysis
+        self.locators = set()  # Locators passed to them
+        self._open_steps = []
+
+    def open_step(self, name, locator, timeout):
+        """
+        Opens a step. Steps must be closed in the reverse order they were opened.
+
+        :param name: The qualified name of the method, e.g. 'HelperFunctions.wait_and_click'.
+        :param locator: The locator the step acts on, or None.
+        :param timeout: The timeout budget of the step (in seconds), or None.
+        :return: The step record.
+        """
+        step = {
+            "name": name,
+            "locator": str(locator) if locator is not None else None,
+            "start": time.time(),
+            "duration": None,
+            "timeout": timeout,
+            "budget_used": None,
+            "polls": 0,
+            "commands": 0,
+            "error": None,
+        }
+        self._open_steps.append((step, time.perf_counter()))
+        return step
+
+    def close_step(self, step, error=None):
+        """
+        Closes the innermost open step and adds it to the recorded steps.
+
+        :param step: The step record returned by open_step().
+        :param error: The exception the step raised, or None.
+        """
+        _, started = self._open_steps.pop()
+        step["duration"] = time.perf_counter() - started
+        if step["timeout"]:
+            step["budget_used"] = step["duration"] / step["timeout"]
+        step["error"] = type(error).__name__ if error else None
+        self.steps.append(step)
+
+    def touch(self, source_file, arguments):
+        """
+        Records the source file of a called method and the locators among its arguments.
+
+        :param source_file: The path of the file defining the method.
+        :param arguments: The arguments of the call.
+        """
+        self.source_files.add(source_file)
+        for value in arguments.values():
+            self.locators.update(_locators_in(value))
+
+    def current_step(self):
+        """
+        :return: The innermost open step, or None between steps.
+        """
+        return self._open_steps[-1][0] if self._open_steps else None
+
+    def count(self, counter):
+        """
+        Increments a counter ('polls' or 'commands') of every open step.
+
+        :param counter: The name of the counter.
+        """
+        for step, _ in self._open_steps:
+            step[counter] += 1
+
+
+def _locators_in(value):
+    # Locators are (strategy, value) tuples, passed alone, in lists or as the keys of a dict
+    if isinstance(value, tuple) and len(value) == 2 and all(isinstance(part, str) for part in value):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [locator for item in value for locator in _locators_in(item)]
+    if isinstance(value, dict):
+        return [locator for key in value for locator in _locators_in(key)]
+    return []
+
+
+def current_recorder():
+    """
+    Returns the recorder of the running test.
+
+    :return: The StepRecorder, or None when nothing is recorded.
+    """
+    return _recorder
+
+
+def start_recording(test_id):
+    """
+    Starts recording the steps of a test.
+
+    :param test_id: The pytest node id of the test.
+    :return: The StepRecorder of the test.
+    """
+    global _recorder
+    _recorder = StepRecorder(test_id)
+    return _recorder
+
+
+def stop_recording():
+    """
+    Stops recording steps.
+
+    :return: The StepRecorder of the test that was recorded, or None.
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+def _count_command(driver, command, params, response, duration, error):
+    if _recorder is not None:
+        _recorder.count("commands")
+
+
+add_command_listener(_count_command)
+
+
+class TimedWait(WebDriverWait):
+    """
+    WebDriverWait counting its polls towards the open steps.
+    """
+
+    def until(self, method, message=""):
+        def counted(driver):
+            if _recorder is not None:
+                _recorder.count("polls")
+            return method(driver)
+
+        return super().until(counted, message)
+
+    def until_not(self, method, message=""):
+        def counted(driver):
+            if _recorder is not None:
+                _recorder.count("polls")
+            return method(driver)
+
+        return super().until_not(counted, message)
+
+
+def timed_step(method):
+    """
+    Decorator recording a method call as a step of the running test.
+
+    The locator is taken from the `locator`/`locators` argument and the timeout budget from the
+    `timeout` argument, falling back to the default timeout of the helper.
+    """
+    signature = inspect.signature(method)
+    name = method.__qualname__
+    source_file = inspect.getsourcefile(method)
+    has_timeout = "timeout" in signature.parameters
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _recorder is None:
+            return method(self, *args, **kwargs)
+
+        arguments = signature.bind_partial(self, *args, **kwargs).arguments
+        locator = arguments.get("locator", arguments.get("locators"))
+        timeout = None
+        if has_timeout:
+            helper = getattr(self, "helper", self)
+            timeout = arguments.get("timeout") or getattr(helper, "default_timeout", None)
+
+        recorder = _recorder
+        recorder.touch(source_file, arguments)
+        step = recorder.open_step(name, locator, timeout)
+        error = None
+        try:
+            return method(self, *args, **kwargs)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            recorder.close_step(step, error)
+
+    return wrapper
+
+
+def instrument(cls):
+    """
+    Class decorator applying timed_step to every public method of a helper or page object.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(attribute):
+            continue
+        setattr(cls, name, timed_step(attribute))
+    return cls
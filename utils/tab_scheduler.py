@@ -0,0 +1,158 @@
+# utils/tab_scheduler.py
+import inspect
+import time
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+from utils.circuit_breaker import TargetUnavailableError, target_breaker
+
+# Exceptions counting as "not yet" while polling, like WebDriverWait's defaults
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+
+class Wait:
+    def __init__(self, condition, timeout, message):
+        self.condition = condition
+        self.timeout = timeout
+        self.message = message
+
+
+def until(condition, timeout=None, message=""):
+    """
+    Builds a wait to yield from a task run by TabScheduler, in place of WebDriverWait(...).until:
+
+        element = yield until(EC.visibility_of_element_located(locator))
+
+    :param condition: A callable taking the tab's driver and returning a truthy value once met,
+                      e.g. an expected_conditions function.
+    :param timeout: The maximum time to wait (in seconds). If not provided, the scheduler's default is used.
+    :param message: The message of the TimeoutException thrown into the task.
+    :return: The wait, to be yielded. The yield evaluates to the condition's result.
+    """
+    return Wait(condition, timeout, message)
+
+
+def pause(seconds):
+    """
+    Builds a wait to yield in place of time.sleep, letting the other tabs work in the meantime.
+
+    :param seconds: The time to pause (in seconds).
+    :return: The wait, to be yielded.
+    """
+    end = time.monotonic() + seconds
+    return Wait(lambda driver: time.monotonic() >= end, seconds + 1, "")
+
+
+class _Task:
+    def __init__(self, tab, generator):
+        self.tab = tab
+        self.generator = generator
+        self.wait = None
+        self.deadline = None
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class TabScheduler:
+    def __init__(self, poll_frequency=0.5, default_timeout=30):
+        """
+        Constructor for TabScheduler class.
+
+        Interleaves tasks running in different tabs of one browser (see TabContext). A task is a
+        generator function that yields waits (see until) instead of blocking on them. While a task
+        waits, the scheduler polls the waits of the other tasks, and resumes every task as soon as its
+        condition is met, so the time one tab spends waiting is used by the others. Only the yielded
+        waits are interleaved: the page objects (BasePage, Login...) wait with WebDriverWait, which holds
+        up every tab until it returns, so tasks use them for actions and yield until() for their waits.
+
+        :param poll_frequency: The pause between rounds in which no wait was met (in seconds).
+        :param default_timeout: The timeout of waits yielded without one (in seconds).
+        """
+        self.poll_frequency = poll_frequency
+        self.default_timeout = default_timeout
+        self._tasks = []
+
+    def spawn(self, tab, task, *args, **kwargs):
+        """
+        Adds a task. Tasks start when run() is called.
+
+        :param tab: The TabContext the task runs in. It is activated whenever the task runs.
+        :param task: A generator function, e.g. `def task(page): ... yield until(...) ...`.
+        :param args: The arguments of the task.
+        :param kwargs: The keyword arguments of the task.
+        """
+        generator = task(*args, **kwargs)
+        if not inspect.isgenerator(generator):
+            raise TypeError(f"{task.__name__} is not a generator function, it must yield its waits")
+        self._tasks.append(_Task(tab, generator))
+
+    def run(self):
+        """
+        Runs the tasks until all of them have finished.
+
+        :return: The return values of the tasks, in the order they were spawned.
+        :raises Exception: The first exception a task did not handle, once all tasks have finished.
+        """
+        for task in self._tasks:
+            self._resume(task, task.generator.send, None)
+
+        while True:
+            waiting = [task for task in self._tasks if not task.done]
+            if not waiting:
+                break
+            progressed = False
+            for task in waiting:
+                task.tab.driver.activate()
+                try:
+                    result = task.wait.condition(task.tab.driver)
+                except IGNORED_EXCEPTIONS:
+                    result = False
+                except Exception as error:
+                    self._resume(task, task.generator.throw, error)
+                    progressed = True
+                    continue
+                if result:
+                    target_breaker.record_success()
+                    self._resume(task, task.generator.send, result)
+                    progressed = True
+                elif time.monotonic() >= task.deadline:
+                    error = TimeoutException(task.wait.message)
+                    target_breaker.record_failure(error)
+                    self._resume(task, task.generator.throw, error)
+                    progressed = True
+            if not progressed:
+                time.sleep(self.poll_frequency)
+
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            if task.error:
+                raise task.error
+        return [task.result for task in tasks]
+
+    def _resume(self, task, step, value):
+        """
+        Runs a task until its next wait.
+
+        :param task: The task.
+        :param step: The generator's send or throw method.
+        :param value: The value sent, or the exception thrown, into the task.
+        """
+        task.tab.driver.activate()
+        try:
+            wait = step(value)
+            while not isinstance(wait, Wait):
+                wait = task.generator.throw(TypeError(f"Tasks must yield waits (see until), not {wait!r}"))
+        except StopIteration as stop:
+            task.done, task.result = True, stop.value
+            return
+        except Exception as error:
+            task.done, task.error = True, error
+            return
+        try:
+            target_breaker.before_call()  # Fail fast while the target is down
+        except TargetUnavailableError as error:
+            self._resume(task, task.generator.throw, error)
+            return
+        task.wait = wait
+        task.deadline = time.monotonic() + (wait.timeout if wait.timeout else self.default_timeout)
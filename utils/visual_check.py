@@ -0,0 +1,282 @@
+# utils/visual_check.py
+import io
+import os
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from configs.config import Config
+from drivers.driver_pool import get_worker_id
+from utils import dom_scripts
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # Page objects still work without them, only visual checks need them
+    np = Image = None
+
+HASH_SIZE = 8  # The perceptual hash keeps the 8x8 lowest frequencies of a 32x32 DCT, 64 bits
+_DCT_SIZE = 32
+
+# Decoded baseline: read-only RGB pixels (height x width x 3) and the perceptual hash of the unmasked image
+Baseline = namedtuple("Baseline", ["pixels", "phash"])
+
+
+class VisualMismatchError(AssertionError):
+    """
+    Raised when a screenshot does not match its baseline.
+
+    :ivar ratio: The share of the compared pixels that differ, or None if the pixels were not compared.
+    :ivar paths: The paths of the images written for the mismatch (actual, diff).
+    """
+
+    def __init__(self, message, ratio=None, paths=()):
+        self.ratio = ratio
+        self.paths = list(paths)
+        super().__init__(f"{message}. See {', '.join(self.paths)}" if self.paths else message)
+
+
+def _dct_matrix(size):
+    # Orthonormal DCT-II basis, so the 2D transform is two matrix products
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.sqrt(2 / size) * np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def _dct():
+    return _dct_matrix(_DCT_SIZE)
+
+
+def perceptual_hash(pixels):
+    """
+    Computes the DCT perceptual hash of an image: close images get hashes a few bits apart.
+
+    :param pixels: RGB pixels as a (height, width, 3) uint8 array.
+    :return: The hash, as a boolean array of HASH_SIZE * HASH_SIZE bits.
+    """
+    small = Image.fromarray(pixels).convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.BILINEAR)
+    frequencies = _dct() @ np.asarray(small, dtype=np.float64) @ _dct().T
+    low = frequencies[:HASH_SIZE, :HASH_SIZE].flatten()
+    return low > np.median(low[1:])  # The DC term would dominate the median
+
+
+def decode(png):
+    """
+    :param png: A PNG image, as bytes.
+    :return: Its RGB pixels as a (height, width, 3) uint8 array.
+    """
+    return np.asarray(Image.open(io.BytesIO(png)).convert("RGB"))
+
+
+# LRU cache of the decoded baselines, built on first use (and again when Config.visual_baseline_cache_size changes)
+_baseline_cache = None
+
+
+def load_baseline(path, modified):
+    """
+    Decodes a baseline image. Decoded baselines are kept in an LRU cache shared by the tests of a process,
+    holding up to Config.visual_baseline_cache_size of them as set when the baseline is loaded.
+
+    :param path: The path of the baseline PNG.
+    :param modified: The modification time of the file, so a rewritten baseline is decoded again.
+    :return: The Baseline.
+    """
+    global _baseline_cache
+    size = Config.visual_baseline_cache_size
+    if _baseline_cache is None or _baseline_cache.cache_parameters()["maxsize"] != size:
+        _baseline_cache = lru_cache(maxsize=size)(_decode_baseline)
+    return _baseline_cache(path, modified)
+
+
+def _decode_baseline(path, modified):
+    with open(path, "rb") as file:
+        pixels = decode(file.read())
+    pixels.flags.writeable = False  # Shared between tests
+    return Baseline(pixels, perceptual_hash(pixels))
+
+
+def _ignored(shape, rectangles):
+    # Boolean (height, width) array of the masked pixels
+    ignored = np.zeros(shape[:2], dtype=bool)
+    for left, top, right, bottom in rectangles:
+        ignored[top:bottom, left:right] = True
+    return ignored
+
+
+def changed_pixels(actual, expected, ignored):
+    """
+    :param actual: The RGB pixels of the screenshot.
+    :param expected: The RGB pixels of the baseline, of the same size.
+    :param ignored: The boolean array of the masked pixels.
+    :return: The boolean (height, width) array of the pixels that differ by more than
+             Config.visual_pixel_threshold in a channel, which leaves anti-aliasing noise out.
+    """
+    # Absolute difference without leaving uint8, then any channel over the threshold
+    delta = np.maximum(actual, expected)
+    delta -= np.minimum(actual, expected)
+    over = delta > Config.visual_pixel_threshold
+    return (over[..., 0] | over[..., 1] | over[..., 2]) & ~ignored
+
+
+def compare(actual, baseline, rectangles=(), tolerance=None):
+    """
+    Compares a screenshot with its baseline. Identical images match at once. Otherwise, with the default
+    tolerance, the perceptual hashes are compared and images whose hashes are far apart fail without a pixel
+    comparison; the others, and all of them when the caller sets the tolerance, are compared pixel by pixel.
+
+    :param actual: The RGB pixels of the screenshot.
+    :param baseline: The Baseline.
+    :param rectangles: The masked (left, top, right, bottom) pixel rectangles, ignored in both images.
+    :param tolerance: The share of the pixels allowed to differ. Defaults to Config.visual_tolerance. A
+                      tolerance set by the caller turns the perceptual hash gate off, as the gate (tuned with
+                      Config.visual_phash_distance for the default) would fail looser checks the pixels pass.
+    :return: A tuple (matches, ratio, distance): whether the images match, the share of the compared pixels
+             that differ (None if not compared) and the Hamming distance of the perceptual hashes (None if
+             the sizes differ).
+    """
+    gated = tolerance is None
+    tolerance = Config.visual_tolerance if tolerance is None else tolerance
+    if actual.shape != baseline.pixels.shape:
+        return False, None, None
+    if np.array_equal(actual, baseline.pixels):
+        return True, 0.0, 0
+    ignored = _ignored(actual.shape, rectangles)
+    masked_actual, expected_hash = actual, baseline.phash
+    if rectangles:
+        # The masks are blanked in both images for the hashes only, the pixel comparison skips them
+        masked_actual, masked_expected = actual.copy(), baseline.pixels.copy()
+        masked_actual[ignored] = masked_expected[ignored] = 0
+        expected_hash = perceptual_hash(masked_expected)
+    distance = int(np.count_nonzero(perceptual_hash(masked_actual) != expected_hash))
+    if gated and distance > Config.visual_phash_distance:
+        return False, None, distance
+
+    compared = ignored.size - np.count_nonzero(ignored)
+    ratio = np.count_nonzero(changed_pixels(actual, baseline.pixels, ignored)) / compared if compared else 0.0
+    return bool(ratio <= tolerance), float(ratio), distance
+
+
+def _pixel_rectangles(rectangles, origin, ratio, shape):
+    # Viewport rectangles in CSS pixels to (left, top, right, bottom) screenshot pixels, clipped to the image
+    height, width = shape[:2]
+    pixels = []
+    for x, y, w, h in rectangles:
+        left, top = int((x - origin[0]) * ratio), int((y - origin[1]) * ratio)
+        right, bottom = int(np.ceil((x - origin[0] + w) * ratio)), int(np.ceil((y - origin[1] + h) * ratio))
+        left, top, right, bottom = max(0, left), max(0, top), min(width, right), min(height, bottom)
+        if left < right and top < bottom:
+            pixels.append((left, top, right, bottom))
+    return pixels
+
+
+class VisualCheck:
+    def __init__(self, driver, baseline_dir=None, diff_dir=None):
+        """
+        Constructor for VisualCheck class.
+
+        :param driver: The WebDriver instance to be used for browser automation.
+        :param baseline_dir: The directory of the baselines, with one subdirectory per browser.
+                             Defaults to Config.visual_baseline_dir.
+        :param diff_dir: The directory the images of the mismatches are written to.
+                         Defaults to Config.visual_diff_dir.
+        """
+        self.driver = driver
+        self.baseline_dir = baseline_dir if baseline_dir else Config.visual_baseline_dir
+        self.diff_dir = diff_dir if diff_dir else Config.visual_diff_dir
+
+    def baseline_path(self, name):
+        """
+        :param name: The name of the check.
+        :return: The path of its baseline for the driver's browser.
+        """
+        browser = self.driver.capabilities.get("browserName", "browser")
+        return os.path.join(self.baseline_dir, browser, f"{_file_name(name)}.png")
+
+    def assert_matches(self, name, region=None, tolerance=None, masks=None):
+        """
+        Compares a screenshot of the page, or of one element, with its baseline. With
+        Config.visual_update_baselines the screenshot becomes the baseline instead.
+
+        :param name: The name of the check, which names the baseline.
+        :param region: The locator of the element to capture. If not provided, the viewport is captured.
+        :param tolerance: The share of the pixels allowed to differ. Defaults to Config.visual_tolerance.
+        :param masks: Dynamic content ignored by the comparison: locators (every matching element is
+                      masked) and (x, y, width, height) rectangles in CSS pixels, relative to the region.
+        :raises VisualMismatchError: If the screenshot does not match the baseline, or there is no baseline.
+                                     The actual (and diff) images are written to the diff directory.
+        """
+        if np is None:
+            raise ImportError("Visual checks need NumPy and Pillow: pip install numpy Pillow")
+        masks = masks if masks else []
+        locators = [mask for mask in masks if len(mask) == 2]
+        fixed = [tuple(mask) for mask in masks if len(mask) == 4]
+        if region:
+            element = self.driver.find_element(*region)
+            # Scrolls the region into view, then measures the rectangles in the viewport
+            rects = self.driver.execute_script(dom_scripts.ELEMENT_RECTS, list(region), [list(m) for m in locators])
+            png = element.screenshot_as_png
+            origin = rects["region"][:2]
+        else:
+            png = self.driver.get_screenshot_as_png()
+            rects = self.driver.execute_script(dom_scripts.ELEMENT_RECTS, None, [list(m) for m in locators])
+            origin = (0, 0)
+        actual = decode(png)
+        found = [rect for matches in rects["masks"] for rect in matches]
+        rectangles = _pixel_rectangles(found + [(origin[0] + x, origin[1] + y, w, h) for x, y, w, h in fixed],
+                                       origin, rects["ratio"], actual.shape)
+
+        path = self.baseline_path(name)
+        if Config.visual_update_baselines:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(png)
+            return
+        if not os.path.exists(path):
+            # A check without a baseline checks nothing, creating it is a decision of its own
+            raise VisualMismatchError(
+                f"No baseline for '{name}' at {path}, set Config.visual_update_baselines = True to create it",
+                paths=self._write_mismatch(name, png, actual, None, rectangles)
+            )
+
+        baseline = load_baseline(path, os.stat(path).st_mtime_ns)
+        matches, ratio, distance = compare(actual, baseline, rectangles, tolerance)
+        if matches:
+            return
+        paths = self._write_mismatch(name, png, actual, baseline, rectangles)
+        if distance is None:
+            raise VisualMismatchError(
+                f"'{name}' is {actual.shape[1]}x{actual.shape[0]}, its baseline "
+                f"{baseline.pixels.shape[1]}x{baseline.pixels.shape[0]}", paths=paths
+            )
+        if ratio is None:
+            raise VisualMismatchError(
+                f"'{name}' differs from its baseline (perceptual hashes {distance} bits apart)", paths=paths
+            )
+        raise VisualMismatchError(f"'{name}' differs from its baseline in {ratio:.2%} of the pixels", ratio, paths)
+
+    def _write_mismatch(self, name, png, actual, baseline, rectangles):
+        # Only mismatches pay for writing images: the screenshot as is and, when the sizes match, the
+        # screenshot dimmed with the differing pixels in red and the masks in grey. The names carry the
+        # browser and the test, as the same check fails in several browsers and workers of a run.
+        os.makedirs(self.diff_dir, exist_ok=True)
+        browser = self.driver.capabilities.get("browserName", "browser")
+        test = os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0] or get_worker_id()
+        base = os.path.join(self.diff_dir, _file_name(f"{name}_{browser}_{test}"))
+        paths = [f"{base}_actual.png"]
+        with open(paths[0], "wb") as file:
+            file.write(png)
+        if baseline is not None and actual.shape == baseline.pixels.shape:
+            ignored = _ignored(actual.shape, rectangles)
+            diff = actual // 3
+            diff[changed_pixels(actual, baseline.pixels, ignored)] = (255, 0, 0)
+            diff[ignored] = (128, 128, 128)
+            paths.append(f"{base}_diff.png")
+            Image.fromarray(diff).save(paths[1])
+        return paths
+
+
+def _file_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)